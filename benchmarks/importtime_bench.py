@@ -0,0 +1,109 @@
+"""
+导入耗时基准: 用 python -X importtime 统计各个适配器/接收器模块的冷启动导入耗时
+
+每个模块都在独立的子进程中导入，避免互相之间的模块缓存影响结果。
+
+用法:
+    python benchmarks/importtime_bench.py
+    python benchmarks/importtime_bench.py -m lighter_receiver paradex_receiver --top 15
+    python benchmarks/importtime_bench.py --budget-ms 150   # 任一模块超过预算则返回非0
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "lighter_receiver",
+    "paradex_receiver",
+    "lighter_exchanges.lighter_adapter",
+    "paradex_exchanges.paradex_adapter",
+]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """解析 -X importtime 输出，返回 [(module, self_us, cumulative_us)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line.split("|", 2)
+            self_us = int(self_us.replace("import time:", "").strip())
+            rows.append((name.rstrip(), self_us, int(cumulative_us.strip())))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_module(module: str, python: str = sys.executable) -> Tuple[Optional[int], List[Tuple[str, int, int]], str]:
+    """在子进程中导入模块
+
+    Returns:
+        (模块自身的累计耗时us，导入失败为 None, 全部导入明细, 错误信息)
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PROJECT_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    if proc.returncode != 0 or not rows:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        return None, rows, error
+
+    total_us = None
+    for name, _, cumulative_us in rows:
+        if name.strip() == module:
+            total_us = cumulative_us
+    return total_us, rows, ""
+
+
+def top_imports(rows: List[Tuple[str, int, int]], n: int) -> List[Tuple[str, int, int]]:
+    """按模块自身耗时排序，取前 n 个"""
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="python -X importtime 导入耗时基准")
+    parser.add_argument("-m", "--modules", nargs="+", default=DEFAULT_MODULES, help="要测量的模块")
+    parser.add_argument("--top", type=int, default=10, help="每个模块列出自身耗时最高的 N 个子模块 (默认: 10)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="导入耗时预算(毫秒)，超过则返回非0")
+    args = parser.parse_args()
+
+    results: Dict[str, Optional[int]] = {}
+    for module in args.modules:
+        total_us, rows, error = measure_module(module)
+        results[module] = total_us
+        print(f"=== {module} ===")
+        if total_us is None:
+            print(f"  导入失败: {error}")
+            continue
+        print(f"  总耗时: {total_us / 1000:.1f} ms，共导入 {len(rows)} 个模块")
+        for name, self_us, cumulative_us in top_imports(rows, args.top):
+            print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name.strip()}")
+
+    print()
+    print(f"{'module':45s} {'import ms':>10s}")
+    over_budget = []
+    for module, total_us in results.items():
+        value = "failed" if total_us is None else f"{total_us / 1000:.1f}"
+        print(f"{module:45s} {value:>10s}")
+        if args.budget_ms is not None and total_us is not None and total_us / 1000 > args.budget_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"超过预算 {args.budget_ms} ms: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+L2 更新回调基准: 逐档 on_update vs 每帧一次 on_updates_batch
+
+在单个线程(单核)上用合成的 Lighter order_book 消息驱动 LighterDepthReceiver 的解析路径
+(含 json 解码)，统计每秒处理的价格档位数。
+
+    per-level        on_update，每档一个 TardisL2Update 对象、一次回调
+    per-level+csv    同上，并生成 CSV 行 (DailyCSVWriter.write 的格式化部分)
+    batch            on_updates_batch，每帧一个 L2UpdateBatch
+    batch+csv        同上，并生成整批 CSV 文本
+    batch+numpy      同上，并转换为 NumPy 结构化数组 (需要安装 numpy)
+    batch+typed      on_updates_batch + msgspec 结构解码 (需要安装 msgspec)
+
+--json-backend 指定 JSON 解码实现 (orjson/msgspec/json)，默认自动选择。
+
+用法:
+    python benchmarks/l2_batch_bench.py
+    python benchmarks/l2_batch_bench.py --levels 20 --snapshot-ratio 0.01 --seconds 3
+    python benchmarks/l2_batch_bench.py --json-backend json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lighter_receiver import LighterDepthReceiver
+from receiver_common.json_codec import get_codec
+
+
+def make_frames(count: int, levels: int, snapshot_ratio: float, seed: int = 7) -> List[str]:
+    """生成 Lighter update/order_book 和 subscribed/order_book 消息"""
+    rng = random.Random(seed)
+    frames = []
+    for i in range(count):
+        is_snapshot = rng.random() < snapshot_ratio
+        n = levels * 10 if is_snapshot else levels
+        mid = 3000 + rng.uniform(-5, 5)
+        bids = [{"price": f"{mid - (k + 1) * 0.01:.2f}", "size": f"{rng.uniform(0, 10):.4f}"} for k in range(n)]
+        asks = [{"price": f"{mid + (k + 1) * 0.01:.2f}", "size": f"{rng.uniform(0, 10):.4f}"} for k in range(n)]
+        frames.append(json.dumps({
+            "type": "subscribed/order_book" if is_snapshot else "update/order_book",
+            "channel": "order_book:0",
+            "offset": i,
+            "order_book": {"code": 0, "asks": asks, "bids": bids, "offset": i},
+            "timestamp": 1765000000000 + i,
+        }))
+    return frames
+
+
+def run(receiver: LighterDepthReceiver, frames: List[str], seconds: float) -> float:
+    """返回每秒处理的价格档位数"""
+    counter = [0]
+    if receiver.on_update:
+        inner = receiver.on_update
+
+        def on_update(update):
+            counter[0] += 1
+            inner(update)
+        receiver.on_update = on_update
+    if receiver.on_updates_batch:
+        inner_batch = receiver.on_updates_batch
+
+        def on_updates_batch(batch):
+            counter[0] += len(batch)
+            inner_batch(batch)
+        receiver.on_updates_batch = on_updates_batch
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    recv_ts_us = int(time.time() * 1_000_000)
+    while time.perf_counter() < deadline:
+        for frame in frames:
+            receiver._process_message(frame, None, recv_ts_us)
+    return counter[0] / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="L2 逐档回调 vs 批量回调基准")
+    parser.add_argument("--frames", type=int, default=2000, help="合成消息数量 (默认: 2000)")
+    parser.add_argument("--levels", type=int, default=10, help="增量消息每边档位数，快照为 10 倍 (默认: 10)")
+    parser.add_argument("--snapshot-ratio", type=float, default=0.0, help="快照消息比例 (默认: 0)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="每项运行时长 (默认: 2s)")
+    parser.add_argument("--json-backend", type=str, default=None, choices=["orjson", "msgspec", "json"], help="JSON 解码实现 (默认: 自动选择)")
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.levels, args.snapshot_ratio)
+    noop: Callable = lambda item: None
+
+    methods = {
+        "per-level": {"on_update": noop},
+        "per-level+csv": {"on_update": lambda u: u.to_csv_row() + "\n"},
+        "batch": {"on_updates_batch": noop},
+        "batch+csv": {"on_updates_batch": lambda b: b.to_csv()},
+    }
+    try:
+        import numpy  # noqa: F401
+        methods["batch+numpy"] = {"on_updates_batch": lambda b: b.to_numpy()}
+    except ImportError:
+        print("numpy 未安装，跳过 batch+numpy")
+    try:
+        import msgspec  # noqa: F401
+        methods["batch+typed"] = {"on_updates_batch": noop, "typed": True}
+    except ImportError:
+        print("msgspec 未安装，跳过 batch+typed")
+
+    codec = get_codec(args.json_backend)
+    print(f"json backend: {codec.name}")
+    print(f"{'method':16s} {'updates/s/core':>16s} {'speedup':>8s}")
+    baseline = None
+    for name, callbacks in methods.items():
+        receiver = LighterDepthReceiver(market_ids=[0], market_symbol_map={0: "ETHUSDT"})
+        receiver.codec = codec
+        callbacks = dict(callbacks)
+        if callbacks.pop("typed", False):
+            receiver.enable_typed_decode()
+        for attr, func in callbacks.items():
+            setattr(receiver, attr, func)
+        rate = run(receiver, frames, args.seconds)
+        baseline = baseline or rate
+        print(f"{name:16s} {rate:16.0f} {rate / baseline:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
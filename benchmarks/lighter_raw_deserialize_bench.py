@@ -0,0 +1,225 @@
+"""
+Lighter REST 响应反序列化基准: pydantic 模型 vs raw dict 快速路径
+
+对比以下几种方式解析同一份响应并读取适配器关心的字段:
+    model        json.loads + lighter.models.X.from_dict (需要安装 lighter)
+    raw-json     json.loads + raw_accessors
+    raw-orjson   orjson.loads + raw_accessors (需要安装 orjson)
+
+用法:
+    # 先抓取真实响应到目录 (orderBookOrders / account，不需要鉴权)
+    python benchmarks/lighter_raw_deserialize_bench.py --capture ./captured --market 0 --account-index 1
+    # 在抓取的响应上跑基准
+    python benchmarks/lighter_raw_deserialize_bench.py --responses-dir ./captured
+    # 没有抓取数据时使用结构相同的合成响应
+    python benchmarks/lighter_raw_deserialize_bench.py
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import urllib.request
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lighter_my import raw_accessors
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BASE_URL = "https://mainnet.zklighter.elliot.ai"
+
+# 文件名前缀 -> (响应类型, 读取热点字段的函数)
+RESPONSE_KINDS: Dict[str, Tuple[str, Callable]] = {
+    "orderBookOrders": (raw_accessors.ORDER_BOOK_ORDERS, raw_accessors.order_book_top),
+    "accountActiveOrders": (raw_accessors.ORDERS, raw_accessors.orders),
+    "account": (raw_accessors.DETAILED_ACCOUNTS, lambda data: raw_accessors.position_qty(data, 0)),
+}
+
+
+def capture(output_dir: str, market: int, account_index: int):
+    """抓取不需要鉴权的真实响应"""
+    os.makedirs(output_dir, exist_ok=True)
+    urls = {
+        "orderBookOrders": f"{BASE_URL}/api/v1/orderBookOrders?market_id={market}&limit=100",
+        "account": f"{BASE_URL}/api/v1/account?by=index&value={account_index}",
+    }
+    for kind, url in urls.items():
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            body = resp.read()
+        path = os.path.join(output_dir, f"{kind}_{int(time.time())}.json")
+        with open(path, "wb") as f:
+            f.write(body)
+        print(f"saved {path} ({len(body)} bytes)")
+
+
+def synthetic_responses() -> Dict[str, List[bytes]]:
+    """生成与真实响应结构一致的合成数据"""
+    rng = random.Random(7)
+
+    def order(i: int, is_ask: bool, mid: float) -> dict:
+        price = mid + (1 if is_ask else -1) * (i // 2 + 1) * 0.01
+        return {
+            "order_index": 281474976710656 + i,
+            "order_id": str(281474976710656 + i),
+            "client_order_index": 1765000000000 + i,
+            "client_order_id": str(1765000000000 + i),
+            "market_index": 0,
+            "owner_account_index": 100 + i,
+            "initial_base_amount": f"{rng.uniform(0.01, 5):.4f}",
+            "price": f"{price:.2f}",
+            "nonce": 1000 + i,
+            "remaining_base_amount": f"{rng.uniform(0.01, 5):.4f}",
+            "is_ask": is_ask,
+            "base_size": 100,
+            "base_price": int(price * 100),
+            "filled_base_amount": "0.0000",
+            "filled_quote_amount": "0.000000",
+            "side": "ask" if is_ask else "bid",
+            "type": "limit",
+            "time_in_force": "good-till-time",
+            "reduce_only": False,
+            "trigger_price": "0.00",
+            "order_expiry": 1767000000000,
+            "status": "open",
+            "trigger_status": "na",
+            "trigger_time": 0,
+            "parent_order_index": 0,
+            "parent_order_id": "0",
+            "to_trigger_order_id_0": "0",
+            "to_trigger_order_id_1": "0",
+            "to_cancel_order_id_0": "0",
+            "block_height": 5000000 + i,
+            "timestamp": 1765000000 + i,
+        }
+
+    book = {
+        "code": 200,
+        "total_asks": 100,
+        "asks": [order(i, True, 3000.0) for i in range(100)],
+        "total_bids": 100,
+        "bids": [order(i, False, 3000.0) for i in range(100)],
+    }
+    active = {"code": 200, "next_cursor": "", "orders": [order(i, i % 2 == 0, 3000.0) for i in range(20)]}
+    positions = [
+        {
+            "market_id": m,
+            "symbol": f"SYM{m}",
+            "initial_margin_fraction": "10.00",
+            "open_order_count": 0,
+            "pending_order_count": 0,
+            "position_tied_order_count": 0,
+            "sign": 1 if m % 2 else -1,
+            "position": f"{rng.uniform(0, 10):.4f}",
+            "avg_entry_price": f"{rng.uniform(1, 3000):.2f}",
+            "position_value": f"{rng.uniform(0, 30000):.6f}",
+            "unrealized_pnl": "0.000000",
+            "realized_pnl": "0.000000",
+            "liquidation_price": "0",
+            "margin_mode": 0,
+            "allocated_margin": "0.000000",
+        }
+        for m in range(60)
+    ]
+    account = {
+        "code": 200,
+        "total": 1,
+        "accounts": [{
+            "code": 0,
+            "account_type": 0,
+            "index": 1,
+            "l1_address": "0x0000000000000000000000000000000000000000",
+            "cancel_all_time": 0,
+            "total_order_count": 0,
+            "total_isolated_order_count": 0,
+            "pending_order_count": 0,
+            "available_balance": "1000.000000",
+            "status": 1,
+            "collateral": "1000.000000",
+            "account_index": 1,
+            "name": "",
+            "description": "",
+            "can_invite": True,
+            "referral_points_percentage": "",
+            "positions": positions,
+            "total_asset_value": "1000.000000",
+            "cross_asset_value": "1000.000000",
+            "pool_info": None,
+            "shares": [],
+        }],
+    }
+    return {
+        "orderBookOrders": [json.dumps(book).encode()],
+        "accountActiveOrders": [json.dumps(active).encode()],
+        "account": [json.dumps(account).encode()],
+    }
+
+
+def load_responses(responses_dir: str) -> Dict[str, List[bytes]]:
+    responses: Dict[str, List[bytes]] = {kind: [] for kind in RESPONSE_KINDS}
+    for name in sorted(os.listdir(responses_dir)):
+        kind = name.split("_", 1)[0]
+        if kind in responses and name.endswith(".json"):
+            with open(os.path.join(responses_dir, name), "rb") as f:
+                responses[kind].append(f.read())
+    return {kind: bodies for kind, bodies in responses.items() if bodies}
+
+
+def bench(func: Callable[[bytes], object], bodies: List[bytes], seconds: float) -> float:
+    """返回每秒处理的响应数"""
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for body in bodies:
+            func(body)
+        count += len(bodies)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lighter 响应反序列化基准")
+    parser.add_argument("--responses-dir", type=str, default=None, help="抓取的响应目录 (文件名: <kind>_*.json)")
+    parser.add_argument("--capture", type=str, default=None, help="抓取真实响应到该目录后退出")
+    parser.add_argument("--market", type=int, default=0, help="抓取 orderBookOrders 的市场ID (默认: 0)")
+    parser.add_argument("--account-index", type=int, default=1, help="抓取 account 的账户索引 (默认: 1)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="每项基准运行时长 (默认: 1s)")
+    args = parser.parse_args()
+
+    if args.capture:
+        capture(args.capture, args.market, args.account_index)
+        return
+
+    responses = load_responses(args.responses_dir) if args.responses_dir else synthetic_responses()
+
+    try:
+        import lighter.models as lighter_models
+    except ImportError:
+        lighter_models = None
+        print("lighter 未安装，跳过 model 基准")
+
+    print(f"{'endpoint':22s} {'method':12s} {'resp/s':>12s} {'speedup':>8s}")
+    for kind, bodies in responses.items():
+        response_type, accessor = RESPONSE_KINDS[kind]
+        methods: Dict[str, Callable[[bytes], object]] = {}
+        if lighter_models is not None:
+            model_cls = getattr(lighter_models, response_type)
+            methods["model"] = lambda body, cls=model_cls: cls.from_dict(json.loads(body))
+        methods["raw-json"] = lambda body, fn=accessor: fn(json.loads(body))
+        if orjson is not None:
+            methods["raw-orjson"] = lambda body, fn=accessor: fn(orjson.loads(body))
+
+        baseline = None
+        for name, func in methods.items():
+            rate = bench(func, bodies, args.seconds)
+            baseline = baseline or rate
+            print(f"{kind:22s} {name:12s} {rate:12.0f} {rate / baseline:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+接收器最大吞吐基准: 本地替身服务器尽快推送，统计接收器每秒处理的消息数
+
+在同一进程的后台线程里启动 receiver_common.standin_server，用 LighterDepthReceiver 分别以
+websocket-client 线程 (receiver.start) 和 asyncio 采集器 (AsyncCollector) 两种方式连接，
+回调只计数，不写盘。服务器和接收器共用一个 GIL，结果偏保守，主要用于对比不同实现。
+
+    thread      BaseWSReceiver.start()，websocket-client
+    asyncio     AsyncCollector，websockets (安装了 uvloop 时使用 uvloop)
+
+需要安装 websockets 和 websocket-client。
+
+用法:
+    python benchmarks/standin_load_bench.py
+    python benchmarks/standin_load_bench.py --markets 4 --levels 20 --seconds 10
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lighter_receiver import LighterDepthReceiver
+from receiver_common.collector import AsyncCollector
+from receiver_common.standin_server import StandInServer
+
+
+def run(driver: str, server: StandInServer, market_ids, seconds: float) -> float:
+    """返回接收器每秒处理的消息数"""
+    counter = [0]
+
+    def on_updates_batch(batch):
+        counter[0] += 1
+
+    receiver = LighterDepthReceiver(market_ids=market_ids, ws_url=server.url, reconnect_interval=0.5)
+    receiver.on_updates_batch = on_updates_batch
+    if driver == "asyncio":
+        collector = AsyncCollector([receiver])
+        thread = threading.Thread(target=collector.run, daemon=True)
+        stop = collector.stop
+    else:
+        thread = threading.Thread(target=receiver.start, daemon=True)
+        stop = receiver.stop
+    thread.start()
+
+    # 等连接建立、快照收到后再计时
+    time.sleep(1.0)
+    start_count, start = counter[0], time.perf_counter()
+    time.sleep(seconds)
+    rate = (counter[0] - start_count) / (time.perf_counter() - start)
+    stop()
+    thread.join(5)
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="接收器最大吞吐基准 (本地替身服务器)")
+    parser.add_argument("--markets", type=int, default=1, help="订阅的市场数 (默认: 1)")
+    parser.add_argument("--levels", type=int, default=10, help="每条消息每边档位数 (默认: 10)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="每项运行时长 (默认: 5s)")
+    parser.add_argument("--port", type=int, default=18765, help="替身服务器端口 (默认: 18765)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    server = StandInServer(protocol="lighter", port=args.port, rate=0, levels=args.levels, stats_interval=3600)
+    server.start_in_thread()
+    market_ids = list(range(args.markets))
+    try:
+        print(f"{'driver':10s} {'msgs/s':>10s}")
+        for driver in ("thread", "asyncio"):
+            rate = run(driver, server, market_ids, args.seconds)
+            print(f"{driver:10s} {rate:10.0f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
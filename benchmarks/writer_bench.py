@@ -0,0 +1,94 @@
+"""
+CSV 写盘基准: 逐行 gzip 文本写入 vs 缓冲 + 后台压缩的 DailyFileWriter
+
+用合成的 L2 批量更新(每批 --levels 行)驱动写入，统计调用方线程上每秒写入的行数，
+以及 close_all 完成后(全部压缩写盘)的端到端速率。
+
+    legacy           旧实现: 每行 strftime 判断日期、写 gzip.open("wt") 句柄、每 100 行 flush
+    buffered-thread  DailyCSVWriter.write_batch，后台线程压缩
+    buffered-process 同上，压缩放到进程池
+
+用法:
+    python benchmarks/writer_bench.py
+    python benchmarks/writer_bench.py --rows 2000000 --compress-level 1
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lighter_receiver.main import DailyCSVWriter, CSV_HEADER
+from receiver_common.batch import L2UpdateBatch
+
+
+def make_batches(rows: int, levels: int):
+    base_ts = 1765000000_000000
+    batches = []
+    for i in range(rows // levels):
+        ts = base_ts + i * 1000
+        batches.append(L2UpdateBatch(
+            "lighter", "ETHUSDT", ts, ts + 150, False,
+            ["bid"] * levels,
+            [f"{3000 - k * 0.01 - i % 7 * 0.01:.2f}" for k in range(levels)],
+            [f"{(i + k) % 97 * 0.137:.4f}" for k in range(levels)],
+        ))
+    return batches
+
+
+def run_legacy(batches, output_dir: str, compress_level: int) -> float:
+    """旧 DailyCSVWriter.write 的热路径"""
+    f = gzip.open(os.path.join(output_dir, "legacy.csv.gz"), "wt", encoding="utf-8", compresslevel=compress_level)
+    f.write(CSV_HEADER)
+    count = 0
+    start = time.perf_counter()
+    for batch in batches:
+        prefix = f"{batch.exchange},{batch.symbol},{batch.timestamp},{batch.local_timestamp},false,"
+        for side, price, amount in zip(batch.sides, batch.prices, batch.amounts):
+            datetime.fromtimestamp(batch.timestamp / 1_000_000, tz=timezone.utc).strftime("%Y-%m-%d")
+            f.write(f"{prefix}{side},{price},{amount}\n")
+            count += 1
+            if count % 100 == 0:
+                f.flush()
+    f.close()
+    return time.perf_counter() - start
+
+
+def run_buffered(batches, output_dir: str, compress_level: int, compress_mode: str):
+    writer = DailyCSVWriter(output_dir, compress_level=compress_level, compress_mode=compress_mode, log_interval=3600)
+    start = time.perf_counter()
+    for batch in batches:
+        writer.write_batch(batch)
+    caller = time.perf_counter() - start
+    writer.close_all()
+    return caller, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="逐行 gzip 写入 vs 缓冲后台压缩写入基准")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="写入行数 (默认: 1000000)")
+    parser.add_argument("--levels", type=int, default=20, help="每批行数 (默认: 20)")
+    parser.add_argument("--compress-level", type=int, default=6, help="gzip 压缩级别 (默认: 6)")
+    args = parser.parse_args()
+
+    batches = make_batches(args.rows, args.levels)
+    rows = len(batches) * args.levels
+    output_dir = tempfile.mkdtemp(prefix="writer_bench_")
+    try:
+        print(f"{'method':18s} {'caller rows/s':>14s} {'end-to-end rows/s':>18s}")
+        elapsed = run_legacy(batches, output_dir, args.compress_level)
+        print(f"{'legacy':18s} {rows / elapsed:14.0f} {rows / elapsed:18.0f}")
+        for mode in ("thread", "process"):
+            caller, total = run_buffered(batches, os.path.join(output_dir, mode), args.compress_level, mode)
+            print(f"{'buffered-' + mode:18s} {rows / caller:14.0f} {rows / total:18.0f}")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,14 +17,6 @@ from collections import defaultdict
 import sys
 sys.path.append(r".")
 
-try:
-    import lighter
-except ImportError as e:
-    logging.warning("未检测到lighter包，请确保已正确安装lighter模块。")
-    # raise ImportError(
-    #     "无法导入lighter包，请确保已正确安装lighter模块。"
-    # ) from e
-
 from src.data_types import (
     BookTicker,
     Depth,
@@ -36,9 +28,16 @@ from src.data_types import (
     UmAccountInfo,
 )
 from src.enums import OrderStatus
-from src.utils import retry_wrapper, adjust_to_price_filter, adjust_to_lot_size
+from src.utils import retry_wrapper, adjust_to_price_filter, adjust_to_lot_size, LazyModule
 from src.log_kit import logger
 from src.exchange_adapter import ExchangeAdapter
+from src.shared_cache import get_shared_cache
+
+# 交易所元数据在本机共享缓存中的有效期(秒)
+EXCHANGE_INFO_CACHE_TTL = 60 * 60
+
+# lighter 包会加载整套 pydantic 模型和签名库，延迟到第一次签名操作时再导入
+lighter = LazyModule("lighter")
 
 
 class LightAdapter(ExchangeAdapter):
@@ -46,13 +45,22 @@ class LightAdapter(ExchangeAdapter):
     lighter交易所适配器实现
     """
     
-    def __init__(self, l1_address: str, apikey_private_key: str, api_key_index: int, proxy: str = None):
+    def __init__(self, l1_address: str, apikey_private_key: str, api_key_index: int, proxy: str = None,
+                 market_data_only: bool = False, bbo_board: str = None):
+        """
+        Args:
+            market_data_only: 只使用行情接口，跳过账户索引探测(需要签名下测试单)，不会导入 lighter 签名库；
+                此时调用账户和交易方法会抛出 RuntimeError
+            bbo_board: 本机共享内存看板名称 (receiver_common/collector_main.py --bbo-board)，
+                设置后 get_orderbook_ticker 优先从看板读取
+        """
         self.base_url = "https://mainnet.zklighter.elliot.ai"
 
         self.l1_address = l1_address
         self.apikey_private_key = apikey_private_key
         self.api_key_index = api_key_index
         self.headers = {"accept": "application/json"}
+        self.market_data_only = market_data_only
         self.account_index = 1
         self.exchange_name = "lighter"
         if proxy == "local":
@@ -85,19 +93,38 @@ class LightAdapter(ExchangeAdapter):
         assert len(price_decimal_dic) > 0, "get_exchange_info error"
         assert len(size_decimal_dic) > 0, "get_exchange_info error"
         
+        # 跟踪已设置 margin mode 的 symbol，避免重复设置
+        self._margin_mode_set = set()
+        # 默认使用全仓模式，即 lighter.SignerClient.CROSS_MARGIN_MODE，这里不访问以免提前导入 lighter
+        self.default_margin_mode = 0  # 0: 全仓, 1: 逐仓
+        self.default_leverage = 10  # 默认杠杆倍数
+
+        self.bbo_board = None
+        if bbo_board:
+            from receiver_common.bbo_board import BBOBoardReader
+            self.bbo_board = BBOBoardReader(bbo_board)
+
+        if market_data_only:
+            self.account_index = None
+            return
+
         # 获得账户信息
         # self.get_account_info()
         # assert self.account_index >= 0, "get_account_info error"
         self.account_index = self.get_account_index()
         assert self.account_index >= 0, "get_account_index error"
         logger.info(f"get_account_index success, account_index: {self.account_index}")
-
-        # 跟踪已设置 margin mode 的 symbol，避免重复设置
-        self._margin_mode_set = set()
-        # 默认使用全仓模式
-        self.default_margin_mode = lighter.SignerClient.CROSS_MARGIN_MODE  # 0: 全仓, 1: 逐仓
-        self.default_leverage = 10  # 默认杠杆倍数
     
+    @property
+    def account_index(self) -> int:
+        if self._account_index is None:
+            raise RuntimeError("LightAdapter created with market_data_only=True has no account; account and trading methods are unavailable")
+        return self._account_index
+
+    @account_index.setter
+    def account_index(self, value):
+        self._account_index = value
+
     @retry_wrapper(retries=5, sleep_seconds=1, is_adapter_method=False)
     def get_all_accounts(self):
         """获得所有的地址"""
@@ -374,9 +401,14 @@ class LightAdapter(ExchangeAdapter):
                     # 确保关闭客户端
                     await new_client.close()
             
-            # 使用新的事件循环
-            self.auth_token, self.next_expiry_timestamp = asyncio.run(_create_token_with_new_client())
-            logger.info(f"new token created:{self.auth_token}")
+            # 同一账户的 token 在本机所有进程间共享，只有缓存中没有可用 token 时才创建
+            cache_key = f"lighter_auth_token:{self.account_index}:{self.api_key_index}"
+            self.auth_token, self.next_expiry_timestamp = get_shared_cache().get_or_create_with_expiry(
+                cache_key,
+                lambda: asyncio.run(_create_token_with_new_client()),
+                min_remaining=60 * 60,
+            )
+            logger.info(f"auth token ready:{self.auth_token}")
 
     def get_account_info(self):
         pass
@@ -399,9 +431,8 @@ class LightAdapter(ExchangeAdapter):
         """获得client_order_id"""
         return int(time.time() * 1000)
     
-    # @retry_wrapper(retries=3, sleep_seconds=1, is_adapter_method=False)
-    def get_exchange_info(self):
-        """获得交易所信息"""
+    def _fetch_order_book_details(self) -> list:
+        """请求 orderBookDetails 接口，返回原始的 order_book_details 列表"""
         url = f"{self.base_url}/api/v1/orderBookDetails"
 
         if self.proxy:
@@ -415,27 +446,36 @@ class LightAdapter(ExchangeAdapter):
         if data.status_code == 200:
             js_data = data.json()
             if js_data["code"] == 200:
-                order_book_details = js_data["order_book_details"]
-                market_index_dic = {}
-                price_decimal_dic = {}
-                size_decimal_dic = {}
-                min_base_amount_dic = {}
-
-                for symbol_dic in order_book_details:
-                    symbol = symbol_dic["symbol"] + "USDT"
-                    market_id = int(symbol_dic["market_id"])
-                    size_decimals = int(symbol_dic["size_decimals"])
-                    price_decimals = int(symbol_dic["price_decimals"])
-                    market_index_dic[symbol] = market_id
-                    price_decimal_dic[symbol] = price_decimals
-                    size_decimal_dic[symbol] = size_decimals
-                    min_base_amount_dic[symbol] = float(symbol_dic["min_base_amount"])
-
-                return market_index_dic, price_decimal_dic, size_decimal_dic, min_base_amount_dic
+                return js_data["order_book_details"]
             else:
                 raise Exception("get_exchange_info error")
         else:
             raise Exception("get_exchange_info error")
+
+    # @retry_wrapper(retries=3, sleep_seconds=1, is_adapter_method=False)
+    def get_exchange_info(self):
+        """获得交易所信息，优先读取本机共享缓存"""
+        order_book_details = get_shared_cache().get_or_create(
+            "lighter_order_book_details",
+            self._fetch_order_book_details,
+            ttl=EXCHANGE_INFO_CACHE_TTL,
+        )
+        market_index_dic = {}
+        price_decimal_dic = {}
+        size_decimal_dic = {}
+        min_base_amount_dic = {}
+
+        for symbol_dic in order_book_details:
+            symbol = symbol_dic["symbol"] + "USDT"
+            market_id = int(symbol_dic["market_id"])
+            size_decimals = int(symbol_dic["size_decimals"])
+            price_decimals = int(symbol_dic["price_decimals"])
+            market_index_dic[symbol] = market_id
+            price_decimal_dic[symbol] = price_decimals
+            size_decimal_dic[symbol] = size_decimals
+            min_base_amount_dic[symbol] = float(symbol_dic["min_base_amount"])
+
+        return market_index_dic, price_decimal_dic, size_decimal_dic, min_base_amount_dic
     
 
     @retry_wrapper(retries=5, sleep_seconds=1, is_adapter_method=True)
@@ -449,6 +489,23 @@ class LightAdapter(ExchangeAdapter):
         Returns:
             AdapterResponse: 包含错误信息的响应
         """
+        if self.bbo_board is not None:
+            # 本机采集进程的共享内存看板，数据过期或没有该交易对时再走 REST
+            ticker = self.bbo_board.get(f"lighter:{symbol}")
+            if ticker is not None and ticker.bids and ticker.asks:
+                return AdapterResponse(
+                    success=True,
+                    data=BookTicker(
+                        symbol=symbol,
+                        time=ticker.timestamp // 1000,
+                        bid_price=ticker.bids[0][0],
+                        ask_price=ticker.asks[0][0],
+                        ask_size=ticker.asks[0][1],
+                        bid_size=ticker.bids[0][1],
+                    ),
+                    error_msg=None,
+                )
+
         market_id = self.market_index_dic[symbol]
         url = f"{self.base_url}/api/v1/orderBookOrders?market_id={market_id}&&limit=100"
         if self.proxy:
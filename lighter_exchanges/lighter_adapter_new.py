@@ -14,7 +14,6 @@ from decimal import Decimal
 from logging.handlers import RotatingFileHandler
 import os
 import time
-from collections import defaultdict
 
 import sys
 sys.path.append(r".")
@@ -22,6 +21,8 @@ sys.path.append(r".")
 try:
     import lighter
     from lighter import nonce_manager
+    from lighter_my import raw_accessors
+    from lighter_my.api_client import ApiClient
 except ImportError as e:
     logging.warning("未检测到lighter包，请确保已正确安装lighter模块。")
     # raise ImportError(
@@ -114,7 +115,8 @@ class LightAdapter(ExchangeAdapter):
         if proxy:
             self.configuration.proxy = proxy
             self.configuration.verify_ssl = False
-        self.client = lighter.ApiClient(self.configuration)
+        # 盘口接口直接返回解码后的 dict，跳过 pydantic 模型构建，字段由 raw_accessors 读取
+        self.client = ApiClient(self.configuration, raw_response_types=(raw_accessors.ORDER_BOOK_ORDERS,))
         self.signer_client = None
 
         self.l1_address = l1_address
@@ -329,19 +331,10 @@ class LightAdapter(ExchangeAdapter):
         """
         market_id = self.market_index_dic[symbol]
         api_instance = lighter.OrderApi(self.client)
-        api_response = await api_instance.order_book_orders(market_id, limit)
-        if api_response.code == 200:
-            js_data = api_response.to_dict()
-            bids_dic = defaultdict(float)
-            asks_dic = defaultdict(float)
-            for bid_item in js_data["bids"]:
-                bids_dic[float(bid_item["price"])] += float(bid_item["remaining_base_amount"])
-            for ask_item in js_data["asks"]:
-                asks_dic[float(ask_item["price"])] += float(ask_item["remaining_base_amount"])
-
-            bids_arr = sorted(bids_dic.items(), key=lambda x: x[0], reverse=True)
-            asks_arr = sorted(asks_dic.items(), key=lambda x: x[0])
-            if len(bids_arr) == 0 or len(asks_arr) == 0:
+        js_data = await api_instance.order_book_orders(market_id, limit)
+        if js_data.get("code") == 200:
+            best_bid, best_ask = raw_accessors.order_book_top(js_data)
+            if best_bid is None or best_ask is None:
                 return AdapterResponse(success=False, data=None, error_msg="bids or asks is empty")
             else:
                 return AdapterResponse(
@@ -349,16 +342,16 @@ class LightAdapter(ExchangeAdapter):
                     data=BookTicker(
                         symbol=symbol,
                         time=int(time.time() * 1000),
-                        bid_price=bids_arr[0][0],
-                        ask_price=asks_arr[0][0],
-                        ask_size=asks_arr[0][1],
-                        bid_size=bids_arr[0][1],
+                        bid_price=best_bid.price,
+                        ask_price=best_ask.price,
+                        ask_size=best_ask.size,
+                        bid_size=best_bid.size,
                     ),
                     error_msg=None,
                 )
         else:
-            logger.error(f"获取盘口价格失败: {api_response.message}")
-            return AdapterResponse(success=False, data=None, error_msg=str(api_response.message))
+            logger.error(f"获取盘口价格失败: {js_data.get('message')}")
+            return AdapterResponse(success=False, data=None, error_msg=str(js_data.get("message")))
 
     @retry_wrapper_async(retries=3, sleep_seconds=1, is_adapter_method=True)
     async def get_depth_async(self, symbol: str, limit: int = 100) -> AdapterResponse[Depth]:
@@ -373,18 +366,9 @@ class LightAdapter(ExchangeAdapter):
         """
         market_id = self.market_index_dic[symbol]
         api_instance = lighter.OrderApi(self.client)
-        api_response = await api_instance.order_book_orders(market_id, limit)
-        if api_response.code == 200:
-            js_data = api_response.to_dict()
-            bids_dic = defaultdict(float)
-            asks_dic = defaultdict(float)
-            for bid_item in js_data["bids"]:
-                bids_dic[float(bid_item["price"])] += float(bid_item["remaining_base_amount"])
-            for ask_item in js_data["asks"]:
-                asks_dic[float(ask_item["price"])] += float(ask_item["remaining_base_amount"])
-
-            bids_arr = sorted(bids_dic.items(), key=lambda x: x[0], reverse=True)
-            asks_arr = sorted(asks_dic.items(), key=lambda x: x[0])
+        js_data = await api_instance.order_book_orders(market_id, limit)
+        if js_data.get("code") == 200:
+            bids_arr, asks_arr = raw_accessors.order_book_levels(js_data)
             if len(bids_arr) == 0 or len(asks_arr) == 0:
                 return AdapterResponse(success=False, data=None, error_msg="bids or asks is empty")
             else:
@@ -396,8 +380,8 @@ class LightAdapter(ExchangeAdapter):
                 )
                 return AdapterResponse(success=True, data=depth, error_msg="")
         else:
-            logger.error(f"获取盘口价格失败: {api_response.message}")
-            return AdapterResponse(success=False, data=None, error_msg=str(api_response.message))
+            logger.error(f"获取盘口价格失败: {js_data.get('message')}")
+            return AdapterResponse(success=False, data=None, error_msg=str(js_data.get("message")))
 
     async def place_market_open_order_async(self, symbol: str, side: str, position_side: str, quantity: float, out_price_rate: float = 0.005, is_open: bool = True, retry_times: int = 10) -> AdapterResponse[OrderPlacementResult]:
         """
@@ -22,9 +22,14 @@ import re
 import tempfile
 
 from urllib.parse import quote
-from typing import Tuple, Optional, List, Dict, Union
+from typing import Tuple, Optional, List, Dict, Union, Iterable
 from pydantic import SecretStr
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from lighter.configuration import Configuration
 from lighter.api_response import ApiResponse, T as ApiResponseT
 import lighter.models
@@ -41,6 +46,16 @@ from lighter.exceptions import (
 
 RequestSerialized = Tuple[str, str, Dict[str, str], Optional[str], List[str]]
 
+RAW_ALL_RESPONSE_TYPES = "*"
+
+
+def fast_json_loads(data: Union[str, bytes, bytearray]):
+    """Decode JSON with orjson when it is installed, falling back to the stdlib."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class ApiClient:
     """Generic API client for OpenAPI client library builds.
 
@@ -55,6 +70,10 @@ class ApiClient:
         the API.
     :param cookie: a cookie to include in the header when making calls
         to the API
+    :param raw_response_types: response type names (e.g. "OrderBookOrders")
+        that are returned as decoded JSON (dict/list) instead of pydantic
+        models. Use "*" for every response type.
+    :param fast_json: decode responses with orjson when it is installed.
     """
 
     PRIMITIVE_TYPES = (float, bool, bytes, str, int)
@@ -75,7 +94,9 @@ class ApiClient:
         configuration=None,
         header_name=None,
         header_value=None,
-        cookie=None
+        cookie=None,
+        raw_response_types: Optional[Iterable[str]] = None,
+        fast_json: bool = True,
     ) -> None:
         # use default configuration if none is provided
         if configuration is None:
@@ -90,6 +111,8 @@ class ApiClient:
         # Set default User-Agent.
         self.user_agent = 'OpenAPI-Generator/1.0.0/python'
         self.client_side_validation = configuration.client_side_validation
+        self.raw_response_types = set(raw_response_types or ())
+        self.fast_json = fast_json
 
     async def __aenter__(self):
         return self
@@ -112,6 +135,30 @@ class ApiClient:
     def set_default_header(self, header_name, header_value):
         self.default_headers[header_name] = header_value
 
+    def enable_raw_responses(self, *response_types: str):
+        """Return the given response types as decoded JSON, skipping model construction.
+
+        Without arguments every response type is returned raw.
+        """
+        self.raw_response_types.update(response_types or (RAW_ALL_RESPONSE_TYPES,))
+
+    def disable_raw_responses(self, *response_types: str):
+        """Go back to model deserialization for the given (or all) response types."""
+        if response_types:
+            self.raw_response_types.difference_update(response_types)
+        else:
+            self.raw_response_types.clear()
+
+    def is_raw_response_type(self, response_type) -> bool:
+        if not self.raw_response_types or not isinstance(response_type, str):
+            return False
+        return RAW_ALL_RESPONSE_TYPES in self.raw_response_types or response_type in self.raw_response_types
+
+    def _json_loads(self, data):
+        if self.fast_json:
+            return fast_json_loads(data)
+        return json.loads(data)
+
 
     _default = None
 
@@ -310,14 +357,24 @@ class ApiClient:
                 return_data = response_data.data
             elif response_type == "file":
                 return_data = self.__deserialize_file(response_data)
+            elif self.is_raw_response_type(response_type):
+                # raw mode: decode the body straight into dict/list, no pydantic models;
+                # the text is only decoded for error responses and invalid JSON
+                if not 200 <= response_data.status <= 299:
+                    response_text = self.__response_text(response_data, "replace")
+                try:
+                    return_data = self._json_loads(response_data.data) if response_data.data else None
+                except ValueError as e:
+                    if response_text is None:
+                        response_text = self.__response_text(response_data, "replace")
+                    raise ApiException(
+                        status=response_data.status,
+                        reason="Invalid JSON response: {0}".format(e),
+                        body=response_text,
+                    )
             elif response_type is not None:
-                match = None
-                content_type = response_data.getheader('content-type')
-                if content_type is not None:
-                    match = re.search(r"charset=([a-zA-Z\-\d]+)[\s;]?", content_type)
-                encoding = match.group(1) if match else "utf-8"
-                response_text = response_data.data.decode(encoding)
-                return_data = self.deserialize(response_text, response_type, content_type)
+                response_text = self.__response_text(response_data)
+                return_data = self.deserialize(response_text, response_type, response_data.getheader('content-type'))
         finally:
             if not 200 <= response_data.status <= 299:
                 raise ApiException.from_response(
@@ -333,6 +390,15 @@ class ApiClient:
             raw_data = response_data.data
         )
 
+    def __response_text(self, response_data: rest.RESTResponse, errors: str = "strict") -> str:
+        """Decodes the response body with the charset of its content type."""
+        match = None
+        content_type = response_data.getheader('content-type')
+        if content_type is not None:
+            match = re.search(r"charset=([a-zA-Z\-\d]+)[\s;]?", content_type)
+        encoding = match.group(1) if match else "utf-8"
+        return response_data.data.decode(encoding, errors)
+
     def sanitize_for_serialization(self, obj):
         """Builds a JSON POST object.
 
@@ -399,14 +465,14 @@ class ApiClient:
         # fetch data from response object
         if content_type is None:
             try:
-                data = json.loads(response_text)
+                data = self._json_loads(response_text)
             except ValueError:
                 data = response_text
         elif content_type.startswith("application/json"):
             if response_text == "":
                 data = ""
             else:
-                data = json.loads(response_text)
+                data = self._json_loads(response_text)
         elif content_type.startswith("text/plain"):
             data = response_text
         else:
@@ -0,0 +1,161 @@
+"""
+Lightweight typed accessors over raw (decoded JSON) Lighter responses.
+
+Used together with ``ApiClient(raw_response_types=...)`` so that hot endpoints
+skip pydantic model construction and only the fields the adapter needs are
+converted.
+
+Example:
+    api_client = ApiClient(configuration, raw_response_types=HOT_RESPONSE_TYPES)
+    data = await OrderApi(api_client).order_book_orders(market_id=0, limit=100)
+    best_bid, best_ask = order_book_top(data)
+"""
+
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# response types of orderBookOrders, accountActiveOrders/accountInactiveOrders and account
+ORDER_BOOK_ORDERS = "OrderBookOrders"
+ORDERS = "Orders"
+DETAILED_ACCOUNTS = "DetailedAccounts"
+HOT_RESPONSE_TYPES = (ORDER_BOOK_ORDERS, ORDERS, DETAILED_ACCOUNTS)
+
+
+class BookLevel(NamedTuple):
+    price: float
+    size: float
+
+
+class RawOrder(NamedTuple):
+    order_index: int
+    client_order_index: int
+    market_index: int
+    is_ask: bool
+    price: float
+    initial_base_amount: float
+    remaining_base_amount: float
+    filled_base_amount: float
+    filled_quote_amount: float
+    status: str
+    timestamp: int
+
+
+class RawPosition(NamedTuple):
+    market_id: int
+    symbol: str
+    sign: int
+    position: float
+    avg_entry_price: float
+    position_value: float
+    initial_margin_fraction: float
+
+
+class RawAccount(NamedTuple):
+    index: int
+    collateral: float
+    cross_asset_value: float
+    positions: List[RawPosition]
+
+
+def _aggregate_levels(orders: List[dict], reverse: bool) -> List[BookLevel]:
+    """Sum remaining_base_amount per price and sort (reverse=True for bids)."""
+    sizes: Dict[float, float] = defaultdict(float)
+    for item in orders:
+        sizes[float(item["price"])] += float(item["remaining_base_amount"])
+    return [BookLevel(price, size) for price, size in sorted(sizes.items(), reverse=reverse)]
+
+
+def order_book_levels(data: dict) -> Tuple[List[BookLevel], List[BookLevel]]:
+    """orderBookOrders -> (bids high to low, asks low to high), aggregated by price."""
+    return _aggregate_levels(data.get("bids", []), True), _aggregate_levels(data.get("asks", []), False)
+
+
+def order_book_top(data: dict) -> Tuple[Optional[BookLevel], Optional[BookLevel]]:
+    """orderBookOrders -> (best bid, best ask); a side is None when empty.
+
+    Only the best price is aggregated, so this is a single pass over each side.
+    """
+    def best(orders: List[dict], is_bid: bool) -> Optional[BookLevel]:
+        best_price = None
+        best_size = 0.0
+        for item in orders:
+            price = float(item["price"])
+            if best_price is None or (price > best_price if is_bid else price < best_price):
+                best_price = price
+                best_size = float(item["remaining_base_amount"])
+            elif price == best_price:
+                best_size += float(item["remaining_base_amount"])
+        return BookLevel(best_price, best_size) if best_price is not None else None
+
+    return best(data.get("bids", []), True), best(data.get("asks", []), False)
+
+
+def _to_order(item: dict) -> RawOrder:
+    return RawOrder(
+        order_index=int(item.get("order_index", 0)),
+        client_order_index=int(item.get("client_order_index", item.get("client_order_id", 0))),
+        market_index=int(item.get("market_index", 0)),
+        is_ask=bool(item.get("is_ask", False)),
+        price=float(item.get("price", 0)),
+        initial_base_amount=float(item.get("initial_base_amount", 0)),
+        remaining_base_amount=float(item.get("remaining_base_amount", 0)),
+        filled_base_amount=float(item.get("filled_base_amount", 0)),
+        filled_quote_amount=float(item.get("filled_quote_amount", 0)),
+        status=item.get("status", ""),
+        timestamp=int(item.get("timestamp", 0)),
+    )
+
+
+def orders(data: dict) -> List[RawOrder]:
+    """accountActiveOrders / accountInactiveOrders -> list of RawOrder."""
+    return [_to_order(item) for item in data.get("orders", [])]
+
+
+def find_order(data: dict, client_order_index) -> Optional[RawOrder]:
+    """Find one order by client order index without converting the others."""
+    target = str(client_order_index)
+    for item in data.get("orders", []):
+        if str(item.get("client_order_index", item.get("client_order_id"))) == target:
+            return _to_order(item)
+    return None
+
+
+def account(data: dict, position: int = 0) -> Optional[RawAccount]:
+    """account -> RawAccount of accounts[position], None when missing."""
+    accounts = data.get("accounts", [])
+    if len(accounts) <= position:
+        return None
+    item = accounts[position]
+    return RawAccount(
+        index=int(item.get("index", 0)),
+        collateral=float(item.get("collateral", 0)),
+        cross_asset_value=float(item.get("cross_asset_value", 0)),
+        positions=[
+            RawPosition(
+                market_id=int(pos.get("market_id", 0)),
+                symbol=pos.get("symbol", ""),
+                sign=int(pos.get("sign", 0)),
+                position=float(pos.get("position", 0)),
+                avg_entry_price=float(pos.get("avg_entry_price", 0)),
+                position_value=float(pos.get("position_value", 0)),
+                initial_margin_fraction=float(pos.get("initial_margin_fraction", 0)),
+            )
+            for pos in item.get("positions", [])
+        ],
+    )
+
+
+def position_qty(data: dict, market_id: int) -> Tuple[float, float]:
+    """account -> (long_qty, short_qty) for one market."""
+    long_qty = 0.0
+    short_qty = 0.0
+    accounts = data.get("accounts", [])
+    if not accounts:
+        return long_qty, short_qty
+    for pos in accounts[0].get("positions", []):
+        if pos.get("market_id") == market_id:
+            if pos.get("sign") == 1:
+                long_qty = float(pos["position"])
+            else:
+                short_qty = float(pos["position"])
+    return long_qty, short_qty
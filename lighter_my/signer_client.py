@@ -6,7 +6,7 @@ import platform
 import logging
 import os
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from eth_account import Account
 from eth_account.messages import encode_defunct
@@ -245,6 +245,11 @@ class SignerClient:
     GROUPING_TYPE_ONE_CANCELS_THE_OTHER = 2
     GROUPING_TYPE_ONE_TRIGGERS_A_ONE_CANCELS_THE_OTHER = 3
 
+    # tx kinds accepted by sign_batch
+    BATCH_TX_CREATE_ORDER = "create_order"
+    BATCH_TX_CANCEL_ORDER = "cancel_order"
+    BATCH_TX_MODIFY_ORDER = "modify_order"
+
     def __init__(
             self,
             url,
@@ -497,6 +502,95 @@ class SignerClient:
     def sign_update_margin(self, market_index: int, usdc_amount: int, direction: int, nonce: int = -1):
         return self.__decode_tx_info(self.TX_TYPE_UPDATE_MARGIN, self.signer.SignUpdateMargin(market_index, usdc_amount, direction, nonce))
 
+    def _sign_batch_item(self, kind: str, params: Dict[str, Any], nonce: int):
+        if kind == self.BATCH_TX_CREATE_ORDER:
+            params = dict(params)
+            params["is_ask"] = int(params["is_ask"])
+            params["reduce_only"] = int(params.get("reduce_only", False))
+            return self.sign_create_order(**params, nonce=nonce)
+        if kind == self.BATCH_TX_CANCEL_ORDER:
+            return self.sign_cancel_order(**params, nonce=nonce)
+        if kind == self.BATCH_TX_MODIFY_ORDER:
+            return self.sign_modify_order(**params, nonce=nonce)
+        raise ValueError(f"unsupported batch tx kind: {kind}")
+
+    def sign_batch(self, txs: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[int], List[str], Optional[str]]:
+        """
+        Sign many create/cancel/modify transactions, ready for send_tx_batch.
+
+        Nonces are assigned up front from the nonce manager (in list order). The
+        signer's active API key is process-global, so txs are grouped per API key and
+        each group is signed after one switch_api_key.
+
+        Signing is deliberately serial: parallel signing on a thread pool is not
+        offered. The bundled signer (signers/*.h) keeps its client and active API key
+        in Go globals, and the matching binary is not part of this tree, so concurrent
+        Sign* calls cannot be checked against it here. The batch saving is one
+        switch_api_key per key and a single sendTxBatch round trip, not multi-core
+        signing.
+
+        :param txs: list of (kind, kwargs), kind is one of BATCH_TX_*, kwargs are the
+            arguments of the matching sign_* method without nonce, e.g.
+            ("cancel_order", {"market_index": 0, "order_index": 123})
+        :return: (tx_types, tx_infos, error), in the same order as txs
+        """
+        if not txs:
+            return [], [], None
+
+        assigned = [self.nonce_manager.next_nonce() for _ in txs]
+        groups: Dict[int, List[int]] = {}
+        for i, (api_key_index, _) in enumerate(assigned):
+            groups.setdefault(api_key_index, []).append(i)
+
+        results: List[Optional[Tuple[int, str, Optional[str]]]] = [None] * len(txs)
+        error = None
+        for api_key_index, indexes in groups.items():
+            err = self.switch_api_key(api_key_index)
+            if err is not None:
+                error = f"error switching api key: {err}"
+                break
+            for i in indexes:
+                try:
+                    results[i] = self._sign_batch_item(txs[i][0], txs[i][1], assigned[i][1])
+                except Exception as e:
+                    results[i] = (None, None, str(e))
+            group_errors = [results[i][2] for i in indexes if results[i][2] is not None]
+            if group_errors:
+                error = group_errors[0]
+                break
+
+        if error is not None:
+            # pre-assigned nonces will not be used, resync every key we took nonces from
+            for api_key_index in groups:
+                self.nonce_manager.hard_refresh_nonce(api_key_index)
+            return [], [], error
+
+        tx_types = [result[0] for result in results]
+        tx_infos = [result[1] for result in results]
+        return tx_types, tx_infos, None
+
+    async def send_tx_batch(self, tx_types: List[int], tx_infos: List[str]):
+        for tx_info in tx_infos:
+            if tx_info[0] != "{":
+                raise Exception(tx_info)
+        return await self.tx_api.send_tx_batch(tx_types=json.dumps(tx_types), tx_infos=json.dumps(tx_infos))
+
+    async def sign_and_send_batch(self, txs: List[Tuple[str, Dict[str, Any]]]):
+        """sign_batch + send_tx_batch; returns (tx_infos, api_response, error)"""
+        tx_types, tx_infos, error = self.sign_batch(txs)
+        if error is not None:
+            return None, None, error
+
+        logging.debug(f"Batch Tx Infos: {len(tx_infos)} txs")
+        try:
+            api_response = await self.send_tx_batch(tx_types, tx_infos)
+        except Exception as e:
+            for api_key_index in range(self.api_key_index, self.end_api_key_index + 1):
+                self.nonce_manager.hard_refresh_nonce(api_key_index)
+            return None, None, trim_exc(str(e))
+        logging.debug(f"Batch Send Tx Response: {api_response}")
+        return tx_infos, api_response, None
+
     @process_api_key_and_nonce
     def create_order(
             self,
@@ -2,6 +2,7 @@ from .data_types import TardisL2Update, TardisL2Snapshot, LighterOrderBookMessag
 from .converter import LighterToTardisConverter
 from .receiver import LighterDepthReceiver
 from .receiver_trades import LighterTradesReceiver
+from .sharded import ShardedLighterReceiver
 
 __all__ = [
     "TardisL2Update",
@@ -11,4 +12,5 @@ __all__ = [
     "LighterDepthReceiver",
     "LighterTrade",
     "LighterTradesReceiver",
+    "ShardedLighterReceiver",
 ]
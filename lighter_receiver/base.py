@@ -0,0 +1,106 @@
+"""
+Lighter WebSocket 公共协议: 订阅、应用层 ping/pong
+
+深度和交易接收器共用，子类只需要提供订阅频道和对应消息的处理。
+运行中可以用 subscribe(market_id) / unsubscribe(market_id) 增减市场，直接在当前连接上发送订阅消息。
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+from receiver_common.base_receiver import BaseWSReceiver
+
+logger = logging.getLogger(__name__)
+
+WS_URL = "wss://mainnet.zklighter.elliot.ai/stream"
+
+# 预先序列化的 pong 回复
+PONG_MESSAGE = '{"type":"pong"}'
+
+
+class LighterStreamReceiver(BaseWSReceiver):
+    """Lighter 接收器基类"""
+
+    # 订阅频道前缀，如 order_book / trade
+    CHANNEL = ""
+
+    def __init__(
+        self,
+        market_ids: List[int],
+        market_symbol_map: Optional[Dict[int, str]] = None,
+        reconnect_interval: float = 5.0,
+        ping_interval: int = 60,
+        ping_timeout: int = 30,
+        heartbeat_timeout: float = 180,
+        ws_url: str = WS_URL,
+    ):
+        super().__init__(ws_url, reconnect_interval, ping_interval, ping_timeout, heartbeat_timeout)
+        self.market_ids = market_ids
+        self.market_symbol_map = market_symbol_map or {}
+        # 运行中退订的市场，退订前已经在路上的消息按它丢弃 (各模式在回调之前检查，不会重新打开已关闭的输出文件)
+        self._unsubscribed: Set[int] = set()
+
+    def _get_subscribe_messages(self) -> List[str]:
+        messages = []
+        for market_id in self.market_ids:
+            messages.append(self._channel_message("subscribe", market_id))
+            logger.info(f"Subscribed to {self.CHANNEL} for market {market_id}")
+        return messages
+
+    def subscribe(self, market_id: int, symbol: Optional[str] = None) -> bool:
+        """运行中订阅一个市场 (可在任意线程调用)，已订阅时返回 False
+
+        未连接时只记录下来，下次连接建立时一起订阅。
+        """
+        if symbol:
+            self.market_symbol_map[market_id] = symbol
+        if market_id in self.market_ids:
+            return False
+        self._unsubscribed.discard(market_id)
+        # 整体替换列表，重连线程遍历的旧列表不受影响
+        self.market_ids = self.market_ids + [market_id]
+        if self._send_live(self._channel_message("subscribe", market_id)):
+            logger.info(f"Subscribed to {self.CHANNEL} for market {market_id}")
+        return True
+
+    def unsubscribe(self, market_id: int) -> bool:
+        """运行中退订一个市场 (可在任意线程调用)，未订阅时返回 False"""
+        if market_id not in self.market_ids:
+            return False
+        self._unsubscribed.add(market_id)
+        self.market_ids = [mid for mid in self.market_ids if mid != market_id]
+        if self._send_live(self._channel_message("unsubscribe", market_id)):
+            logger.info(f"Unsubscribed from {self.CHANNEL} for market {market_id}")
+        return True
+
+    def subscriptions(self) -> Dict[int, str]:
+        """当前订阅的市场 {market_id: symbol}"""
+        return {market_id: self.market_symbol_map.get(market_id, f"MARKET_{market_id}") for market_id in self.market_ids}
+
+    def _channel_message(self, msg_type: str, market_id: int) -> str:
+        """单个市场的 subscribe / unsubscribe 消息"""
+        return self.codec.dumps({"type": msg_type, "channel": f"{self.CHANNEL}/{market_id}"})
+
+    def _handle_control_message(self, message: str, send: Callable[[str], None]) -> bool:
+        # 应用层 ping 消息很短，不需要完整解析；skip_utf8_validation 时文本帧是 bytes
+        if len(message) < 64 and (b'"ping"' if isinstance(message, bytes) else '"ping"') in message:
+            send(PONG_MESSAGE)
+            logger.debug("Received ping, sent pong")
+            return True
+        return False
+
+    def _handle_common_message(self, msg_type: str, data: dict, send: Callable[[str], None]):
+        """处理 ping/pong/error 等非数据消息"""
+        if msg_type == "ping":
+            # 服务器发送应用层 ping，需要回复 pong
+            send(PONG_MESSAGE)
+            logger.debug("Received ping, sent pong")
+        elif msg_type == "pong":
+            logger.debug("Received pong")
+        elif msg_type == "error":
+            logger.error(f"Server error: {data}")
+
+    @staticmethod
+    def _get_market_id(data: dict) -> int:
+        channel = data.get("channel", "")
+        return int(channel.split(":")[1]) if ":" in channel else 0
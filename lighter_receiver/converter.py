@@ -4,6 +4,8 @@ Lighter 数据转换为 Tardis L2 格式
 
 import time
 from typing import List, Dict, Optional
+
+from receiver_common.batch import L2UpdateBatch
 from .data_types import TardisL2Update, TardisL2Snapshot, TardisL2PriceLevel, LighterOrderBookMessage
 
 
@@ -32,9 +34,9 @@ class LighterToTardisConverter:
         else:
             return timestamp * 1_000_000
 
-    def convert_to_snapshot(self, message: LighterOrderBookMessage) -> TardisL2Snapshot:
-        """转换为快照"""
-        local_timestamp = self._get_microseconds_timestamp()
+    def convert_to_snapshot(self, message: LighterOrderBookMessage, local_timestamp: Optional[int] = None) -> TardisL2Snapshot:
+        """转换为快照，local_timestamp 为消息的本地接收时间(微秒)，不传则取当前时间"""
+        local_timestamp = local_timestamp or self._get_microseconds_timestamp()
         exchange_timestamp = self._convert_timestamp(message.timestamp, local_timestamp)
         symbol = self.get_symbol(message.market_index)
 
@@ -53,10 +55,10 @@ class LighterToTardisConverter:
         return snapshot
 
     def convert_to_incremental_updates(
-        self, message: LighterOrderBookMessage, is_first_message: bool = False
+        self, message: LighterOrderBookMessage, is_first_message: bool = False, local_timestamp: Optional[int] = None
     ) -> List[TardisL2Update]:
         """转换为增量更新，直接输出原始变更数据"""
-        local_timestamp = self._get_microseconds_timestamp()
+        local_timestamp = local_timestamp or self._get_microseconds_timestamp()
         exchange_timestamp = self._convert_timestamp(message.timestamp, local_timestamp)
         symbol = self.get_symbol(message.market_index)
 
@@ -89,3 +91,33 @@ class LighterToTardisConverter:
             ))
 
         return updates
+
+    def convert_to_batch(
+        self, market_index: int, order_book: dict, timestamp: int, is_snapshot: bool, local_timestamp: Optional[int] = None
+    ) -> L2UpdateBatch:
+        """直接从 WebSocket 消息的 order_book 字段构建整帧的批量更新，不创建逐档对象"""
+        local_timestamp = local_timestamp or self._get_microseconds_timestamp()
+        return L2UpdateBatch.from_levels(
+            self.EXCHANGE_NAME,
+            self.get_symbol(market_index),
+            self._convert_timestamp(timestamp, local_timestamp),
+            local_timestamp,
+            is_snapshot,
+            order_book.get("bids", []),
+            order_book.get("asks", []),
+        )
+
+    def convert_structs_to_batch(
+        self, market_index: int, bids: list, asks: list, timestamp: int, is_snapshot: bool, local_timestamp: Optional[int] = None
+    ) -> L2UpdateBatch:
+        """从 msgspec 解码的档位结构构建整帧的批量更新 (见 lighter_receiver.schema)"""
+        local_timestamp = local_timestamp or self._get_microseconds_timestamp()
+        return L2UpdateBatch.from_level_structs(
+            self.EXCHANGE_NAME,
+            self.get_symbol(market_index),
+            self._convert_timestamp(timestamp, local_timestamp),
+            local_timestamp,
+            is_snapshot,
+            bids,
+            asks,
+        )
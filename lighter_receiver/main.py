@@ -4,16 +4,24 @@ Lighter DEX 深度数据接收器 - 按天记录到 CSV (Tardis 格式)
 
 import logging
 import argparse
-import gzip
 import sys
 import os
-from datetime import datetime, timezone
-from typing import Dict, Optional
 
 sys.path.append("/home/ec2-user/test_lighter_dex/adapter_exchanges/lighter_receiver")
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from lighter_receiver import LighterDepthReceiver, TardisL2Update
+from lighter_receiver import LighterDepthReceiver, ShardedLighterReceiver, TardisL2Update
+from receiver_common.batch import L2UpdateBatch
+from lighter_receiver.base import WS_URL
+from receiver_common.capture import FrameCapture
+from receiver_common.control import ControlServer, add_control_arguments, register_receivers
+from receiver_common.metrics import add_metrics_arguments, start_metrics
+from receiver_common.pipeline import FramePipeline
+from receiver_common.redundant import RedundantReceiver
+from receiver_common.ring_buffer import POLICIES
+from receiver_common.supervisor import add_stall_arguments, stall_kwargs
+from receiver_common.parquet_writer import DailyParquetWriter, COL_BOOL, COL_DICT, COL_INT64, COL_SCALED
+from receiver_common.writer import DailyFileWriter, FORMAT_PARQUET, add_writer_arguments, get_parquet_options, get_writer_options
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -29,95 +37,75 @@ MARKET_SYMBOL_MAP = {
 CSV_HEADER = "exchange,symbol,timestamp,local_timestamp,is_snapshot,side,price,amount\n"
 
 
-class DailyCSVWriter:
+def lighter_control_parsers(market_symbol_map: dict, known_symbols: dict = MARKET_SYMBOL_MAP):
+    """控制通道用的 (parse_market, symbol_of)，见 receiver_common.control.register_receivers
+
+    命令中的 market 为市场ID，未指定 symbol 时按 known_symbols 命名，都没有时为 MARKET_{id}。
+    """
+    def parse_market(market: str, symbol):
+        market_id = int(market)
+        return market_id, symbol or market_symbol_map.get(market_id) or known_symbols.get(market_id, f"MARKET_{market_id}")
+
+    def symbol_of(market_id: int) -> str:
+        return market_symbol_map.get(market_id, f"MARKET_{market_id}")
+
+    return parse_market, symbol_of
+
+
+class DailyCSVWriter(DailyFileWriter):
     """按天按symbol保存CSV文件，格式: {output_dir}/{exchange}_book_snapshot_l2_{symbol}_{date}.csv.gz"""
 
-    def __init__(self, output_dir: str, exchange: str = "lighter", compress: bool = True):
-        self.output_dir = output_dir
-        self.exchange = exchange
-        self.compress = compress
-        self._files: Dict[str, object] = {}  # key: symbol_date
-        self._current_dates: Dict[str, str] = {}  # key: symbol, value: date
-        self._update_counts: Dict[str, int] = {}  # key: symbol_date
-        os.makedirs(output_dir, exist_ok=True)
-
-    def _get_date_from_timestamp(self, timestamp_us: int) -> str:
-        """从微秒时间戳获取日期字符串 YYYY-MM-DD"""
-        dt = datetime.fromtimestamp(timestamp_us / 1_000_000, tz=timezone.utc)
-        return dt.strftime("%Y-%m-%d")
-
-    def _get_file_key(self, symbol: str, date: str) -> str:
-        return f"{symbol}_{date}"
-
-    def _get_file_path(self, symbol: str, date: str) -> str:
-        filename = f"{self.exchange}_book_snapshot_l2_{symbol}_{date}.csv"
-        if self.compress:
-            filename += ".gz"
-        return os.path.join(self.output_dir, filename)
-
-    def _open_file(self, symbol: str, date: str):
-        """打开或创建新的日期文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            return
+    FILE_KIND = "book_snapshot_l2"
+    HEADER = CSV_HEADER
 
-        file_path = self._get_file_path(symbol, date)
-        if self.compress:
-            f = gzip.open(file_path, "wt", encoding="utf-8")
-        else:
-            f = open(file_path, "w", encoding="utf-8")
-        f.write(CSV_HEADER)
-        self._files[file_key] = f
-        self._update_counts[file_key] = 0
-        logger.info(f"创建新文件: {file_path}")
-
-    def _close_file(self, symbol: str, date: str):
-        """关闭指定文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            self._files[file_key].close()
-            count = self._update_counts.get(file_key, 0)
-            file_path = self._get_file_path(symbol, date)
-            logger.info(f"关闭文件: {file_path}，共 {count} 条记录")
-            del self._files[file_key]
-            if file_key in self._update_counts:
-                del self._update_counts[file_key]
+    def __init__(self, output_dir: str, exchange: str = "lighter", compress: bool = True, **kwargs):
+        super().__init__(output_dir, exchange, compress, **kwargs)
 
     def write(self, update: TardisL2Update):
         """写入一条更新记录"""
-        symbol = update.symbol
-        date = self._get_date_from_timestamp(update.timestamp)
-
-        # 检查是否需要切换到新的日期文件
-        old_date = self._current_dates.get(symbol)
-        if old_date and old_date != date:
-            self._close_file(symbol, old_date)
+        self.write_text(update.symbol, update.timestamp, update.to_csv_row() + "\n")
 
-        self._current_dates[symbol] = date
-        file_key = self._get_file_key(symbol, date)
+    def write_batch(self, batch: L2UpdateBatch):
+        """写入一帧的批量更新"""
+        if not batch.prices:
+            return
+        self.write_text(batch.symbol, batch.timestamp, batch.to_csv(), len(batch))
 
-        # 确保文件已打开
-        if file_key not in self._files:
-            self._open_file(symbol, date)
 
-        # 写入数据
-        self._files[file_key].write(update.to_csv_row() + "\n")
-        self._update_counts[file_key] = self._update_counts.get(file_key, 0) + 1
+class DailyParquetL2Writer(DailyParquetWriter):
+    """按天按symbol保存Parquet文件，格式: {output_dir}/{exchange}_book_snapshot_l2_{symbol}_{date}.parquet"""
 
-        # 定期flush
-        if self._update_counts[file_key] % 100 == 0:
-            self._files[file_key].flush()
-            logger.info(f"[{symbol}][{date}] 已写入 {self._update_counts[file_key]} 条记录")
+    FILE_KIND = "book_snapshot_l2"
+    COLUMNS = [
+        ("exchange", COL_DICT),
+        ("symbol", COL_DICT),
+        ("timestamp", COL_INT64),
+        ("local_timestamp", COL_INT64),
+        ("is_snapshot", COL_BOOL),
+        ("side", COL_DICT),
+        ("price", COL_SCALED),
+        ("amount", COL_SCALED),
+    ]
 
-    def close_all(self):
-        """关闭所有文件"""
-        for symbol, date in list(self._current_dates.items()):
-            self._close_file(symbol, date)
-        self._current_dates.clear()
+    def __init__(self, output_dir: str, exchange: str = "lighter", **kwargs):
+        super().__init__(output_dir, exchange, **kwargs)
 
-    def get_total_count(self) -> int:
-        """获取总记录数"""
-        return sum(self._update_counts.values())
+    def write(self, update: TardisL2Update):
+        """写入一条更新记录"""
+        self.write_row(update.symbol, update.timestamp, (
+            update.exchange, update.symbol, update.timestamp, update.local_timestamp,
+            update.is_snapshot, update.side, update.price, update.amount,
+        ))
+
+    def write_batch(self, batch: L2UpdateBatch):
+        """写入一帧的批量更新"""
+        n = len(batch)
+        if not n:
+            return
+        self.write_columns(batch.symbol, batch.timestamp, [
+            [batch.exchange] * n, [batch.symbol] * n, [batch.timestamp] * n, [batch.local_timestamp] * n,
+            [batch.is_snapshot] * n, batch.sides, batch.prices, batch.amounts,
+        ])
 
 
 def main():
@@ -125,22 +113,87 @@ def main():
     parser.add_argument("-m", "--markets", type=str, default="0", help="市场ID，逗号分隔 (默认: 0)")
     parser.add_argument("-o", "--output-dir", type=str, default="./data", help="输出目录 (默认: ./data)")
     parser.add_argument("--no-compress", action="store_true", help="不压缩CSV文件")
+    parser.add_argument("--markets-per-conn", type=int, default=0, help="每个连接最多订阅的市场数，0 表示全部市场共用一个连接 (默认: 0)")
+    parser.add_argument("--shard-mode", type=str, default="thread", choices=["thread", "process"], help="分片运行方式 (默认: thread)")
+    parser.add_argument("--buffer-size", type=int, default=100_000, help="接收/解析/写盘流水线缓冲区大小，0 表示在 WebSocket 线程中直接处理 (默认: 100000)")
+    parser.add_argument("--backpressure", type=str, default="block", choices=POLICIES, help="缓冲区满时的处理策略 (默认: block)")
+    parser.add_argument("--spill-dir", type=str, default=None, help="spill 策略的溢出文件目录 (默认: 系统临时目录)")
+    add_writer_arguments(parser)
+    add_metrics_arguments(parser)
+    add_control_arguments(parser)
+    add_stall_arguments(parser)
+    parser.add_argument("--ws-url", type=str, default=WS_URL, help="WebSocket 地址，可指向 receiver_common/standin_server.py 做本地压测 (默认: 主网)")
+    parser.add_argument("--capture", type=str, default="", help="把收到的原始帧录制到该文件，可用 receiver_common/replay.py 回放")
+    parser.add_argument("--keep-book", action="store_true", help="维护内存订单簿并检查消息连续性，发现缺口时只重新订阅该市场")
+    parser.add_argument("--redundant", type=int, default=1, help="同时开几条连接，按 nonce/offset 去重取先到的 (建议同时使用 --keep-book，默认: 1)")
+    parser.add_argument("--proxies", type=str, default="", help="各条冗余连接的代理，逗号分隔，空表示直连，如 ,http://127.0.0.1:7890")
     args = parser.parse_args()
 
     market_ids = [int(x.strip()) for x in args.markets.split(",")]
     market_symbol_map = {mid: MARKET_SYMBOL_MAP.get(mid, f"MARKET_{mid}") for mid in market_ids}
-
-    writer = DailyCSVWriter(
-        output_dir=args.output_dir,
-        exchange="lighter",
-        compress=not args.no_compress,
-    )
-
-    def on_update(update: TardisL2Update):
-        writer.write(update)
-
-    receiver = LighterDepthReceiver(market_ids=market_ids, market_symbol_map=market_symbol_map)
-    receiver.on_update = on_update
+    sharded = args.markets_per_conn > 0 and len(market_ids) > args.markets_per_conn
+    if sharded and args.control_socket:
+        parser.error("--control-socket 不支持 --markets-per-conn 分片")
+    if sharded and args.redundant > 1:
+        parser.error("--redundant 不支持 --markets-per-conn 分片")
+
+    if args.format == FORMAT_PARQUET:
+        writer = DailyParquetL2Writer(output_dir=args.output_dir, exchange="lighter", **get_parquet_options(args))
+    else:
+        writer = DailyCSVWriter(
+            output_dir=args.output_dir,
+            exchange="lighter",
+            compress=not args.no_compress,
+            **get_writer_options(args),
+        )
+
+    if sharded:
+        receiver = ShardedLighterReceiver(
+            LighterDepthReceiver,
+            market_ids=market_ids,
+            market_symbol_map=market_symbol_map,
+            markets_per_connection=args.markets_per_conn,
+            mode=args.shard_mode,
+            ws_url=args.ws_url,
+            keep_book=args.keep_book,
+            **stall_kwargs(args.stall_timeout),
+        )
+    elif args.redundant > 1:
+        receiver = RedundantReceiver(
+            LighterDepthReceiver,
+            copies=args.redundant,
+            proxies=[x.strip() or None for x in args.proxies.split(",")],
+            market_ids=market_ids,
+            market_symbol_map=market_symbol_map,
+            ws_url=args.ws_url,
+            keep_book=args.keep_book,
+            **stall_kwargs(args.stall_timeout),
+        )
+    else:
+        receiver = LighterDepthReceiver(
+            market_ids=market_ids, market_symbol_map=market_symbol_map, ws_url=args.ws_url, keep_book=args.keep_book,
+            **stall_kwargs(args.stall_timeout),
+        )
+    receiver.on_updates_batch = writer.write_batch
+
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture)
+        receiver.set_capture(capture)
+
+    # 在流水线接管回调之前包装，回调耗时统计的是写盘线程中的实际处理
+    metrics = start_metrics(args, [receiver])
+
+    pipeline = None
+    if args.buffer_size > 0 and isinstance(receiver, LighterDepthReceiver):
+        pipeline = FramePipeline(receiver, capacity=args.buffer_size, policy=args.backpressure, spill_dir=args.spill_dir)
+        pipeline.start()
+
+    control = None
+    if args.control_socket:
+        control = ControlServer(args.control_socket)
+        register_receivers(control, "lighter", [receiver], [writer], *lighter_control_parsers(market_symbol_map))
+        control.start()
 
     try:
         logger.info(f"开始接收数据，市场: {market_ids}，输出目录: {args.output_dir}")
@@ -148,7 +201,15 @@ def main():
     except KeyboardInterrupt:
         logger.info("用户中断")
     finally:
+        if control:
+            control.stop()
         receiver.stop()
+        if capture:
+            capture.close()
+        if pipeline:
+            pipeline.stop()
+        if metrics:
+            metrics.stop()
         writer.close_all()
         logger.info(f"总共写入 {writer.get_total_count()} 条记录")
 
@@ -4,16 +4,21 @@ Lighter DEX 交易数据接收器 - 按天记录到 CSV
 
 import logging
 import argparse
-import gzip
 import sys
 import os
-from datetime import datetime, timezone
-from typing import Dict
 
 sys.path.append("/home/ec2-user/test_lighter_dex/adapter_exchanges/lighter_receiver")
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from lighter_receiver import LighterTradesReceiver, LighterTrade
+from lighter_receiver import LighterTradesReceiver, ShardedLighterReceiver, LighterTrade
+from lighter_receiver.base import WS_URL
+from lighter_receiver.main import lighter_control_parsers
+from receiver_common.capture import FrameCapture
+from receiver_common.control import ControlServer, add_control_arguments, register_receivers
+from receiver_common.dedup import DEFAULT_TRADE_WINDOW
+from receiver_common.supervisor import add_stall_arguments, stall_kwargs
+from receiver_common.parquet_writer import DailyParquetWriter, COL_DICT, COL_INT64, COL_SCALED
+from receiver_common.writer import DailyFileWriter, FORMAT_PARQUET, add_writer_arguments, get_parquet_options, get_writer_options
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -29,95 +34,44 @@ MARKET_SYMBOL_MAP = {
 CSV_HEADER = "exchange,symbol,timestamp,local_timestamp,trade_id,side,price,amount\n"
 
 
-class DailyTradesCSVWriter:
+class DailyTradesCSVWriter(DailyFileWriter):
     """按天按symbol保存CSV文件，格式: {output_dir}/{exchange}_trades_{symbol}_{date}.csv.gz"""
 
-    def __init__(self, output_dir: str, exchange: str = "lighter", compress: bool = True):
-        self.output_dir = output_dir
-        self.exchange = exchange
-        self.compress = compress
-        self._files: Dict[str, object] = {}  # key: symbol_date
-        self._current_dates: Dict[str, str] = {}  # key: symbol, value: date
-        self._trade_counts: Dict[str, int] = {}  # key: symbol_date
-        os.makedirs(output_dir, exist_ok=True)
-
-    def _get_date_from_timestamp(self, timestamp_us: int) -> str:
-        """从微秒时间戳获取日期字符串 YYYY-MM-DD"""
-        dt = datetime.fromtimestamp(timestamp_us / 1_000_000, tz=timezone.utc)
-        return dt.strftime("%Y-%m-%d")
-
-    def _get_file_key(self, symbol: str, date: str) -> str:
-        return f"{symbol}_{date}"
-
-    def _get_file_path(self, symbol: str, date: str) -> str:
-        filename = f"{self.exchange}_trades_{symbol}_{date}.csv"
-        if self.compress:
-            filename += ".gz"
-        return os.path.join(self.output_dir, filename)
-
-    def _open_file(self, symbol: str, date: str):
-        """打开或创建新的日期文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            return
-
-        file_path = self._get_file_path(symbol, date)
-        if self.compress:
-            f = gzip.open(file_path, "wt", encoding="utf-8")
-        else:
-            f = open(file_path, "w", encoding="utf-8")
-        f.write(CSV_HEADER)
-        self._files[file_key] = f
-        self._trade_counts[file_key] = 0
-        logger.info(f"创建新文件: {file_path}")
-
-    def _close_file(self, symbol: str, date: str):
-        """关闭指定文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            self._files[file_key].close()
-            count = self._trade_counts.get(file_key, 0)
-            file_path = self._get_file_path(symbol, date)
-            logger.info(f"关闭文件: {file_path}，共 {count} 条记录")
-            del self._files[file_key]
-            if file_key in self._trade_counts:
-                del self._trade_counts[file_key]
+    FILE_KIND = "trades"
+    HEADER = CSV_HEADER
+
+    def __init__(self, output_dir: str, exchange: str = "lighter", compress: bool = True, **kwargs):
+        super().__init__(output_dir, exchange, compress, **kwargs)
 
     def write(self, trade: LighterTrade):
         """写入一条交易记录"""
-        symbol = trade.symbol
-        date = self._get_date_from_timestamp(trade.timestamp)
-
-        # 检查是否需要切换到新的日期文件
-        old_date = self._current_dates.get(symbol)
-        if old_date and old_date != date:
-            self._close_file(symbol, old_date)
+        self.write_text(trade.symbol, trade.timestamp, trade.to_csv_row() + "\n")
 
-        self._current_dates[symbol] = date
-        file_key = self._get_file_key(symbol, date)
 
-        # 确保文件已打开
-        if file_key not in self._files:
-            self._open_file(symbol, date)
+class DailyTradesParquetWriter(DailyParquetWriter):
+    """按天按symbol保存Parquet文件，格式: {output_dir}/{exchange}_trades_{symbol}_{date}.parquet"""
 
-        # 写入数据
-        self._files[file_key].write(trade.to_csv_row() + "\n")
-        self._trade_counts[file_key] = self._trade_counts.get(file_key, 0) + 1
+    FILE_KIND = "trades"
+    COLUMNS = [
+        ("exchange", COL_DICT),
+        ("symbol", COL_DICT),
+        ("timestamp", COL_INT64),
+        ("local_timestamp", COL_INT64),
+        ("trade_id", COL_INT64),
+        ("side", COL_DICT),
+        ("price", COL_SCALED),
+        ("amount", COL_SCALED),
+    ]
 
-        # 定期flush
-        if self._trade_counts[file_key] % 5 == 0:
-            self._files[file_key].flush()
-            logger.info(f"[{symbol}][{date}] 已写入 {self._trade_counts[file_key]} 条交易记录")
+    def __init__(self, output_dir: str, exchange: str = "lighter", **kwargs):
+        super().__init__(output_dir, exchange, **kwargs)
 
-    def close_all(self):
-        """关闭所有文件"""
-        for symbol, date in list(self._current_dates.items()):
-            self._close_file(symbol, date)
-        self._current_dates.clear()
-
-    def get_total_count(self) -> int:
-        """获取总记录数"""
-        return sum(self._trade_counts.values())
+    def write(self, trade: LighterTrade):
+        """写入一条交易记录"""
+        self.write_row(trade.symbol, trade.timestamp, (
+            trade.exchange, trade.symbol, trade.timestamp, trade.local_timestamp,
+            trade.trade_id, trade.side, trade.price, trade.amount,
+        ))
 
 
 def main():
@@ -125,32 +79,79 @@ def main():
     parser.add_argument("-m", "--markets", type=str, default="0", help="市场ID，逗号分隔 (默认: 0)")
     parser.add_argument("-o", "--output-dir", type=str, default="./data", help="输出目录 (默认: ./data)")
     parser.add_argument("--no-compress", action="store_true", help="不压缩CSV文件")
+    parser.add_argument("--markets-per-conn", type=int, default=0, help="每个连接最多订阅的市场数，0 表示全部市场共用一个连接 (默认: 0)")
+    parser.add_argument("--shard-mode", type=str, default="thread", choices=["thread", "process"], help="分片运行方式 (默认: thread)")
+    add_writer_arguments(parser)
+    parser.add_argument("--ws-url", type=str, default=WS_URL, help="WebSocket 地址，可指向 receiver_common/standin_server.py 做本地压测 (默认: 主网)")
+    parser.add_argument("--capture", type=str, default="", help="把收到的原始帧录制到该文件，可用 receiver_common/replay.py 回放")
+    parser.add_argument("--dedup-window", type=int, default=DEFAULT_TRADE_WINDOW, help=f"每个市场按 trade_id 去重记住的最近成交数，0 表示不去重 (默认: {DEFAULT_TRADE_WINDOW})")
+    add_control_arguments(parser)
+    add_stall_arguments(parser)
     args = parser.parse_args()
 
     market_ids = [int(x.strip()) for x in args.markets.split(",")]
     market_symbol_map = {mid: MARKET_SYMBOL_MAP.get(mid, f"MARKET_{mid}") for mid in market_ids}
-
-    writer = DailyTradesCSVWriter(
-        output_dir=args.output_dir,
-        exchange="lighter",
-        compress=not args.no_compress,
-    )
+    sharded = args.markets_per_conn > 0 and len(market_ids) > args.markets_per_conn
+    if sharded and args.control_socket:
+        parser.error("--control-socket 不支持 --markets-per-conn 分片")
+
+    if args.format == FORMAT_PARQUET:
+        writer = DailyTradesParquetWriter(output_dir=args.output_dir, exchange="lighter", **get_parquet_options(args))
+    else:
+        writer = DailyTradesCSVWriter(
+            output_dir=args.output_dir,
+            exchange="lighter",
+            compress=not args.no_compress,
+            **get_writer_options(args),
+        )
 
     def on_trade(trade: LighterTrade):
         writer.write(trade)
 
-    receiver = LighterTradesReceiver(market_ids=market_ids, market_symbol_map=market_symbol_map)
+    if sharded:
+        receiver = ShardedLighterReceiver(
+            LighterTradesReceiver,
+            market_ids=market_ids,
+            market_symbol_map=market_symbol_map,
+            markets_per_connection=args.markets_per_conn,
+            mode=args.shard_mode,
+            ws_url=args.ws_url,
+            dedup_window=args.dedup_window,
+            **stall_kwargs(args.stall_timeout),
+        )
+    else:
+        receiver = LighterTradesReceiver(
+            market_ids=market_ids, market_symbol_map=market_symbol_map, ws_url=args.ws_url, dedup_window=args.dedup_window,
+            **stall_kwargs(args.stall_timeout),
+        )
     receiver.on_trade = on_trade
 
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture)
+        receiver.set_capture(capture)
+
+    control = None
+    if args.control_socket:
+        control = ControlServer(args.control_socket)
+        register_receivers(control, "lighter", [receiver], [writer], *lighter_control_parsers(market_symbol_map, MARKET_SYMBOL_MAP))
+        control.start()
+
     try:
         logger.info(f"开始接收交易数据，市场: {market_ids}，输出目录: {args.output_dir}")
         receiver.start()
     except KeyboardInterrupt:
         logger.info("用户中断")
     finally:
+        if control:
+            control.stop()
         receiver.stop()
+        if capture:
+            capture.close()
         writer.close_all()
         logger.info(f"总共写入 {writer.get_total_count()} 条交易记录")
+        if receiver.duplicate_count is not None:
+            logger.info(f"去重丢弃 {receiver.duplicate_count} 条重复成交")
 
 
 if __name__ == "__main__":
@@ -2,22 +2,21 @@
 Lighter DEX WebSocket 深度数据接收器 (同步模式)
 """
 
-import json
 import logging
-import ssl
 import time
-import threading
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
+from receiver_common.batch import L2UpdateBatch
+from receiver_common.json_codec import typed_decoder
+from receiver_common.orderbook import L2OrderBook
+from .base import LighterStreamReceiver, WS_URL
 from .data_types import TardisL2Update, TardisL2Snapshot, LighterOrderBookMessage
 from .converter import LighterToTardisConverter
 
 logger = logging.getLogger(__name__)
 
-WS_URL = "wss://mainnet.zklighter.elliot.ai/stream"
 
-
-class LighterDepthReceiver:
+class LighterDepthReceiver(LighterStreamReceiver):
     """
     Lighter DEX 深度数据 WebSocket 接收器 (同步模式)
 
@@ -31,8 +30,17 @@ class LighterDepthReceiver:
         )
         receiver.on_update = on_update
         receiver.start()
+
+    高频场景可以改用 on_updates_batch，每帧只回调一次 L2UpdateBatch；
+    安装了 msgspec 时再调用 enable_typed_decode()，订单簿消息直接解码为结构体。
+
+    keep_book=True 时每个市场维护一份内存订单簿 (self.books)，并检查消息连续性:
+    消息带 nonce/begin_nonce 时要求 begin_nonce 等于上一条的 nonce，否则要求 offset 逐条加 1。
+    发现缺口后丢弃该市场的增量(不再转发给回调)，只对这个市场退订再订阅拿新快照，其他市场不受影响。
     """
 
+    CHANNEL = "order_book"
+
     def __init__(
         self,
         market_ids: List[int],
@@ -40,25 +48,164 @@ class LighterDepthReceiver:
         reconnect_interval: float = 5.0,
         ping_interval: int = 60,
         ping_timeout: int = 30,
-        heartbeat_timeout: int = 180,
+        heartbeat_timeout: float = 180,
+        ws_url: str = WS_URL,
+        keep_book: bool = False,
+        resync_timeout: float = 10.0,
     ):
-        self.market_ids = market_ids
-        self.market_symbol_map = market_symbol_map or {}
-        self.reconnect_interval = reconnect_interval
-        self.ping_interval = ping_interval
-        self.ping_timeout = ping_timeout
-        self.heartbeat_timeout = heartbeat_timeout
+        super().__init__(market_ids, market_symbol_map, reconnect_interval, ping_interval, ping_timeout, heartbeat_timeout, ws_url)
 
         self.converter = LighterToTardisConverter(self.market_symbol_map)
-        self._running = False
-        self._ws = None
-        self._last_message_time = 0
-        self._heartbeat_thread = None
 
         # 回调函数
         self.on_snapshot: Optional[Callable[[TardisL2Snapshot], None]] = None
         self.on_update: Optional[Callable[[TardisL2Update], None]] = None
-        self.on_error: Optional[Callable[[Exception], None]] = None
+        self.on_updates_batch: Optional[Callable[[L2UpdateBatch], None]] = None
+        # 订单簿应用一条消息后回调 (market_id, book)，book 会被后续消息继续修改
+        self.on_book: Optional[Callable[[int, L2OrderBook], None]] = None
+
+        self._typed_decode = None
+
+        # 内存订单簿和连续性检查
+        self.keep_book = keep_book
+        self.resync_timeout = resync_timeout
+        self.books: Dict[int, L2OrderBook] = {}
+        self.gap_count = 0
+        self.stale_count = 0
+        self._sequences: Dict[int, Tuple[Optional[int], Optional[int]]] = {}  # market_id -> (offset, nonce)
+        self._resyncing: Dict[int, float] = {}  # market_id -> 发出重新订阅的时间
+
+    def enable_typed_decode(self) -> bool:
+        """订单簿消息按 lighter_receiver.schema 的结构直接解码，未安装 msgspec 时返回 False"""
+        from . import schema
+        if not schema.AVAILABLE:
+            logger.warning("msgspec not installed, typed decode disabled")
+            return False
+        # 只解码 subscribed/order_book、update/order_book，其他消息走 dict 路径
+        self._typed_decode = typed_decoder(schema.LighterOrderBookFrame, marker='/order_book"')
+        return True
+
+    def _reset_connection_state(self):
+        # 新连接的每个订阅都会先推送快照，之前的序号不再有效
+        self._sequences.clear()
+        self._resyncing.clear()
+
+    def subscribe(self, market_id: int, symbol: Optional[str] = None) -> bool:
+        if symbol:
+            # 转换器在 market_symbol_map 为空时持有自己的映射
+            self.converter.market_symbol_map[market_id] = symbol
+        return super().subscribe(market_id, symbol)
+
+    def unsubscribe(self, market_id: int) -> bool:
+        if not super().unsubscribe(market_id):
+            return False
+        self.books.pop(market_id, None)
+        self._sequences.pop(market_id, None)
+        self._resyncing.pop(market_id, None)
+        return True
+
+    def get_book(self, market_id: int) -> Optional[L2OrderBook]:
+        """市场当前的订单簿，未收到快照或正在重新同步时返回 None"""
+        if market_id in self._resyncing:
+            return None
+        return self.books.get(market_id)
+
+    def _resubscribe(self, market_id: int, send: Callable[[str], None]):
+        """只对一个市场退订再订阅，服务器会重新推送快照"""
+        self._resyncing[market_id] = time.monotonic()
+        send(self._channel_message("unsubscribe", market_id))
+        send(self._channel_message("subscribe", market_id))
+
+    def _check_sequence(
+        self,
+        market_id: int,
+        offset: Optional[int],
+        nonce: Optional[int],
+        begin_nonce: Optional[int],
+        is_snapshot: bool,
+        send: Callable[[str], None],
+    ) -> bool:
+        """检查消息连续性，返回 False 表示丢弃该消息"""
+        if is_snapshot:
+            self._resyncing.pop(market_id, None)
+            self._sequences[market_id] = (offset, nonce)
+            return True
+
+        resync_at = self._resyncing.get(market_id)
+        if resync_at is not None:
+            # 等待新快照期间的增量全部丢弃，快照迟迟不来时再请求一次
+            if time.monotonic() - resync_at > self.resync_timeout:
+                logger.warning(f"Market {market_id}: no snapshot {self.resync_timeout}s after resubscribe, retrying")
+                self._resubscribe(market_id, send)
+            return False
+
+        last = self._sequences.get(market_id)
+        if last is None:
+            in_order, stale = False, False
+        else:
+            last_offset, last_nonce = last
+            if begin_nonce is not None and last_nonce is not None:
+                in_order, stale = begin_nonce == last_nonce, nonce is not None and nonce <= last_nonce
+            elif offset is not None and last_offset is not None:
+                in_order, stale = offset == last_offset + 1, offset <= last_offset
+            else:
+                in_order, stale = True, False
+
+        if in_order:
+            self._sequences[market_id] = (offset, nonce)
+            return True
+        if stale:
+            # 重复或乱序到达的旧消息
+            self.stale_count += 1
+            logger.debug(f"Market {market_id}: dropped stale update offset={offset} nonce={nonce}")
+            return False
+
+        self.gap_count += 1
+        logger.warning(
+            f"Market {market_id}: sequence gap (last={last}, offset={offset}, begin_nonce={begin_nonce}), "
+            f"resubscribing for a fresh snapshot"
+        )
+        book = self.books.get(market_id)
+        if book is not None:
+            book.clear()
+        self._resubscribe(market_id, send)
+        return False
+
+    def _apply_book(self, market_id: int, bids: Iterable, asks: Iterable, timestamp: int, is_snapshot: bool, sequence):
+        """把 (price, size) 档位应用到市场的订单簿"""
+        book = self.books.get(market_id)
+        if book is None:
+            book = self.books[market_id] = L2OrderBook("lighter", self.market_symbol_map.get(market_id, f"MARKET_{market_id}"))
+        book.apply(bids, asks, is_snapshot)
+        book.timestamp = self.converter._convert_timestamp(timestamp, self.recv_timestamp_us)
+        book.local_timestamp = self.recv_timestamp_us
+        book.sequence = sequence
+        if self.on_book:
+            self.on_book(market_id, book)
+
+    def _emit_updates(self, market_id: int, bids: list, asks: list, timestamp: int, is_snapshot: bool):
+        """逐档回调: on_snapshot / on_update"""
+        message = LighterOrderBookMessage(market_index=market_id, timestamp=timestamp, asks=asks, bids=bids)
+
+        if is_snapshot:
+            # subscribed/order_book 消息作为快照处理
+            snapshot = self.converter.convert_to_snapshot(message, self.recv_timestamp_us)
+
+            # 快照回调
+            if self.on_snapshot:
+                self.on_snapshot(snapshot)
+
+            # 快照也需要转换为带 is_snapshot=True 的更新
+            if self.on_update:
+                updates = snapshot.to_updates()
+                for update in updates:
+                    self.on_update(update)
+        else:
+            # update/order_book 消息作为增量更新处理
+            if self.on_update:
+                updates = self.converter.convert_to_incremental_updates(message, is_first_message=False, local_timestamp=self.recv_timestamp_us)
+                for update in updates:
+                    self.on_update(update)
 
     def _handle_orderbook_update(self, market_id: int, order_book: dict, timestamp: int = 0, is_snapshot: bool = False):
         """处理订单簿更新
@@ -70,167 +217,82 @@ class LighterDepthReceiver:
             is_snapshot: 是否为快照消息(subscribed/order_book类型)
         """
         try:
-            ws_data = {
-                "channel": f"order_book:{market_id}",
-                "offset": order_book.get("offset", 0),
-                "order_book": order_book,
-                "timestamp": timestamp,
-            }
-
-            message = LighterOrderBookMessage.from_ws_message(ws_data)
-
-            if is_snapshot:
-                # subscribed/order_book 消息作为快照处理
-                snapshot = self.converter.convert_to_snapshot(message)
-
-                # 快照回调
-                if self.on_snapshot:
-                    self.on_snapshot(snapshot)
-
-                # 快照也需要转换为带 is_snapshot=True 的更新
-                if self.on_update:
-                    updates = snapshot.to_updates()
-                    for update in updates:
-                        self.on_update(update)
-            else:
-                # update/order_book 消息作为增量更新处理
-                if self.on_update:
-                    updates = self.converter.convert_to_incremental_updates(message, is_first_message=False)
-                    for update in updates:
-                        self.on_update(update)
-
+            # 批量回调直接从 JSON 构建，不经过逐档对象
+            if self.on_updates_batch:
+                self.on_updates_batch(self.converter.convert_to_batch(
+                    market_id, order_book, timestamp, is_snapshot, self.recv_timestamp_us
+                ))
+            if self.on_snapshot or self.on_update:
+                self._emit_updates(market_id, order_book.get("bids", []), order_book.get("asks", []), timestamp, is_snapshot)
         except Exception as e:
             logger.error(f"Error handling orderbook update: {e}", exc_info=True)
             if self.on_error:
                 self.on_error(e)
 
-    def _heartbeat_loop(self, ws_ref):
-        """心跳检测线程：检查是否长时间没收到消息"""
-        while self._running:
-            time.sleep(60)
-            # 检查 ws 是否还是同一个连接
-            if not self._running or self._ws is not ws_ref:
-                break
-            # 如果超过 heartbeat_timeout 秒没收到消息，主动关闭连接触发重连
-            if self._last_message_time > 0:
-                elapsed = time.time() - self._last_message_time
-                if elapsed > self.heartbeat_timeout:
-                    logger.warning(f"No message received for {elapsed:.1f}s (timeout: {self.heartbeat_timeout}s), closing connection...")
-                    try:
-                        ws_ref.close()
-                    except Exception:
-                        pass
-                    break
-
-    def start(self):
-        """启动接收器 (阻塞)"""
+    def _handle_typed_orderbook(self, market_id: int, order_book, timestamp: int, is_snapshot: bool):
+        """处理 msgspec 解码的订单簿消息 (lighter_receiver.schema.LighterOrderBook)"""
         try:
-            import websocket
-        except ImportError:
-            logger.error("websocket-client not installed: pip install websocket-client")
-            raise
-
-        self._running = True
-
-        def on_open(ws):
-            logger.info("WebSocket connected")
-            self._last_message_time = time.time()
-            for market_id in self.market_ids:
-                subscribe_msg = {"type": "subscribe", "channel": f"order_book/{market_id}"}
-                ws.send(json.dumps(subscribe_msg))
-                logger.info(f"Subscribed to market {market_id}")
-
-        def on_message(ws, message):
-            self._last_message_time = time.time()
-            try:
-                data = json.loads(message)
-                #print(data)
-                msg_type = data.get("type", "")
-                # 处理订阅确认消息(快照)和增量更新消息
-                if msg_type in ("subscribed/order_book", "update/order_book"):
-                    channel = data.get("channel", "")
-                    market_id = int(channel.split(":")[1]) if ":" in channel else 0
-                    order_book = data.get("order_book", {})
-                    timestamp = data.get("timestamp", 0)
-                    is_snapshot = (msg_type == "subscribed/order_book")
-                    self._handle_orderbook_update(market_id, order_book, timestamp, is_snapshot)
-                elif msg_type == "ping":
-                    # 服务器发送应用层 ping，需要回复 pong
-                    ws.send(json.dumps({"type": "pong"}))
-                    logger.debug("Received ping, sent pong")
-                elif msg_type == "pong":
-                    logger.debug("Received pong")
-                elif msg_type == "error":
-                    logger.error(f"Server error: {data}")
-            except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
-                if self.on_error:
-                    self.on_error(e)
-
-        def on_error(ws, error):
-            logger.error(f"WebSocket error: {error}")
+            if self.on_updates_batch:
+                self.on_updates_batch(self.converter.convert_structs_to_batch(
+                    market_id, order_book.bids, order_book.asks, timestamp, is_snapshot, self.recv_timestamp_us
+                ))
+            if self.on_snapshot or self.on_update:
+                # 逐档回调仍然使用 dict 档位
+                bids = [{"price": level.price, "size": level.size} for level in order_book.bids]
+                asks = [{"price": level.price, "size": level.size} for level in order_book.asks]
+                self._emit_updates(market_id, bids, asks, timestamp, is_snapshot)
+        except Exception as e:
+            logger.error(f"Error handling orderbook update: {e}", exc_info=True)
             if self.on_error:
-                self.on_error(error)
-
-        def on_close(ws, close_status_code, close_msg):
-            logger.info(f"WebSocket closed: {close_status_code} - {close_msg}")
-
-        def on_ping(ws, message):
-            logger.debug("Received ping, sending pong")
-            self._last_message_time = time.time()
-            # websocket-client 会自动回复 pong
-
-        def on_pong(ws, message):
-            logger.debug("Received pong")
-            self._last_message_time = time.time()
-
-        # 创建 SSL context，放宽一些限制
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = True
-        ssl_context.verify_mode = ssl.CERT_REQUIRED
-
-        while self._running:
-            try:
-                self._ws = websocket.WebSocketApp(
-                    WS_URL,
-                    on_open=on_open,
-                    on_message=on_message,
-                    on_error=on_error,
-                    on_close=on_close,
-                    on_ping=on_ping,
-                    on_pong=on_pong,
-                )
-
-                # 启动心跳检测线程
-                self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, args=(self._ws,), daemon=True)
-                self._heartbeat_thread.start()
+                self.on_error(e)
 
-                # 使用更宽松的 ping 设置，并添加 skip_utf8_validation 提高性能
-                self._ws.run_forever(
-                    ping_interval=self.ping_interval,
-                    ping_timeout=self.ping_timeout,
-                    sslopt={"context": ssl_context},
-                    skip_utf8_validation=True,
+    def _handle_message(self, message: str, send: Callable[[str], None]):
+        if self._typed_decode is not None:
+            frame = self._typed_decode(message)
+            if frame is not None and frame.order_book is not None and frame.type in ("subscribed/order_book", "update/order_book"):
+                market_id = int(frame.channel.split(":")[1]) if ":" in frame.channel else 0
+                if market_id in self._unsubscribed:
+                    return
+                order_book = frame.order_book
+                is_snapshot = frame.type == "subscribed/order_book"
+                offset = order_book.offset if order_book.offset is not None else frame.offset
+                self.message_sequence = order_book.nonce if order_book.nonce is not None else offset
+                if self.keep_book:
+                    if not self._check_sequence(market_id, offset, order_book.nonce, order_book.begin_nonce, is_snapshot, send):
+                        return
+                    self._apply_book(
+                        market_id,
+                        ((level.price, level.size) for level in order_book.bids),
+                        ((level.price, level.size) for level in order_book.asks),
+                        frame.timestamp, is_snapshot, offset,
+                    )
+                self._handle_typed_orderbook(market_id, order_book, frame.timestamp, is_snapshot)
+                return
+
+        data = self.codec.loads(message)
+        msg_type = data.get("type", "")
+        # 处理订阅确认消息(快照)和增量更新消息
+        if msg_type in ("subscribed/order_book", "update/order_book"):
+            market_id = self._get_market_id(data)
+            if market_id in self._unsubscribed:
+                return
+            order_book = data.get("order_book", {})
+            timestamp = data.get("timestamp", 0)
+            is_snapshot = (msg_type == "subscribed/order_book")
+            offset = order_book.get("offset")
+            if offset is None:
+                offset = data.get("offset")
+            nonce = order_book.get("nonce")
+            self.message_sequence = nonce if nonce is not None else offset
+            if self.keep_book:
+                if not self._check_sequence(market_id, offset, nonce, order_book.get("begin_nonce"), is_snapshot, send):
+                    return
+                self._apply_book(
+                    market_id,
+                    ((level["price"], level["size"]) for level in order_book.get("bids", [])),
+                    ((level["price"], level["size"]) for level in order_book.get("asks", [])),
+                    timestamp, is_snapshot, offset,
                 )
-            except websocket.WebSocketException as e:
-                logger.error(f"WebSocket exception: {e}")
-            except ssl.SSLError as e:
-                logger.error(f"SSL error: {e}")
-            except Exception as e:
-                logger.error(f"WebSocket connection failed: {e}", exc_info=True)
-            finally:
-                self._ws = None
-
-            if self._running:
-                logger.info(f"Reconnecting in {self.reconnect_interval}s...")
-                time.sleep(self.reconnect_interval)
-
-    def stop(self):
-        """停止接收器"""
-        logger.info("Stopping receiver...")
-        self._running = False
-        if self._ws:
-            try:
-                self._ws.close()
-            except Exception:
-                pass
+            self._handle_orderbook_update(market_id, order_book, timestamp, is_snapshot)
+        else:
+            self._handle_common_message(msg_type, data, send)
@@ -0,0 +1,33 @@
+"""
+Lighter 订单簿消息的 msgspec 结构 (安装了 msgspec 时可用)
+
+subscribed/order_book、update/order_book 消息直接解码为这些结构，价格档位不经过 dict。
+"""
+
+from typing import List, Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+AVAILABLE = msgspec is not None
+
+if AVAILABLE:
+    class LighterLevel(msgspec.Struct):
+        price: str = "0"
+        size: str = "0"
+
+    class LighterOrderBook(msgspec.Struct):
+        asks: List[LighterLevel] = []
+        bids: List[LighterLevel] = []
+        offset: Optional[int] = None
+        nonce: Optional[int] = None
+        begin_nonce: Optional[int] = None
+
+    class LighterOrderBookFrame(msgspec.Struct):
+        type: str = ""
+        channel: str = ""
+        order_book: Optional[LighterOrderBook] = None
+        offset: Optional[int] = None
+        timestamp: int = 0
@@ -0,0 +1,212 @@
+"""
+Lighter DEX 分片接收器: 把市场拆分到多个 WebSocket 连接上
+
+每个连接最多订阅 markets_per_connection 个市场，各连接独立重连，
+连接运行在工作线程(mode="thread")或子进程(mode="process")中，
+所有分片的数据合并到同一组回调(on_snapshot/on_update/on_updates_batch/on_trade/on_error)，回调始终串行调用。
+
+process 模式下 JSON 解析和转换在子进程中完成，主进程只负责回调，适合订阅全部市场的场景。
+成交接收器的去重计数 duplicate_count 为所有分片之和 (process 模式由子进程随回调数据一起上报)。
+
+使用示例:
+    receiver = ShardedLighterReceiver(
+        LighterDepthReceiver,
+        market_ids=list(range(100)),
+        market_symbol_map=MARKET_SYMBOL_MAP,
+        markets_per_connection=10,
+        mode="process",
+    )
+    receiver.on_update = writer.write
+    receiver.start()
+"""
+
+import logging
+import queue
+import threading
+import multiprocessing
+from typing import Callable, Dict, List, Optional, Type
+
+from receiver_common.base_receiver import BaseWSReceiver, DATA_CALLBACK_NAMES
+
+logger = logging.getLogger(__name__)
+
+# 子进程上报去重计数时使用的伪回调名
+_DUPLICATES = "_duplicates"
+
+
+def split_markets(market_ids: List[int], markets_per_connection: int) -> List[List[int]]:
+    """按每个连接最多 markets_per_connection 个市场切分"""
+    size = max(1, markets_per_connection)
+    return [market_ids[i:i + size] for i in range(0, len(market_ids), size)]
+
+
+def _run_shard_process(
+    receiver_cls: Type[BaseWSReceiver],
+    market_ids: List[int],
+    market_symbol_map: Dict[int, str],
+    receiver_kwargs: dict,
+    callback_names: List[str],
+    out_queue,
+):
+    """子进程入口: 运行一个分片，每条 WebSocket 消息产生的回调数据打包成一次 put"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    receiver = receiver_cls(market_ids=market_ids, market_symbol_map=market_symbol_map, **receiver_kwargs)
+    pending = []
+
+    for name in callback_names:
+        setattr(receiver, name, lambda item, name=name: pending.append((name, item)))
+    receiver.on_error = lambda e: pending.append(("on_error", RuntimeError(f"shard {market_ids}: {e}")))
+
+    dispatch = receiver._dispatch_message
+    reported = [0]
+
+    def dispatch_and_flush(message, send):
+        dispatch(message, send)
+        duplicates = getattr(receiver, "duplicate_count", 0)
+        if duplicates != reported[0]:
+            reported[0] = duplicates
+            pending.append((_DUPLICATES, (market_ids[0], duplicates)))
+        if pending:
+            out_queue.put(list(pending))
+            pending.clear()
+
+    receiver._dispatch_message = dispatch_and_flush
+    try:
+        receiver.start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.stop()
+
+
+class ShardedLighterReceiver:
+    """Lighter 分片接收器，对外接口与单连接接收器一致(start/stop/回调)"""
+
+    def __init__(
+        self,
+        receiver_cls: Type[BaseWSReceiver],
+        market_ids: List[int],
+        market_symbol_map: Optional[Dict[int, str]] = None,
+        markets_per_connection: int = 10,
+        mode: str = "thread",
+        **receiver_kwargs,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"unknown shard mode: {mode}")
+        self.receiver_cls = receiver_cls
+        self.market_ids = market_ids
+        self.market_symbol_map = market_symbol_map or {}
+        self.markets_per_connection = markets_per_connection
+        self.mode = mode
+        self.receiver_kwargs = receiver_kwargs
+        self.shards = split_markets(market_ids, markets_per_connection)
+
+        self._running = False
+        self._callback_lock = threading.Lock()
+        self._receivers: List[BaseWSReceiver] = []
+        self._threads: List[threading.Thread] = []
+        self._processes: List[multiprocessing.Process] = []
+        self._process_duplicates: Dict[int, int] = {}
+        self._capture = None
+
+        # 回调函数 (合并所有分片)
+        self.on_snapshot: Optional[Callable] = None
+        self.on_update: Optional[Callable] = None
+        self.on_updates_batch: Optional[Callable] = None
+        self.on_trade: Optional[Callable] = None
+        self.on_error: Optional[Callable[[Exception], None]] = None
+
+    def set_capture(self, capture):
+        """录制所有分片收到的原始帧 (receiver_common.capture.FrameCapture)，仅支持 thread 模式"""
+        if capture is not None and self.mode != "thread":
+            raise ValueError("frame capture is only supported in thread shard mode")
+        self._capture = capture
+
+    @property
+    def duplicate_count(self) -> Optional[int]:
+        """所有分片去重丢弃的成交数，接收器不去重时为 None"""
+        if not hasattr(self.receiver_cls, "duplicate_count"):
+            return None
+        if self.mode == "process":
+            return sum(self._process_duplicates.values())
+        return sum(receiver.duplicate_count for receiver in self._receivers)
+
+    def _active_callbacks(self) -> List[str]:
+        return [name for name in DATA_CALLBACK_NAMES if getattr(self, name) is not None]
+
+    def _serialized(self, name: str) -> Callable:
+        """包装回调: 多个分片线程的回调串行执行"""
+        def callback(item):
+            func = getattr(self, name)
+            if func is None:
+                return
+            with self._callback_lock:
+                func(item)
+        return callback
+
+    def _start_threads(self):
+        for shard in self.shards:
+            receiver = self.receiver_cls(market_ids=shard, market_symbol_map=self.market_symbol_map, **self.receiver_kwargs)
+            for name in self._active_callbacks() + ["on_error"]:
+                setattr(receiver, name, self._serialized(name))
+            receiver.set_capture(self._capture)
+            thread = threading.Thread(target=receiver.start, name=f"lighter-shard-{shard[0]}", daemon=True)
+            self._receivers.append(receiver)
+            self._threads.append(thread)
+            thread.start()
+        while self._running and any(t.is_alive() for t in self._threads):
+            for thread in self._threads:
+                thread.join(timeout=0.5)
+
+    def _start_processes(self):
+        out_queue = multiprocessing.Queue(maxsize=100_000)
+        callback_names = self._active_callbacks()
+        for shard in self.shards:
+            process = multiprocessing.Process(
+                target=_run_shard_process,
+                args=(self.receiver_cls, shard, self.market_symbol_map, self.receiver_kwargs, callback_names, out_queue),
+                name=f"lighter-shard-{shard[0]}",
+                daemon=True,
+            )
+            self._processes.append(process)
+            process.start()
+
+        while self._running:
+            try:
+                batch = out_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._running and not any(p.is_alive() for p in self._processes):
+                    logger.error("All shard processes exited")
+                    break
+                continue
+            for name, item in batch:
+                if name == _DUPLICATES:
+                    shard_key, duplicates = item
+                    self._process_duplicates[shard_key] = duplicates
+                    continue
+                func = getattr(self, name)
+                if func is not None:
+                    func(item)
+
+    def start(self):
+        """启动所有分片 (阻塞)"""
+        self._running = True
+        logger.info(f"Starting {len(self.shards)} {self.mode} shards, {self.markets_per_connection} markets per connection")
+        for shard in self.shards:
+            logger.info(f"Shard markets: {shard}")
+        if self.mode == "thread":
+            self._start_threads()
+        else:
+            self._start_processes()
+
+    def stop(self):
+        """停止所有分片"""
+        logger.info("Stopping sharded receiver...")
+        self._running = False
+        for receiver in self._receivers:
+            receiver.stop()
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            process.join(timeout=5)
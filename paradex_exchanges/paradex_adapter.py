@@ -16,14 +16,10 @@ if sys.platform == 'win32':
         pass
 
 
-import aiohttp
 import asyncio
-import hashlib
-import random
 import math
 import re
 import time
-from enum import IntEnum
 from typing import Callable, Dict, Optional, Tuple
 import requests
 import asyncio
@@ -36,31 +32,6 @@ import time
 from collections import defaultdict
 
 
-# from eth_account.messages import encode_structured_data
-from eth_account.messages import encode_typed_data
-from eth_account.signers.local import LocalAccount
-from web3.auto import Web3, w3
-# from web3.middleware import construct_sign_and_send_raw_middleware
-
-from starknet_py.common import int_from_bytes
-from starknet_py.constants import RPC_CONTRACT_ERROR
-from starknet_py.hash.address import compute_address
-from starknet_py.hash.selector import get_selector_from_name
-from starknet_py.net.client import Client
-from starknet_py.net.client_errors import ClientError
-from starknet_py.net.client_models import Call, Hash, TransactionExecutionStatus, TransactionFinalityStatus
-from starknet_py.net.full_node_client import FullNodeClient
-from starknet_py.net.models import Address
-from starknet_py.net.signer.stark_curve_signer import KeyPair
-from starknet_py.proxy.contract_abi_resolver import ProxyConfig
-from starknet_py.proxy.proxy_check import ArgentProxyCheck, OpenZeppelinProxyCheck, ProxyCheck
-from starknet_py.transaction_errors import (
-    TransactionRevertedError,
-    TransactionNotReceivedError,
-)
-from starknet_py.utils.typed_data import TypedData
-from starkware.crypto.signature.signature import EC_ORDER
-
 sys.path.append(r".")
 
 from src.data_types import (
@@ -74,15 +45,22 @@ from src.data_types import (
     UmAccountInfo,
 )
 from src.enums import OrderStatus
-from src.utils import retry_wrapper, adjust_to_price_filter, adjust_to_lot_size
+from src.utils import retry_wrapper, adjust_to_price_filter, adjust_to_lot_size, LazyModule
 from src.log_kit import logger
 from src.exchange_adapter import ExchangeAdapter
+from src.shared_cache import get_shared_cache
+
+# 交易所元数据在本机共享缓存中的有效期(秒)
+EXCHANGE_INFO_CACHE_TTL = 60 * 60
 
 # from src.adapters.paradex_utils import build_auth_message, get_account
 # from src.adapters.paradex_shared import order_sign_message, flatten_signature, Order, OrderType, OrderSide
-from paradex_utils import build_auth_message, get_account
 from paradex_shared import order_sign_message, flatten_signature, Order, OrderType, OrderSide
 
+# starknet_py / starkware / web3 / eth_account 导入很重，延迟到第一次签名(获取JWT或下单)时再导入
+starknet_common = LazyModule("starknet_py.common")
+paradex_utils = LazyModule("paradex_utils")
+
 
 class ParadexAdapter(ExchangeAdapter):
     """
@@ -90,7 +68,13 @@ class ParadexAdapter(ExchangeAdapter):
     该类实现了与Lighter交易所的交互功能，包括订单管理、持仓查询、账户信息获取等
     """
     
-    def __init__(self, paradex_account_address, paradex_account_private_key, paradex_account_public_key="",proxy_url=None):
+    def __init__(self, paradex_account_address, paradex_account_private_key, paradex_account_public_key="",proxy_url=None,
+                 bbo_board: str = None):
+        """
+        Args:
+            bbo_board: 本机共享内存看板名称 (receiver_common/collector_main.py --bbo-board)，
+                设置后 get_orderbook_ticker 优先从看板读取
+        """
         # 初始化基础URL
         self.base_url = "https://api.prod.paradex.trade/v1"
         self.headers = {"accept": "application/json"}
@@ -125,11 +109,21 @@ class ParadexAdapter(ExchangeAdapter):
 
         assert len(price_decimal_dic) > 0, "get_exchange_info error"
         assert len(size_decimal_dic) > 0, "get_exchange_info error"
+
+        self.bbo_board = None
+        if bbo_board:
+            from receiver_common.bbo_board import BBOBoardReader
+            self.bbo_board = BBOBoardReader(bbo_board)
     
     def get_paradex_config_sync(self) -> Dict:
         """
-        Synchronous version of get_paradex_config
+        Synchronous version of get_paradex_config, shared across processes via the host cache
         """
+        cache = get_shared_cache()
+        paradex_config = cache.get("paradex_system_config")
+        if paradex_config is not None:
+            return paradex_config
+
         logger.info("Getting config...")
         path: str = "/system/config"
         
@@ -145,6 +139,8 @@ class ParadexAdapter(ExchangeAdapter):
             logger.error(message)
             logger.error(f"Status Code: {status_code}")
             logger.error(f"Response Text: {response_json}")
+        else:
+            cache.set("paradex_system_config", response_json, expire_at=time.time() + EXCHANGE_INFO_CACHE_TTL)
         
         return response_json
     
@@ -153,12 +149,12 @@ class ParadexAdapter(ExchangeAdapter):
     ) -> str:
         token = ""
 
-        chain_id = int_from_bytes(paradex_config["starknet_chain_id"].encode())
-        account = get_account(account_address, private_key, paradex_config)
+        chain_id = starknet_common.int_from_bytes(paradex_config["starknet_chain_id"].encode())
+        account = paradex_utils.get_account(account_address, private_key, paradex_config)
 
         now = int(time.time())
         expiry = now + 24 * 60 * 60 * 7
-        message = build_auth_message(chain_id, now, expiry)
+        message = paradex_utils.build_auth_message(chain_id, now, expiry)
         sig = account.sign_message(message)
 
         headers: Dict = {
@@ -199,12 +195,16 @@ class ParadexAdapter(ExchangeAdapter):
             return True
         return False
     
+    def _get_jwt_cache_key(self) -> str:
+        return f"paradex_jwt:{self.paradex_account_address}:{self.paradex_account_public_key}"
+
     def reset_token(self):
         """
-        重置token
+        重置token，同时清除本机共享缓存中的token
         """
         self.jwt_token = None
         self.next_expiry_timestamp = 0
+        get_shared_cache().delete(self._get_jwt_cache_key())
     
     def judge_auth_token_expired(self):
         t1 = time.time()
@@ -213,12 +213,17 @@ class ParadexAdapter(ExchangeAdapter):
             
             try:
                 # Call the synchronous get_jwt_token function
+                # 同一账户的 JWT 在本机所有进程间共享，只有缓存中没有可用 token 时才请求 /auth
                 logger.info("Getting JWT token...")
-                jwt_token, expiry = self.get_jwt_token(
-                    self.paradex_config,
-                    self.base_url,
-                    self.paradex_account_address,
-                    self.paradex_account_private_key,
+                jwt_token, expiry = get_shared_cache().get_or_create_with_expiry(
+                    self._get_jwt_cache_key(),
+                    lambda: self.get_jwt_token(
+                        self.paradex_config,
+                        self.base_url,
+                        self.paradex_account_address,
+                        self.paradex_account_private_key,
+                    ),
+                    min_remaining=60 * 60,
                 )
                 logger.info(f"JWT Token: {jwt_token} next_expiry_timestamp:{expiry}")
                 self.next_expiry_timestamp = expiry
@@ -228,13 +233,24 @@ class ParadexAdapter(ExchangeAdapter):
                 import traceback
                 traceback.print_exc()
     
-    def get_exchange_info(self):
+    def _fetch_markets(self) -> Optional[list]:
+        """请求 /markets 接口，返回原始 results 列表，失败返回 None"""
         url = f"{self.base_url}/markets"
         data = requests.get(url, headers=self.headers, proxies=self.proxies, timeout=60)
         if data.status_code == 200:
-            js_data = data.json()
-            results = js_data["results"]
+            return data.json()["results"]
+        return None
 
+    def get_exchange_info(self):
+        """获得交易所信息，优先读取本机共享缓存"""
+        cache = get_shared_cache()
+        results = cache.get("paradex_markets")
+        if results is None:
+            results = self._fetch_markets()
+            if results is not None:
+                cache.set("paradex_markets", results, expire_at=time.time() + EXCHANGE_INFO_CACHE_TTL)
+
+        if results is not None:
             price_decimal_dic = {}
             size_decimal_dic = {}
             min_notional_dic = {}
@@ -270,6 +286,23 @@ class ParadexAdapter(ExchangeAdapter):
         Returns:
             AdapterResponse: 包含错误信息的响应
         """
+        if self.bbo_board is not None:
+            # 本机采集进程的共享内存看板，数据过期或没有该交易对时再走 REST
+            ticker = self.bbo_board.get(f"paradex:{symbol}")
+            if ticker is not None and ticker.bids and ticker.asks:
+                return AdapterResponse(
+                    success=True,
+                    data=BookTicker(
+                        symbol=symbol,
+                        time=ticker.timestamp // 1000,
+                        bid_price=ticker.bids[0][0],
+                        ask_price=ticker.asks[0][0],
+                        ask_size=ticker.asks[0][1],
+                        bid_size=ticker.bids[0][1],
+                    ),
+                    error_msg=None,
+                )
+
         url = f"{self.base_url}/orderbook/{symbol}"
         data = requests.get(url, headers=self.headers, proxies=self.proxies, timeout=60)
         if data.status_code == 200:
@@ -554,8 +587,8 @@ class ParadexAdapter(ExchangeAdapter):
         """
         Synchronous version of sign_order
         """
-        chain_id = int_from_bytes(paradex_config["starknet_chain_id"].encode())
-        account = get_account(account_address, private_key, paradex_config)
+        chain_id = starknet_common.int_from_bytes(paradex_config["starknet_chain_id"].encode())
+        account = paradex_utils.get_account(account_address, private_key, paradex_config)
         message = order_sign_message(chain_id, order)
         
         sig = account.sign_message(message)
@@ -4,6 +4,7 @@ Paradex WebSocket data receiver for depth and trades
 
 from .receiver import ParadexDepthReceiver
 from .trades_receiver import ParadexTradesReceiver
+from .snapshot_delta import SnapshotDeltaEncoder
 from .data_types import (
     ParadexOrderBookMessage, 
     TardisL2Update, 
@@ -15,6 +16,7 @@ from .data_types import (
 __all__ = [
     "ParadexDepthReceiver", 
     "ParadexTradesReceiver",
+    "SnapshotDeltaEncoder",
     "ParadexOrderBookMessage", 
     "ParadexTradeMessage",
     "TardisL2Update", 
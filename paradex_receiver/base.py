@@ -0,0 +1,163 @@
+"""
+Paradex WebSocket JSON-RPC 协议: 认证、订阅、ping/pong
+
+深度和交易接收器共用，子类只需要提供订阅的频道和订阅数据的处理。
+运行中可以用 subscribe(symbol) / unsubscribe(symbol) 增减交易对，直接在当前连接上发送订阅请求。
+"""
+
+import logging
+from typing import Callable, List, Set, Tuple
+
+from receiver_common.base_receiver import BaseWSReceiver
+
+logger = logging.getLogger(__name__)
+
+WS_URL = "wss://ws.api.prod.paradex.trade/v1"
+
+# 预先序列化的 pong 回复，只需要拼接请求 id
+PONG_PREFIX = '{"jsonrpc":"2.0","method":"pong","id":'
+
+
+class ParadexJsonRpcReceiver(BaseWSReceiver):
+    """Paradex JSON-RPC 接收器基类"""
+
+    def __init__(
+        self,
+        symbols: List[str],
+        bearer_token: str,
+        reconnect_interval: float = 5.0,
+        ping_interval: int = 30,
+        ping_timeout: int = 10,
+        heartbeat_timeout: float = 120,
+        ws_url: str = WS_URL,
+    ):
+        super().__init__(ws_url, reconnect_interval, ping_interval, ping_timeout, heartbeat_timeout)
+        self.symbols = symbols
+        self.bearer_token = bearer_token
+        self._next_request_id = 1
+        # 运行中退订的交易对，退订前已经在路上的消息按它丢弃 (_handle_message 中统一检查，各模式都不会再回调)
+        self._unsubscribed: Set[str] = set()
+
+    def _get_channels(self) -> List[Tuple[str, str]]:
+        """返回 [(symbol, channel)]"""
+        raise NotImplementedError
+
+    def _handle_subscription(self, data: dict, send: Callable[[str], None]):
+        """处理 method=subscription 的推送数据"""
+        raise NotImplementedError
+
+    def _get_subscribe_messages(self) -> List[str]:
+        # 先进行认证
+        auth_msg = {
+            "jsonrpc": "2.0",
+            "method": "auth",
+            "params": {
+                "bearer": self.bearer_token
+            },
+            "id": 0
+        }
+        messages = [self.codec.dumps(auth_msg)]
+        logger.info("Sent authentication")
+
+        channels = self._get_channels()
+        for i, (symbol, channel) in enumerate(channels, 1):
+            messages.append(self._rpc_message("subscribe", channel, i))
+            logger.info(f"Subscribed to {symbol} with channel: {channel}")
+        self._next_request_id = len(channels) + 1
+        return messages
+
+    def _channel_of(self, symbol: str) -> str:
+        for channel_symbol, channel in self._get_channels():
+            if channel_symbol == symbol:
+                return channel
+        raise KeyError(symbol)
+
+    def subscribe(self, symbol: str) -> bool:
+        """运行中订阅一个交易对 (可在任意线程调用)，已订阅时返回 False
+
+        未连接时只记录下来，下次连接建立时一起订阅。
+        """
+        if symbol in self.symbols:
+            return False
+        self._unsubscribed.discard(symbol)
+        # 整体替换列表，重连线程遍历的旧列表不受影响
+        self.symbols = self.symbols + [symbol]
+        channel = self._channel_of(symbol)
+        if self._send_live(self._rpc_message("subscribe", channel)):
+            logger.info(f"Subscribed to {symbol} with channel: {channel}")
+        return True
+
+    def unsubscribe(self, symbol: str) -> bool:
+        """运行中退订一个交易对 (可在任意线程调用)，未订阅时返回 False"""
+        if symbol not in self.symbols:
+            return False
+        channel = self._channel_of(symbol)
+        self._unsubscribed.add(symbol)
+        self.symbols = [s for s in self.symbols if s != symbol]
+        if self._send_live(self._rpc_message("unsubscribe", channel)):
+            logger.info(f"Unsubscribed from {symbol} with channel: {channel}")
+        return True
+
+    def _is_unsubscribed_channel(self, channel: str) -> bool:
+        """频道 (order_book.{symbol}.* / trades.{symbol}) 所属的交易对是否已经退订"""
+        unsubscribed = self._unsubscribed
+        if not unsubscribed:
+            return False
+        parts = channel.split(".", 2)
+        return len(parts) > 1 and parts[1] in unsubscribed
+
+    def subscriptions(self) -> List[str]:
+        """当前订阅的交易对"""
+        return list(self.symbols)
+
+    def _rpc_message(self, method: str, channel: str, request_id: int = None) -> str:
+        """subscribe / unsubscribe 请求，不指定 id 时使用递增的请求 id"""
+        if request_id is None:
+            request_id = self._next_request_id
+            self._next_request_id += 1
+        return self.codec.dumps({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": {
+                "channel": channel
+            },
+            "id": request_id
+        })
+
+    def _send_pong(self, data: dict, send: Callable[[str], None]):
+        # 服务器发送 ping，需要回复 pong
+        ping_id = data.get("id")
+        if isinstance(ping_id, int):
+            send(f"{PONG_PREFIX}{ping_id}}}")
+        else:
+            send(self.codec.dumps({"jsonrpc": "2.0", "method": "pong", "id": ping_id}))
+        logger.debug("Received ping, sent pong")
+
+    def _handle_control_message(self, message: str, send: Callable[[str], None]) -> bool:
+        # ping 消息很短，只在疑似 ping 时才解析；skip_utf8_validation 时文本帧是 bytes
+        if len(message) < 128 and (b'"ping"' if isinstance(message, bytes) else '"ping"') in message:
+            data = self.codec.loads(message)
+            if data.get("method") == "ping":
+                self._send_pong(data, send)
+                return True
+        return False
+
+    def _handle_message(self, message: str, send: Callable[[str], None]):
+        data = self.codec.loads(message)
+        method = data.get("method")
+
+        if method == "subscription":
+            # 这是订阅数据，已退订交易对的推送直接丢弃
+            if self._is_unsubscribed_channel(data.get("params", {}).get("channel", "")):
+                return
+            self._handle_subscription(data, send)
+        elif method == "ping":
+            self._send_pong(data, send)
+        elif method == "pong":
+            logger.debug("Received pong")
+        elif "result" in data:
+            # 这是认证或订阅确认响应
+            logger.info(f"Response: {data}")
+        elif "error" in data:
+            # 错误响应
+            logger.error(f"Server error: {data}")
@@ -1,17 +1,30 @@
 """
 Paradex 深度数据接收器 - 按天记录到 CSV (Tardis book_snapshot_15 格式)
+
+--suppress-unchanged 跳过与上一条相同的快照，--delta-encode 改为记录相对上一条快照的增量 (incremental_book_L2 格式)。
+--deltas 订阅增量频道，直接记录交易所推送的增量 (incremental_book_L2 格式)。
 """
 
 import logging
 import argparse
-import gzip
 import sys
 import os
-from datetime import datetime, timezone
-from typing import Dict, Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from paradex_receiver import ParadexDepthReceiver, TardisL2Snapshot
+from paradex_receiver.base import WS_URL
+from paradex_receiver.receiver import MODE_DELTAS, MODE_SNAPSHOT
+from paradex_receiver.snapshot_delta import SnapshotDeltaEncoder
+from receiver_common.batch import L2UpdateBatch
+from receiver_common.capture import FrameCapture
+from receiver_common.control import ControlServer, add_control_arguments, register_receivers
+from receiver_common.metrics import add_metrics_arguments, start_metrics
+from receiver_common.pipeline import FramePipeline
+from receiver_common.redundant import RedundantReceiver
+from receiver_common.ring_buffer import POLICIES
+from receiver_common.supervisor import add_stall_arguments, stall_kwargs
+from receiver_common.parquet_writer import DailyParquetWriter, COL_BOOL, COL_DICT, COL_INT64, COL_SCALED
+from receiver_common.writer import DailyFileWriter, FORMAT_PARQUET, add_writer_arguments, get_parquet_options, get_writer_options
 
 sys.path.append("/home/ec2-user/test_lighter_dex/adapter_exchanges/lighter_receiver")
 sys.path.append("/Users/shenzhuoheng/quant_yz/git/adapter_exchanges/paradex_receiver")
@@ -37,95 +50,92 @@ def get_book_snapshot_15_header() -> str:
     return ",".join(header) + "\n"
 
 
-class DailyCSVWriter:
+class DailyCSVWriter(DailyFileWriter):
     """按天按symbol保存CSV文件，格式: {output_dir}/{exchange}_book_snapshot_15_{symbol}_{date}.csv.gz"""
 
-    def __init__(self, output_dir: str, exchange: str = "paradex", compress: bool = True):
-        self.output_dir = output_dir
-        self.exchange = exchange
-        self.compress = compress
-        self._files: Dict[str, object] = {}  # key: symbol_date
-        self._current_dates: Dict[str, str] = {}  # key: symbol, value: date
-        self._update_counts: Dict[str, int] = {}  # key: symbol_date
-        os.makedirs(output_dir, exist_ok=True)
-
-    def _get_date_from_timestamp(self, timestamp_us: int) -> str:
-        """从微秒时间戳获取日期字符串 YYYY-MM-DD"""
-        dt = datetime.fromtimestamp(timestamp_us / 1_000_000, tz=timezone.utc)
-        return dt.strftime("%Y-%m-%d")
-
-    def _get_file_key(self, symbol: str, date: str) -> str:
-        return f"{symbol}_{date}"
-
-    def _get_file_path(self, symbol: str, date: str) -> str:
-        filename = f"{self.exchange}_book_snapshot_15_{symbol}_{date}.csv"
-        if self.compress:
-            filename += ".gz"
-        return os.path.join(self.output_dir, filename)
-
-    def _open_file(self, symbol: str, date: str):
-        """打开或创建新的日期文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            return
+    FILE_KIND = "book_snapshot_15"
+    HEADER = get_book_snapshot_15_header()
 
-        file_path = self._get_file_path(symbol, date)
-        if self.compress:
-            f = gzip.open(file_path, "wt", encoding="utf-8")
-        else:
-            f = open(file_path, "w", encoding="utf-8")
-        f.write(get_book_snapshot_15_header())
-        self._files[file_key] = f
-        self._update_counts[file_key] = 0
-        logger.info(f"创建新文件: {file_path}")
-
-    def _close_file(self, symbol: str, date: str):
-        """关闭指定文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            self._files[file_key].close()
-            count = self._update_counts.get(file_key, 0)
-            file_path = self._get_file_path(symbol, date)
-            logger.info(f"关闭文件: {file_path}，共 {count} 条记录")
-            del self._files[file_key]
-            if file_key in self._update_counts:
-                del self._update_counts[file_key]
+    def __init__(self, output_dir: str, exchange: str = "paradex", compress: bool = True, **kwargs):
+        super().__init__(output_dir, exchange, compress, **kwargs)
 
     def write_snapshot(self, snapshot: TardisL2Snapshot):
         """写入一条快照记录"""
-        symbol = snapshot.symbol
-        date = self._get_date_from_timestamp(snapshot.timestamp)
+        self.write_text(snapshot.symbol, snapshot.timestamp, snapshot.to_book_snapshot_15_row() + "\n")
+
+
+class DailyParquetSnapshotWriter(DailyParquetWriter):
+    """按天按symbol保存Parquet文件，格式: {output_dir}/{exchange}_book_snapshot_15_{symbol}_{date}.parquet"""
+
+    FILE_KIND = "book_snapshot_15"
+    COLUMNS = [
+        ("exchange", COL_DICT),
+        ("symbol", COL_DICT),
+        ("timestamp", COL_INT64),
+        ("local_timestamp", COL_INT64),
+    ] + [(name, COL_SCALED) for name in get_book_snapshot_15_header().rstrip("\n").split(",")[4:]]
+
+    def __init__(self, output_dir: str, exchange: str = "paradex", **kwargs):
+        super().__init__(output_dir, exchange, **kwargs)
+
+    def write_snapshot(self, snapshot: TardisL2Snapshot):
+        """写入一条快照记录，不足15档的位置为空"""
+        row = [snapshot.exchange, snapshot.symbol, snapshot.timestamp, snapshot.local_timestamp]
+        for levels in (snapshot.asks, snapshot.bids):
+            for i in range(15):
+                if i < len(levels):
+                    row.extend([levels[i].price, levels[i].amount])
+                else:
+                    row.extend(["", ""])
+        self.write_row(snapshot.symbol, snapshot.timestamp, row)
 
-        # 检查是否需要切换到新的日期文件
-        old_date = self._current_dates.get(symbol)
-        if old_date and old_date != date:
-            self._close_file(symbol, old_date)
 
-        self._current_dates[symbol] = date
-        file_key = self._get_file_key(symbol, date)
+INCREMENTAL_CSV_HEADER = "exchange,symbol,timestamp,local_timestamp,is_snapshot,side,price,amount\n"
 
-        # 确保文件已打开
-        if file_key not in self._files:
-            self._open_file(symbol, date)
 
-        # 写入数据
-        self._files[file_key].write(snapshot.to_book_snapshot_15_row() + "\n")
-        self._update_counts[file_key] = self._update_counts.get(file_key, 0) + 1
+class DailyIncrementalCSVWriter(DailyFileWriter):
+    """按天按symbol保存快照增量，格式: {output_dir}/{exchange}_incremental_book_L2_{symbol}_{date}.csv.gz"""
 
-        # 定期flush
-        if self._update_counts[file_key] % 100 == 0:
-            self._files[file_key].flush()
-            logger.info(f"[{symbol}][{date}] 已写入 {self._update_counts[file_key]} 条记录")
+    FILE_KIND = "incremental_book_L2"
+    HEADER = INCREMENTAL_CSV_HEADER
 
-    def close_all(self):
-        """关闭所有文件"""
-        for symbol, date in list(self._current_dates.items()):
-            self._close_file(symbol, date)
-        self._current_dates.clear()
+    def __init__(self, output_dir: str, exchange: str = "paradex", compress: bool = True, **kwargs):
+        super().__init__(output_dir, exchange, compress, **kwargs)
 
-    def get_total_count(self) -> int:
-        """获取总记录数"""
-        return sum(self._update_counts.values())
+    def write_batch(self, batch: L2UpdateBatch):
+        """写入一条快照的增量"""
+        if not batch.prices:
+            return
+        self.write_text(batch.symbol, batch.timestamp, batch.to_csv(), len(batch))
+
+
+class DailyIncrementalParquetWriter(DailyParquetWriter):
+    """按天按symbol保存快照增量，格式: {output_dir}/{exchange}_incremental_book_L2_{symbol}_{date}.parquet"""
+
+    FILE_KIND = "incremental_book_L2"
+    COLUMNS = [
+        ("exchange", COL_DICT),
+        ("symbol", COL_DICT),
+        ("timestamp", COL_INT64),
+        ("local_timestamp", COL_INT64),
+        ("is_snapshot", COL_BOOL),
+        ("side", COL_DICT),
+        ("price", COL_SCALED),
+        ("amount", COL_SCALED),
+    ]
+
+    def __init__(self, output_dir: str, exchange: str = "paradex", **kwargs):
+        super().__init__(output_dir, exchange, **kwargs)
+
+    def write_batch(self, batch: L2UpdateBatch):
+        """写入一条快照的增量"""
+        n = len(batch)
+        if not n:
+            return
+        self.write_columns(batch.symbol, batch.timestamp, [
+            [batch.exchange] * n, [batch.symbol] * n, [batch.timestamp] * n, [batch.local_timestamp] * n,
+            [batch.is_snapshot] * n, batch.sides, batch.prices, batch.amounts,
+        ])
 
 
 def main():
@@ -144,6 +154,32 @@ def main():
                       help="最小变化 (默认: 0_01)")
     parser.add_argument("--no-compress", action="store_true", 
                       help="不压缩CSV文件")
+    parser.add_argument("--suppress-unchanged", action="store_true",
+                      help="跳过与上一条完全相同的快照")
+    parser.add_argument("--delta-encode", action="store_true",
+                      help="记录相对上一条快照变化的档位 (incremental_book_L2 格式)，代替完整快照")
+    parser.add_argument("--full-snapshot-interval", type=float, default=60.0,
+                      help="--suppress-unchanged/--delta-encode 时每隔多少秒仍输出一次完整快照 (默认: 60)")
+    parser.add_argument("--deltas", action="store_true",
+                      help="订阅增量频道并在本地维护订单簿，逐条记录增量 (incremental_book_L2 格式，忽略 --frequency/--min-delta)")
+    parser.add_argument("--buffer-size", type=int, default=100_000,
+                      help="接收/解析/写盘流水线缓冲区大小，0 表示在 WebSocket 线程中直接处理 (默认: 100000)")
+    parser.add_argument("--backpressure", type=str, default="block", choices=POLICIES,
+                      help="缓冲区满时的处理策略 (默认: block)")
+    parser.add_argument("--spill-dir", type=str, default=None,
+                      help="spill 策略的溢出文件目录 (默认: 系统临时目录)")
+    add_writer_arguments(parser)
+    add_metrics_arguments(parser)
+    add_control_arguments(parser)
+    add_stall_arguments(parser)
+    parser.add_argument("--ws-url", type=str, default=WS_URL,
+                      help="WebSocket 地址，可指向 receiver_common/standin_server.py 做本地压测 (默认: 主网)")
+    parser.add_argument("--capture", type=str, default="",
+                      help="把收到的原始帧录制到该文件，可用 receiver_common/replay.py 回放")
+    parser.add_argument("--redundant", type=int, default=1,
+                      help="同时开几条连接，按 seq_no 去重取先到的 (建议同时使用 --deltas，默认: 1)")
+    parser.add_argument("--proxies", type=str, default="",
+                      help="各条冗余连接的代理，逗号分隔，空表示直连，如 ,http://127.0.0.1:7890")
 
     args = parser.parse_args()
     
@@ -152,24 +188,79 @@ def main():
     args.no_compress = True
 
     symbols = [x.strip() for x in args.symbols.split(",")]
-    
-    writer = DailyCSVWriter(
-        output_dir=args.output_dir,
-        exchange="paradex",
-        compress=not args.no_compress,
-    )
-
-    def on_snapshot(snapshot: TardisL2Snapshot):
-        writer.write_snapshot(snapshot)
-
-    receiver = ParadexDepthReceiver(
+    if args.deltas and (args.delta_encode or args.suppress_unchanged):
+        parser.error("--deltas 直接记录交易所的增量，不能与 --delta-encode/--suppress-unchanged 同时使用")
+
+    incremental = args.deltas or args.delta_encode
+    if args.format == FORMAT_PARQUET:
+        writer_cls = DailyIncrementalParquetWriter if incremental else DailyParquetSnapshotWriter
+        writer = writer_cls(output_dir=args.output_dir, exchange="paradex", **get_parquet_options(args))
+    else:
+        writer_cls = DailyIncrementalCSVWriter if incremental else DailyCSVWriter
+        writer = writer_cls(
+            output_dir=args.output_dir,
+            exchange="paradex",
+            compress=not args.no_compress,
+            **get_writer_options(args),
+        )
+
+    encoder = SnapshotDeltaEncoder(args.full_snapshot_interval)
+    if args.delta_encode:
+        def on_snapshot(snapshot: TardisL2Snapshot):
+            batch = encoder.encode(snapshot)
+            if batch is not None:
+                writer.write_batch(batch)
+    elif args.suppress_unchanged:
+        def on_snapshot(snapshot: TardisL2Snapshot):
+            if encoder.should_write(snapshot):
+                writer.write_snapshot(snapshot)
+    else:
+        def on_snapshot(snapshot: TardisL2Snapshot):
+            writer.write_snapshot(snapshot)
+
+    receiver_kwargs = dict(
         symbols=symbols,
         bearer_token=args.token,
         levels=args.levels,
         frequency=args.frequency,
-        min_delta=args.min_delta
+        min_delta=args.min_delta,
+        ws_url=args.ws_url,
+        mode=MODE_DELTAS if args.deltas else MODE_SNAPSHOT,
+        **stall_kwargs(args.stall_timeout),
     )
-    receiver.on_snapshot = on_snapshot
+    if args.redundant > 1:
+        receiver = RedundantReceiver(
+            ParadexDepthReceiver,
+            copies=args.redundant,
+            proxies=[x.strip() or None for x in args.proxies.split(",")],
+            **receiver_kwargs,
+        )
+    else:
+        receiver = ParadexDepthReceiver(**receiver_kwargs)
+    if args.deltas:
+        # 增量模式直接写增量，不再为每条增量生成前 levels 档快照
+        receiver.on_updates_batch = writer.write_batch
+    else:
+        receiver.on_snapshot = on_snapshot
+
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture)
+        receiver.set_capture(capture)
+
+    # 在流水线接管回调之前包装，回调耗时统计的是写盘线程中的实际处理
+    metrics = start_metrics(args, [receiver])
+
+    pipeline = None
+    if args.buffer_size > 0 and isinstance(receiver, ParadexDepthReceiver):
+        pipeline = FramePipeline(receiver, capacity=args.buffer_size, policy=args.backpressure, spill_dir=args.spill_dir)
+        pipeline.start()
+
+    control = None
+    if args.control_socket:
+        control = ControlServer(args.control_socket)
+        register_receivers(control, "paradex", [receiver], [writer], lambda market, symbol: (market,), lambda symbol: symbol)
+        control.start()
 
     try:
         logger.info(f"开始接收数据，交易对: {symbols}，输出目录: {args.output_dir}")
@@ -178,9 +269,19 @@ def main():
     except KeyboardInterrupt:
         logger.info("用户中断")
     finally:
+        if control:
+            control.stop()
         receiver.stop()
+        if capture:
+            capture.close()
+        if pipeline:
+            pipeline.stop()
+        if metrics:
+            metrics.stop()
         writer.close_all()
         logger.info(f"总共写入 {writer.get_total_count()} 条记录")
+        if encoder.snapshots:
+            logger.info(f"Suppressed {encoder.suppressed}/{encoder.snapshots} unchanged snapshots")
 
 
 if __name__ == "__main__":
@@ -2,21 +2,25 @@
 Paradex WebSocket 深度数据接收器
 """
 
-import json
 import logging
-import ssl
 import time
-import threading
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
+from receiver_common.batch import L2UpdateBatch, SIDE_ASK, SIDE_BID
+from receiver_common.json_codec import typed_decoder
+from receiver_common.orderbook import L2OrderBook
+from .base import ParadexJsonRpcReceiver, WS_URL
 from .data_types import TardisL2Update, TardisL2Snapshot, ParadexOrderBookMessage, TardisL2PriceLevel
 
 logger = logging.getLogger(__name__)
 
-WS_URL = "wss://ws.api.prod.paradex.trade/v1"
+# 订阅方式
+MODE_SNAPSHOT = "snapshot"  # order_book.{symbol}.snapshot@{levels}@{frequency}@{min_delta}，每条消息是完整的前 N 档
+MODE_DELTAS = "deltas"      # order_book.{symbol}.deltas，首条为快照，之后只推送变化的档位
+MODES = (MODE_SNAPSHOT, MODE_DELTAS)
 
 
-class ParadexDepthReceiver:
+class ParadexDepthReceiver(ParadexJsonRpcReceiver):
     """
     Paradex WebSocket 深度数据接收器
 
@@ -30,6 +34,11 @@ class ParadexDepthReceiver:
         )
         receiver.on_snapshot = on_snapshot
         receiver.start()
+
+    mode="deltas" 时订阅增量频道，本地维护完整深度的订单簿 (self.books) 并检查 seq_no 逐条加 1:
+        - on_updates_batch / on_update 收到真正的增量 (删除的档位 amount 为 "0")，首条快照 is_snapshot=True
+        - on_snapshot 收到本地订单簿的前 levels 档
+    seq_no 出现缺口时丢弃该交易对的增量，只对这个交易对退订再订阅拿新快照。
     """
 
     def __init__(
@@ -42,29 +51,178 @@ class ParadexDepthReceiver:
         reconnect_interval: float = 5.0,
         ping_interval: int = 30,  # 更频繁的 ping
         ping_timeout: int = 10,   # 更短的超时
-        heartbeat_timeout: int = 120,  # 更短的心跳超时
+        heartbeat_timeout: float = 120,  # 更短的心跳超时
+        ws_url: str = WS_URL,
+        mode: str = MODE_SNAPSHOT,
+        resync_timeout: float = 10.0,
     ):
-        self.symbols = symbols
-        self.bearer_token = bearer_token
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}, expected one of {MODES}")
+        super().__init__(symbols, bearer_token, reconnect_interval, ping_interval, ping_timeout, heartbeat_timeout, ws_url)
         self.levels = levels
         self.frequency = frequency
         self.min_delta = min_delta
-        self.reconnect_interval = reconnect_interval
-        self.ping_interval = ping_interval
-        self.ping_timeout = ping_timeout
-        self.heartbeat_timeout = heartbeat_timeout
-
-        self._running = False
-        self._ws = None
-        self._last_message_time = 0
-        self._heartbeat_thread = None
+        self.mode = mode
+        self.resync_timeout = resync_timeout
 
         # 回调函数
         self.on_snapshot: Optional[Callable[[TardisL2Snapshot], None]] = None
         self.on_update: Optional[Callable[[TardisL2Update], None]] = None
-        self.on_error: Optional[Callable[[Exception], None]] = None
+        self.on_updates_batch: Optional[Callable[[L2UpdateBatch], None]] = None
+        # 增量模式下本地订单簿应用一条消息后回调 (symbol, book)，book 会被后续消息继续修改
+        self.on_book: Optional[Callable[[str, L2OrderBook], None]] = None
+
+        self._typed_decode = None
+
+        # 增量模式的本地订单簿和 seq_no 检查
+        self.books: Dict[str, L2OrderBook] = {}
+        self.gap_count = 0
+        self.stale_count = 0
+        self._seq_nos: Dict[str, int] = {}
+        self._resyncing: Dict[str, float] = {}  # symbol -> 发出重新订阅的时间
+
+    def enable_typed_decode(self) -> bool:
+        """订单簿订阅消息按 paradex_receiver.schema 的结构直接解码，未安装 msgspec 时返回 False"""
+        from . import schema
+        if not schema.AVAILABLE:
+            logger.warning("msgspec not installed, typed decode disabled")
+            return False
+        # 只解码 order_book 频道的消息，其他消息走 dict 路径
+        self._typed_decode = typed_decoder(schema.ParadexBookFrame, marker='"order_book.')
+        return True
+
+    def _reset_connection_state(self):
+        # 新连接的每个订阅都会先推送快照，之前的 seq_no 不再有效
+        self._seq_nos.clear()
+        self._resyncing.clear()
+
+    def unsubscribe(self, symbol: str) -> bool:
+        if not super().unsubscribe(symbol):
+            return False
+        self.books.pop(symbol, None)
+        self._seq_nos.pop(symbol, None)
+        self._resyncing.pop(symbol, None)
+        return True
+
+    def get_book(self, symbol: str) -> Optional[L2OrderBook]:
+        """增量模式下交易对当前的订单簿，未收到快照或正在重新同步时返回 None"""
+        if symbol in self._resyncing:
+            return None
+        return self.books.get(symbol)
+
+    def _delta_channel(self, symbol: str) -> str:
+        return f"order_book.{symbol}.deltas"
+
+    def _resubscribe(self, symbol: str, send: Callable[[str], None]):
+        """只对一个交易对退订再订阅，服务器会重新推送快照"""
+        self._resyncing[symbol] = time.monotonic()
+        channel = self._delta_channel(symbol)
+        send(self._rpc_message("unsubscribe", channel))
+        send(self._rpc_message("subscribe", channel))
+
+    def _check_seq_no(self, symbol: str, seq_no: int, is_snapshot: bool, send: Callable[[str], None]) -> bool:
+        """检查 seq_no 连续性，返回 False 表示丢弃该消息"""
+        if is_snapshot:
+            self._resyncing.pop(symbol, None)
+            self._seq_nos[symbol] = seq_no
+            return True
+
+        resync_at = self._resyncing.get(symbol)
+        if resync_at is not None:
+            # 等待新快照期间的增量全部丢弃，快照迟迟不来时再请求一次
+            if time.monotonic() - resync_at > self.resync_timeout:
+                logger.warning(f"{symbol}: no snapshot {self.resync_timeout}s after resubscribe, retrying")
+                self._resubscribe(symbol, send)
+            return False
+
+        last = self._seq_nos.get(symbol)
+        if last is not None and seq_no == last + 1:
+            self._seq_nos[symbol] = seq_no
+            return True
+        if last is not None and seq_no <= last:
+            # 重复或乱序到达的旧消息
+            self.stale_count += 1
+            logger.debug(f"{symbol}: dropped stale delta seq_no={seq_no}")
+            return False
 
-    def _handle_subscription_data(self, data: dict):
+        self.gap_count += 1
+        logger.warning(f"{symbol}: seq_no gap (last={last}, got={seq_no}), resubscribing for a fresh snapshot")
+        book = self.books.get(symbol)
+        if book is not None:
+            book.clear()
+        self._resubscribe(symbol, send)
+        return False
+
+    def _handle_delta(
+        self,
+        symbol: str,
+        update_type: str,
+        seq_no: int,
+        last_updated_at: int,
+        changes: List[Tuple[str, str, str]],
+        send: Callable[[str], None],
+    ):
+        """增量模式: 更新本地订单簿并回调增量，changes 为 [(side, price, amount)]，删除的档位数量为 0"""
+        is_snapshot = update_type == "s"
+        self.message_sequence = seq_no
+        if not self._check_seq_no(symbol, seq_no, is_snapshot, send):
+            return
+
+        current_time_us = self.recv_timestamp_us
+        timestamp_us = last_updated_at * 1000 if last_updated_at else current_time_us
+
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = L2OrderBook("paradex", symbol)
+        if is_snapshot:
+            book.clear()
+        bid_side, ask_side = book.bids, book.asks
+        sides = []
+        prices = []
+        amounts = []
+        for side, price, amount in changes:
+            if side == "BUY":
+                bid_side.set(price, amount)
+                sides.append(SIDE_BID)
+            else:
+                ask_side.set(price, amount)
+                sides.append(SIDE_ASK)
+            prices.append(price)
+            amounts.append(amount)
+        book.timestamp = timestamp_us
+        book.local_timestamp = current_time_us
+        book.sequence = seq_no
+
+        if self.on_book:
+            self.on_book(symbol, book)
+        if self.on_updates_batch:
+            self.on_updates_batch(L2UpdateBatch(
+                "paradex", symbol, timestamp_us, current_time_us, is_snapshot, sides, prices, amounts
+            ))
+        if self.on_update:
+            for side, price, amount in zip(sides, prices, amounts):
+                self.on_update(TardisL2Update(
+                    exchange="paradex",
+                    symbol=symbol,
+                    timestamp=timestamp_us,
+                    local_timestamp=current_time_us,
+                    is_snapshot=is_snapshot,
+                    side=side,
+                    price=price,
+                    amount=amount,
+                ))
+        if self.on_snapshot:
+            bids, asks = book.top(self.levels)
+            self.on_snapshot(TardisL2Snapshot(
+                exchange="paradex",
+                symbol=symbol,
+                timestamp=timestamp_us,
+                local_timestamp=current_time_us,
+                bids=[TardisL2PriceLevel(price=price, amount=amount) for price, amount in bids],
+                asks=[TardisL2PriceLevel(price=price, amount=amount) for price, amount in asks],
+            ))
+
+    def _handle_subscription_data(self, data: dict, send: Callable[[str], None]):
         """处理订阅数据"""
         try:
             # 检查是否是 order_book 数据
@@ -73,195 +231,132 @@ class ParadexDepthReceiver:
             
             if not channel.startswith("order_book."):
                 return
-                
+
+            if self.mode == MODE_DELTAS:
+                book_data = params.get("data", {})
+                changes = [(level.get("side"), level.get("price", "0"), level.get("size", "0")) for level in book_data.get("inserts", [])]
+                changes += [(level.get("side"), level.get("price", "0"), level.get("size", "0")) for level in book_data.get("updates", [])]
+                changes += [(level.get("side"), level.get("price", "0"), "0") for level in book_data.get("deletes", [])]
+                self._handle_delta(
+                    book_data.get("market", ""), book_data.get("update_type", ""), book_data.get("seq_no", 0),
+                    book_data.get("last_updated_at", 0), changes, send,
+                )
+                return
+
             message = ParadexOrderBookMessage.from_ws_message(data)
-            current_time_us = int(time.time() * 1_000_000)
+            self.message_sequence = message.seq_no or None
+            current_time_us = self.recv_timestamp_us
             
             # 转换时间戳从毫秒到微秒
             timestamp_us = message.last_updated_at * 1000 if message.last_updated_at else current_time_us
-            
-            # 创建快照
-            snapshot = TardisL2Snapshot(
-                exchange="paradex",
-                symbol=message.market,
-                timestamp=timestamp_us,
-                local_timestamp=current_time_us,
-                bids=message.get_sorted_bids(),
-                asks=message.get_sorted_asks()
-            )
-
-            # 快照回调
-            if self.on_snapshot:
-                self.on_snapshot(snapshot)
 
-            # 转换为更新回调
-            if self.on_update:
-                updates = snapshot.to_updates()
-                for update in updates:
-                    self.on_update(update)
+            # 批量回调直接使用 JSON 档位，不创建逐档对象
+            if self.on_updates_batch:
+                self.on_updates_batch(self._build_batch(message, timestamp_us, current_time_us))
+            if self.on_snapshot or self.on_update:
+                self._emit_snapshot(message, timestamp_us, current_time_us)
 
         except Exception as e:
             logger.error(f"Error handling subscription data: {e}", exc_info=True)
             if self.on_error:
                 self.on_error(e)
 
-    def _heartbeat_loop(self, ws_ref):
-        """心跳检测线程：检查是否长时间没收到消息"""
-        while self._running:
-            time.sleep(60)
-            # 检查 ws 是否还是同一个连接
-            if not self._running or self._ws is not ws_ref:
-                break
-            # 如果超过 heartbeat_timeout 秒没收到消息，主动关闭连接触发重连
-            if self._last_message_time > 0:
-                elapsed = time.time() - self._last_message_time
-                if elapsed > self.heartbeat_timeout:
-                    logger.warning(f"No message received for {elapsed:.1f}s (timeout: {self.heartbeat_timeout}s), closing connection...")
-                    try:
-                        ws_ref.close()
-                    except Exception:
-                        pass
-                    break
-
-    def start(self):
-        """启动接收器 (阻塞)"""
+    def _handle_typed_book(self, data, send: Callable[[str], None]):
+        """处理 msgspec 解码的订单簿数据 (paradex_receiver.schema.ParadexBookData)"""
         try:
-            import websocket
-        except ImportError:
-            logger.error("websocket-client not installed: pip install websocket-client")
-            raise
+            if self.mode == MODE_DELTAS:
+                changes = [(level.side, level.price, level.size) for level in data.inserts]
+                changes += [(level.side, level.price, level.size) for level in data.updates]
+                changes += [(level.side, level.price, "0") for level in data.deletes]
+                self._handle_delta(data.market, data.update_type, data.seq_no, data.last_updated_at, changes, send)
+                return
 
-        self._running = True
+            self.message_sequence = data.seq_no or None
+            current_time_us = self.recv_timestamp_us
+            timestamp_us = data.last_updated_at * 1000 if data.last_updated_at else current_time_us
 
-        def on_open(ws):
-            logger.info("WebSocket connected")
-            self._last_message_time = time.time()
-            
-            # 先进行认证
-            auth_msg = {
-                "jsonrpc": "2.0",
-                "method": "auth",
-                "params": {
-                    "bearer": self.bearer_token
-                },
-                "id": 0
-            }
-            ws.send(json.dumps(auth_msg))
-            logger.info("Sent authentication")
-            
-            # 订阅各个symbol的深度数据
-            for i, symbol in enumerate(self.symbols, 1):
-                channel = f"order_book.{symbol}.snapshot@{self.levels}@{self.frequency}@{self.min_delta}"
-                subscribe_msg = {
-                    "jsonrpc": "2.0",
-                    "method": "subscribe",
-                    "params": {
-                        "channel": channel
-                    },
-                    "id": i
-                }
-                ws.send(json.dumps(subscribe_msg))
-                logger.info(f"Subscribed to {symbol} with channel: {channel}")
-
-        def on_message(ws, message):
-            self._last_message_time = time.time()
-            try:
-                data = json.loads(message)
-                
-                # 检查消息类型
-                if "method" in data and data["method"] == "subscription":
-                    # 这是订阅数据
-                    self._handle_subscription_data(data)
-                elif "method" in data and data["method"] == "ping":
-                    # 服务器发送 ping，需要回复 pong
-                    pong_msg = {
-                        "jsonrpc": "2.0",
-                        "method": "pong",
-                        "id": data.get("id")
-                    }
-                    ws.send(json.dumps(pong_msg))
-                    logger.debug("Received ping, sent pong")
-                elif "method" in data and data["method"] == "pong":
-                    logger.debug("Received pong")
-                elif "result" in data:
-                    # 这是认证或订阅确认响应
-                    logger.info(f"Response: {data}")
-                elif "error" in data:
-                    # 错误响应
-                    logger.error(f"Server error: {data}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
-                if self.on_error:
-                    self.on_error(e)
-
-        def on_error(ws, error):
-            logger.error(f"WebSocket error: {error}")
-            if self.on_error:
-                self.on_error(error)
-
-        def on_ping(ws, message):
-            logger.debug("Received WebSocket ping, sending pong")
-            self._last_message_time = time.time()
-            # websocket-client 会自动回复 pong
-
-        def on_pong(ws, message):
-            logger.debug("Received WebSocket pong")
-            self._last_message_time = time.time()
-
-        def on_close(ws, close_status_code, close_msg):
-            logger.info(f"WebSocket closed: {close_status_code} - {close_msg}")
-
-        # 创建 SSL context，使用更宽松的设置
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = True
-        ssl_context.verify_mode = ssl.CERT_REQUIRED
-        # 设置更长的超时
-        ssl_context.timeout = 30
-
-        while self._running:
-            try:
-                self._ws = websocket.WebSocketApp(
-                    WS_URL,
-                    on_open=on_open,
-                    on_message=on_message,
-                    on_error=on_error,
-                    on_close=on_close,
-                    on_ping=on_ping,
-                    on_pong=on_pong,
+            if self.on_updates_batch:
+                bids = [level for level in data.inserts if level.side == "BUY"]
+                asks = [level for level in data.inserts if level.side == "SELL"]
+                bids.sort(key=lambda x: float(x.price), reverse=True)
+                asks.sort(key=lambda x: float(x.price))
+                self.on_updates_batch(L2UpdateBatch.from_level_structs(
+                    "paradex", data.market, timestamp_us, current_time_us, True, bids[:15], asks[:15]
+                ))
+            if self.on_snapshot or self.on_update:
+                # 逐档回调仍然使用 dict 档位
+                message = ParadexOrderBookMessage(
+                    market=data.market,
+                    timestamp=data.last_updated_at,
+                    inserts=[{"side": level.side, "price": level.price, "size": level.size} for level in data.inserts],
+                    updates=[],
+                    deletes=[],
+                    seq_no=data.seq_no,
+                    last_updated_at=data.last_updated_at,
                 )
+                self._emit_snapshot(message, timestamp_us, current_time_us)
 
-                # 启动心跳检测线程
-                self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, args=(self._ws,), daemon=True)
-                self._heartbeat_thread.start()
-
-                # 运行 WebSocket 连接，使用更保守的设置
-                self._ws.run_forever(
-                    ping_interval=self.ping_interval,
-                    ping_timeout=self.ping_timeout,
-                    sslopt={"context": ssl_context},
-                    skip_utf8_validation=True,
-                    reconnect=5,  # 自动重连间隔
-                )
-            except websocket.WebSocketException as e:
-                logger.error(f"WebSocket exception: {e}")
-            except ssl.SSLError as e:
-                logger.error(f"SSL error: {e}")
-            except Exception as e:
-                logger.error(f"WebSocket connection failed: {e}", exc_info=True)
-            finally:
-                self._ws = None
-
-            if self._running:
-                logger.info(f"Reconnecting in {self.reconnect_interval}s...")
-                time.sleep(self.reconnect_interval)
-
-    def stop(self):
-        """停止接收器"""
-        logger.info("Stopping receiver...")
-        self._running = False
-        if self._ws:
-            try:
-                self._ws.close()
-            except Exception:
-                pass
\ No newline at end of file
+        except Exception as e:
+            logger.error(f"Error handling subscription data: {e}", exc_info=True)
+            if self.on_error:
+                self.on_error(e)
+
+    def _emit_snapshot(self, message: ParadexOrderBookMessage, timestamp_us: int, current_time_us: int):
+        """逐档回调: on_snapshot / on_update"""
+        # 创建快照
+        snapshot = TardisL2Snapshot(
+            exchange="paradex",
+            symbol=message.market,
+            timestamp=timestamp_us,
+            local_timestamp=current_time_us,
+            bids=message.get_sorted_bids(),
+            asks=message.get_sorted_asks()
+        )
+
+        # 快照回调
+        if self.on_snapshot:
+            self.on_snapshot(snapshot)
+
+        # 转换为更新回调
+        if self.on_update:
+            updates = snapshot.to_updates()
+            for update in updates:
+                self.on_update(update)
+
+    @staticmethod
+    def _build_batch(message: ParadexOrderBookMessage, timestamp_us: int, local_timestamp_us: int) -> L2UpdateBatch:
+        """与 get_sorted_bids/get_sorted_asks 相同的排序和档数(15档)"""
+        bids = [i for i in message.inserts if i.get("side") == "BUY"]
+        asks = [i for i in message.inserts if i.get("side") == "SELL"]
+        bids.sort(key=lambda x: float(x.get("price", "0")), reverse=True)
+        asks.sort(key=lambda x: float(x.get("price", "0")))
+        return L2UpdateBatch.from_levels(
+            "paradex", message.market, timestamp_us, local_timestamp_us, True, bids[:15], asks[:15]
+        )
+
+    def _get_channels(self) -> List[Tuple[str, str]]:
+        # 订阅各个symbol的深度数据
+        if self.mode == MODE_DELTAS:
+            return [(symbol, self._delta_channel(symbol)) for symbol in self.symbols]
+        return [
+            (symbol, f"order_book.{symbol}.snapshot@{self.levels}@{self.frequency}@{self.min_delta}")
+            for symbol in self.symbols
+        ]
+
+    def _handle_subscription(self, data: dict, send: Callable[[str], None]):
+        self._handle_subscription_data(data, send)
+
+    def _handle_message(self, message: str, send: Callable[[str], None]):
+        if self._typed_decode is not None:
+            frame = self._typed_decode(message)
+            if (
+                frame is not None
+                and frame.method == "subscription"
+                and frame.params is not None
+                and frame.params.data is not None
+                and frame.params.channel.startswith("order_book.")
+            ):
+                if not self._is_unsubscribed_channel(frame.params.channel):
+                    self._handle_typed_book(frame.params.data, send)
+                return
+        super()._handle_message(message, send)
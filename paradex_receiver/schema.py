@@ -0,0 +1,37 @@
+"""
+Paradex 订单簿订阅消息的 msgspec 结构 (安装了 msgspec 时可用)
+
+method=subscription 的 order_book 消息直接解码为这些结构，价格档位不经过 dict。
+"""
+
+from typing import List, Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+AVAILABLE = msgspec is not None
+
+if AVAILABLE:
+    class ParadexLevel(msgspec.Struct):
+        side: str = ""
+        price: str = "0"
+        size: str = "0"
+
+    class ParadexBookData(msgspec.Struct):
+        market: str = ""
+        seq_no: int = 0
+        last_updated_at: int = 0
+        update_type: str = ""
+        inserts: List[ParadexLevel] = []
+        updates: List[ParadexLevel] = []
+        deletes: List[ParadexLevel] = []
+
+    class ParadexBookParams(msgspec.Struct):
+        channel: str = ""
+        data: Optional[ParadexBookData] = None
+
+    class ParadexBookFrame(msgspec.Struct):
+        method: str = ""
+        params: Optional[ParadexBookParams] = None
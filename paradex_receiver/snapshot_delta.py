@@ -0,0 +1,98 @@
+"""
+逐个交易对比较前后两次 book_snapshot_15 快照
+
+snapshot@15@50ms 频道每 50ms 推送一次完整的前 15 档，安静的市场(如 PAXG)大部分快照与上一条完全相同。
+    - should_write(): 快照与上一条相同则跳过，每隔 full_snapshot_interval 秒仍写一条，便于确认数据没有中断
+    - encode(): 把快照转换为相对上一条的增量 (Tardis incremental_book_L2)，只包含变化的档位，
+      移出前 15 档的价格数量为 0；第一条以及每隔 full_snapshot_interval 秒输出一次完整快照(is_snapshot=True)，
+      从任意一个完整快照开始都能恢复出之后每一时刻的前 15 档
+
+时间间隔按快照的交易所时间戳计算，回放同一份录制数据时输出一致。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from receiver_common.batch import L2UpdateBatch, SIDE_ASK, SIDE_BID
+from .data_types import TardisL2Snapshot
+
+
+class _SymbolState:
+    __slots__ = ("bids", "asks", "last_full_timestamp")
+
+    def __init__(self):
+        self.bids: List[Tuple[str, str]] = []
+        self.asks: List[Tuple[str, str]] = []
+        self.last_full_timestamp = 0
+
+
+def _diff(previous: List[Tuple[str, str]], current: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """current 相对 previous 变化的档位，不再存在的价格数量为 0"""
+    old = dict(previous)
+    changed = [(price, amount) for price, amount in current if old.get(price) != amount]
+    new_prices = {price for price, _ in current}
+    changed.extend((price, "0") for price, _ in previous if price not in new_prices)
+    return changed
+
+
+class SnapshotDeltaEncoder:
+    """比较同一交易对前后两次快照，跳过未变化的快照或只输出变化的档位"""
+
+    def __init__(self, full_snapshot_interval: float = 60.0):
+        self.full_snapshot_interval_us = int(full_snapshot_interval * 1_000_000)
+        self.snapshots = 0
+        self.suppressed = 0
+        self._states: Dict[str, _SymbolState] = {}
+
+    def _update(self, snapshot: TardisL2Snapshot) -> Tuple[_SymbolState, List[Tuple[str, str]], List[Tuple[str, str]], bool]:
+        """记录新快照，返回 (上一条的状态, 新 bids, 新 asks, 是否需要完整快照)"""
+        self.snapshots += 1
+        state = self._states.get(snapshot.symbol)
+        if state is None:
+            state = self._states[snapshot.symbol] = _SymbolState()
+            full = True
+        else:
+            full = snapshot.timestamp - state.last_full_timestamp >= self.full_snapshot_interval_us
+        bids = [(level.price, level.amount) for level in snapshot.bids]
+        asks = [(level.price, level.amount) for level in snapshot.asks]
+        return state, bids, asks, full
+
+    def should_write(self, snapshot: TardisL2Snapshot) -> bool:
+        """快照与上一条相同且未到定时完整快照时返回 False"""
+        state, bids, asks, full = self._update(snapshot)
+        if not full and bids == state.bids and asks == state.asks:
+            self.suppressed += 1
+            return False
+        state.bids, state.asks = bids, asks
+        if full:
+            state.last_full_timestamp = snapshot.timestamp
+        return True
+
+    def encode(self, snapshot: TardisL2Snapshot) -> Optional[L2UpdateBatch]:
+        """转换为相对上一条快照的增量，没有变化时返回 None"""
+        state, bids, asks, full = self._update(snapshot)
+        if full:
+            changed_bids, changed_asks = bids, asks
+            state.last_full_timestamp = snapshot.timestamp
+        elif bids == state.bids and asks == state.asks:
+            self.suppressed += 1
+            return None
+        else:
+            changed_bids, changed_asks = _diff(state.bids, bids), _diff(state.asks, asks)
+        state.bids, state.asks = bids, asks
+        return L2UpdateBatch(
+            snapshot.exchange,
+            snapshot.symbol,
+            snapshot.timestamp,
+            snapshot.local_timestamp,
+            full,
+            [SIDE_BID] * len(changed_bids) + [SIDE_ASK] * len(changed_asks),
+            [price for price, _ in changed_bids] + [price for price, _ in changed_asks],
+            [amount for _, amount in changed_bids] + [amount for _, amount in changed_asks],
+        )
+
+    def reset(self, symbol: Optional[str] = None):
+        """清除记录的快照(如重连后)，下一条快照会完整输出"""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
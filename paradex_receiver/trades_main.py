@@ -4,11 +4,8 @@ Paradex 交易数据接收器 - 按天记录到 CSV (Tardis 格式)
 
 import logging
 import argparse
-import gzip
 import sys
 import os
-from datetime import datetime, timezone
-from typing import Dict, Optional
 
 
 sys.path.append("/home/ec2-user/test_lighter_dex/adapter_exchanges/paradex_receiver")
@@ -18,6 +15,13 @@ sys.path.append("/home/hkhm/git/adapter_exchanges/paradex_receiver")
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from paradex_receiver.trades_receiver import ParadexTradesReceiver
 from paradex_receiver.data_types import TardisTrade
+from paradex_receiver.base import WS_URL
+from receiver_common.capture import FrameCapture
+from receiver_common.control import ControlServer, add_control_arguments, register_receivers
+from receiver_common.dedup import DEFAULT_TRADE_WINDOW
+from receiver_common.supervisor import add_stall_arguments, stall_kwargs
+from receiver_common.parquet_writer import DailyParquetWriter, COL_DICT, COL_INT64, COL_SCALED, COL_STR
+from receiver_common.writer import DailyFileWriter, FORMAT_PARQUET, add_writer_arguments, get_parquet_options, get_writer_options
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,95 +31,44 @@ logger = logging.getLogger(__name__)
 TRADES_CSV_HEADER = "exchange,symbol,timestamp,local_timestamp,id,side,price,amount\n"
 
 
-class DailyTradesCSVWriter:
+class DailyTradesCSVWriter(DailyFileWriter):
     """按天按symbol保存交易CSV文件，格式: {output_dir}/{exchange}_trades_{symbol}_{date}.csv.gz"""
 
-    def __init__(self, output_dir: str, exchange: str = "paradex", compress: bool = True):
-        self.output_dir = output_dir
-        self.exchange = exchange
-        self.compress = compress
-        self._files: Dict[str, object] = {}  # key: symbol_date
-        self._current_dates: Dict[str, str] = {}  # key: symbol, value: date
-        self._update_counts: Dict[str, int] = {}  # key: symbol_date
-        os.makedirs(output_dir, exist_ok=True)
-
-    def _get_date_from_timestamp(self, timestamp_us: int) -> str:
-        """从微秒时间戳获取日期字符串 YYYY-MM-DD"""
-        dt = datetime.fromtimestamp(timestamp_us / 1_000_000, tz=timezone.utc)
-        return dt.strftime("%Y-%m-%d")
-
-    def _get_file_key(self, symbol: str, date: str) -> str:
-        return f"{symbol}_{date}"
-
-    def _get_file_path(self, symbol: str, date: str) -> str:
-        filename = f"{self.exchange}_trades_{symbol}_{date}.csv"
-        if self.compress:
-            filename += ".gz"
-        return os.path.join(self.output_dir, filename)
-
-    def _open_file(self, symbol: str, date: str):
-        """打开或创建新的日期文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            return
-
-        file_path = self._get_file_path(symbol, date)
-        if self.compress:
-            f = gzip.open(file_path, "wt", encoding="utf-8")
-        else:
-            f = open(file_path, "w", encoding="utf-8")
-        f.write(TRADES_CSV_HEADER)
-        self._files[file_key] = f
-        self._update_counts[file_key] = 0
-        logger.info(f"创建新交易文件: {file_path}")
-
-    def _close_file(self, symbol: str, date: str):
-        """关闭指定文件"""
-        file_key = self._get_file_key(symbol, date)
-        if file_key in self._files:
-            self._files[file_key].close()
-            count = self._update_counts.get(file_key, 0)
-            file_path = self._get_file_path(symbol, date)
-            logger.info(f"关闭交易文件: {file_path}，共 {count} 条记录")
-            del self._files[file_key]
-            if file_key in self._update_counts:
-                del self._update_counts[file_key]
+    FILE_KIND = "trades"
+    HEADER = TRADES_CSV_HEADER
+
+    def __init__(self, output_dir: str, exchange: str = "paradex", compress: bool = True, **kwargs):
+        super().__init__(output_dir, exchange, compress, **kwargs)
 
     def write_trade(self, trade: TardisTrade):
         """写入一条交易记录"""
-        symbol = trade.symbol
-        date = self._get_date_from_timestamp(trade.timestamp)
-
-        # 检查是否需要切换到新的日期文件
-        old_date = self._current_dates.get(symbol)
-        if old_date and old_date != date:
-            self._close_file(symbol, old_date)
+        self.write_text(trade.symbol, trade.timestamp, trade.to_csv_row() + "\n")
 
-        self._current_dates[symbol] = date
-        file_key = self._get_file_key(symbol, date)
 
-        # 确保文件已打开
-        if file_key not in self._files:
-            self._open_file(symbol, date)
+class DailyTradesParquetWriter(DailyParquetWriter):
+    """按天按symbol保存交易Parquet文件，格式: {output_dir}/{exchange}_trades_{symbol}_{date}.parquet"""
 
-        # 写入数据
-        self._files[file_key].write(trade.to_csv_row() + "\n")
-        self._update_counts[file_key] = self._update_counts.get(file_key, 0) + 1
+    FILE_KIND = "trades"
+    COLUMNS = [
+        ("exchange", COL_DICT),
+        ("symbol", COL_DICT),
+        ("timestamp", COL_INT64),
+        ("local_timestamp", COL_INT64),
+        ("id", COL_STR),
+        ("side", COL_DICT),
+        ("price", COL_SCALED),
+        ("amount", COL_SCALED),
+    ]
 
-        # 定期flush
-        if self._update_counts[file_key] % 10 == 0:
-            self._files[file_key].flush()
-            logger.info(f"[{symbol}][{date}] 已写入 {self._update_counts[file_key]} 条交易记录")
+    def __init__(self, output_dir: str, exchange: str = "paradex", **kwargs):
+        super().__init__(output_dir, exchange, **kwargs)
 
-    def close_all(self):
-        """关闭所有文件"""
-        for symbol, date in list(self._current_dates.items()):
-            self._close_file(symbol, date)
-        self._current_dates.clear()
-
-    def get_total_count(self) -> int:
-        """获取总记录数"""
-        return sum(self._update_counts.values())
+    def write_trade(self, trade: TardisTrade):
+        """写入一条交易记录"""
+        self.write_row(trade.symbol, trade.timestamp, (
+            trade.exchange, trade.symbol, trade.timestamp, trade.local_timestamp,
+            trade.id, trade.side, trade.price, trade.amount,
+        ))
 
 
 def main():
@@ -128,6 +81,15 @@ def main():
                       help="输出目录 (默认: ./data)")
     parser.add_argument("--no-compress", action="store_true", 
                       help="不压缩CSV文件")
+    add_writer_arguments(parser)
+    parser.add_argument("--ws-url", type=str, default=WS_URL,
+                      help="WebSocket 地址，可指向 receiver_common/standin_server.py 做本地压测 (默认: 主网)")
+    parser.add_argument("--capture", type=str, default="",
+                      help="把收到的原始帧录制到该文件，可用 receiver_common/replay.py 回放")
+    parser.add_argument("--dedup-window", type=int, default=DEFAULT_TRADE_WINDOW,
+                      help=f"每个交易对按成交 id 去重记住的最近成交数，0 表示不去重 (默认: {DEFAULT_TRADE_WINDOW})")
+    add_control_arguments(parser)
+    add_stall_arguments(parser)
     args = parser.parse_args()
 
     args.symbols = "PAXG-USD-PERP"
@@ -136,30 +98,53 @@ def main():
 
     symbols = [x.strip() for x in args.symbols.split(",")]
     
-    writer = DailyTradesCSVWriter(
-        output_dir=args.output_dir,
-        exchange="paradex",
-        compress=not args.no_compress,
-    )
+    if args.format == FORMAT_PARQUET:
+        writer = DailyTradesParquetWriter(output_dir=args.output_dir, exchange="paradex", **get_parquet_options(args))
+    else:
+        writer = DailyTradesCSVWriter(
+            output_dir=args.output_dir,
+            exchange="paradex",
+            compress=not args.no_compress,
+            **get_writer_options(args),
+        )
 
     def on_trade(trade: TardisTrade):
         writer.write_trade(trade)
 
     receiver = ParadexTradesReceiver(
         symbols=symbols,
-        bearer_token=args.token
+        bearer_token=args.token,
+        ws_url=args.ws_url,
+        dedup_window=args.dedup_window,
+        **stall_kwargs(args.stall_timeout),
     )
     receiver.on_trade = on_trade
 
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture)
+        receiver.set_capture(capture)
+
+    control = None
+    if args.control_socket:
+        control = ControlServer(args.control_socket)
+        register_receivers(control, "paradex", [receiver], [writer], lambda market, symbol: (market,), lambda symbol: symbol)
+        control.start()
+
     try:
         logger.info(f"开始接收交易数据，交易对: {symbols}，输出目录: {args.output_dir}")
         receiver.start()
     except KeyboardInterrupt:
         logger.info("用户中断")
     finally:
+        if control:
+            control.stop()
         receiver.stop()
+        if capture:
+            capture.close()
         writer.close_all()
         logger.info(f"总共写入 {writer.get_total_count()} 条交易记录")
+        logger.info(f"去重丢弃 {receiver.duplicate_count} 条重复成交")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+"""
+行情接收器公共组件
+"""
+
+from .base_receiver import BaseWSReceiver
+from .batch import L2UpdateBatch
+from .capture import FrameCapture, read_frames
+from .collector import AsyncCollector
+from .conflation import BookTicker, TopOfBookConflator
+from .json_codec import JsonCodec, get_codec
+from .orderbook import L2OrderBook
+from .ring_buffer import RingBuffer
+from .pipeline import FramePipeline
+from .writer import DailyFileWriter
+from .parquet_writer import DailyParquetWriter
+
+__all__ = [
+    "BaseWSReceiver",
+    "L2UpdateBatch",
+    "FrameCapture",
+    "read_frames",
+    "AsyncCollector",
+    "BookTicker",
+    "TopOfBookConflator",
+    "JsonCodec",
+    "get_codec",
+    "L2OrderBook",
+    "RingBuffer",
+    "FramePipeline",
+    "DailyFileWriter",
+    "DailyParquetWriter",
+]
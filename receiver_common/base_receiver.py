@@ -0,0 +1,301 @@
+"""
+WebSocket 接收器基类: 连接、重连、心跳检测的公共实现
+
+各交易所接收器只需要实现协议相关的两个方法:
+    _get_subscribe_messages()  连接建立后需要发送的消息(认证、订阅)
+    _handle_message()          处理一条原始消息
+
+运行中增减订阅 (subscribe/unsubscribe) 通过 _send_live() 在当前连接上直接发送，不需要重连。
+
+start() 使用 websocket-client 的阻塞 run_forever 循环运行单个接收器；
+也可以把多个接收器交给 receiver_common.collector.AsyncCollector 在同一个事件循环中运行。
+两种方式的超时检测都交给进程内共用的 receiver_common.supervisor，重连按 _reconnect_delay() 指数退避。
+"""
+
+import logging
+import random
+import socket
+import time
+from typing import Callable, List, Optional
+
+from .json_codec import get_codec
+from .supervisor import get_supervisor
+
+logger = logging.getLogger(__name__)
+
+# 接收器的数据回调名，流水线/分片等包装器按这个列表转发
+DATA_CALLBACK_NAMES = ("on_snapshot", "on_update", "on_updates_batch", "on_trade")
+
+
+class BaseWSReceiver:
+    """WebSocket 接收器基类"""
+
+    # 传给 websocket-client run_forever 的额外参数
+    RUN_FOREVER_KWARGS: dict = {}
+    # 连续重连失败时等待时间的上限(秒)
+    MAX_RECONNECT_INTERVAL: float = 60.0
+    # 每次重连至少等待的时间(秒，再乘以随机系数)，服务器接受连接后立即断开时也不会空转
+    MIN_RECONNECT_INTERVAL: float = 0.5
+    # 连接持续收到消息超过这个时间(秒)才算正常，之后断开时退避从头开始
+    MIN_HEALTHY_UPTIME: float = 5.0
+    # websocket-client 的 TCP 连接、TLS 和 WebSocket 握手超时(秒)，握手卡住时没有 socket 可以被监控线程关闭
+    HANDSHAKE_TIMEOUT: float = 10.0
+
+    def __init__(
+        self,
+        ws_url: str,
+        reconnect_interval: float = 5.0,
+        ping_interval: int = 60,
+        ping_timeout: int = 30,
+        heartbeat_timeout: float = 180,
+    ):
+        self.ws_url = ws_url
+        self.reconnect_interval = reconnect_interval
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self._running = False
+        self._ws = None
+        self._last_message_time = 0
+        self._connected_at = 0.0
+        self._reconnect_attempts = 0
+        self._pipeline = None
+        self._capture = None
+        # 当前连接的发送函数，未连接时为 None
+        self._send: Optional[Callable[[str], None]] = None
+        # 连接建立次数，大于 1 说明发生过重连
+        self.connects = 0
+        # 当前正在处理的消息的本地接收时间戳(微秒)
+        self.recv_timestamp_us = 0
+        # 当前正在处理的消息在交易所一侧的序号 (Lighter nonce/offset、Paradex seq_no)，没有序号时为 None；
+        # 多条连接按它去重 (receiver_common.redundant)
+        self.message_sequence = None
+        # 代理地址，如 "http://127.0.0.1:7890"、"socks5://127.0.0.1:1080"，仅 start() 使用
+        self.proxy: Optional[str] = None
+        # JSON 编解码 (orjson > msgspec > json)，可以替换为 get_codec("json") 等
+        self.codec = get_codec()
+
+        self.on_error: Optional[Callable[[Exception], None]] = None
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__
+
+    # ===== 协议插件接口 =====
+    def _get_subscribe_messages(self) -> List[str]:
+        """连接建立后依次发送的消息(已序列化)"""
+        raise NotImplementedError
+
+    def _handle_message(self, message: str, send: Callable[[str], None]):
+        """处理一条原始消息，send 用于回复(如 pong)"""
+        raise NotImplementedError
+
+    def _handle_control_message(self, message: str, send: Callable[[str], None]) -> bool:
+        """在 WebSocket 线程中直接处理的控制消息(如应用层 ping)，已处理返回 True
+
+        启用流水线时其余消息都交给解析线程，控制消息必须在这里及时回复。
+        """
+        return False
+
+    def set_pipeline(self, pipeline):
+        """设置解析/写盘流水线 (receiver_common.pipeline.FramePipeline)，None 表示在 WebSocket 线程中直接处理"""
+        self._pipeline = pipeline
+
+    def set_capture(self, capture):
+        """录制收到的原始帧 (receiver_common.capture.FrameCapture)，None 表示不录制"""
+        self._capture = capture
+
+    # ===== 连接驱动共用的钩子 =====
+    def _reset_connection_state(self):
+        """新连接开始: 清空只在一个连接内有效的状态 (如序号)
+
+        启用流水线时解析线程可能还在处理旧连接的帧，所以由解析线程按帧顺序调用，见 FramePipeline.push_reset。
+        """
+
+    def _on_connected(self, send: Callable[[str], None]):
+        """连接建立: 发送认证和订阅消息"""
+        logger.info(f"[{self.name}] WebSocket connected")
+        self.connects += 1
+        pipeline = self._pipeline
+        if pipeline is not None:
+            pipeline.push_reset()
+        else:
+            self._reset_connection_state()
+        self._connected_at = self._last_message_time = time.time()
+        for message in self._get_subscribe_messages():
+            send(message)
+        self._send = send
+
+    def _send_live(self, message: str) -> bool:
+        """在当前连接上发送一条消息(可在任意线程调用)，未连接或发送失败时返回 False"""
+        send = self._send
+        if send is None:
+            return False
+        try:
+            send(message)
+            return True
+        except Exception as e:
+            logger.warning(f"[{self.name}] Failed to send on live connection: {e}")
+            return False
+
+    def _dispatch_message(self, message: str, send: Callable[[str], None]):
+        """收到一条消息: 刷新心跳时间并交给协议插件处理"""
+        now_ns = time.time_ns()
+        self._last_message_time = now_ns / 1e9
+        recv_ts_us = now_ns // 1000
+        capture = self._capture
+        if capture is not None:
+            capture.write(now_ns, message)
+        pipeline = self._pipeline
+        if pipeline is not None:
+            if not self._handle_control_message(message, send):
+                pipeline.push(message, send, recv_ts_us)
+            return
+        self._process_message(message, send, recv_ts_us)
+
+    def _process_message(self, message: str, send: Callable[[str], None], recv_ts_us: int):
+        """解析并处理一条消息 (WebSocket 线程或流水线解析线程)"""
+        self.recv_timestamp_us = recv_ts_us
+        try:
+            self._handle_message(message, send)
+        except Exception as e:
+            logger.error(f"Error processing message: {e}", exc_info=True)
+            if self.on_error:
+                self.on_error(e)
+
+    def _proxy_kwargs(self) -> dict:
+        """self.proxy 转换为 websocket-client run_forever 的代理参数"""
+        if not self.proxy:
+            return {}
+        from urllib.parse import urlparse
+        url = urlparse(self.proxy)
+        kwargs = {"http_proxy_host": url.hostname, "http_proxy_port": url.port, "proxy_type": url.scheme or "http"}
+        if url.username:
+            kwargs["http_proxy_auth"] = (url.username, url.password or "")
+        return kwargs
+
+    @staticmethod
+    def _close_stalled(ws):
+        """断开停滞的 websocket-client 连接 (监控线程调用，不能阻塞)
+
+        ws.close() 要和 run_forever 的读线程抢锁并等待对方的关闭帧，可能阻塞很久；
+        这里只 shutdown 底层 socket，run_forever 读到 EOF 后自己清理并返回。
+        还在 TCP/TLS 握手时没有 socket，握手在 HANDSHAKE_TIMEOUT 后自己失败，监控线程也会在下个周期再调用一次。
+        """
+        sock = getattr(ws.sock, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _reconnect_delay(self) -> float:
+        """下一次重连前等待的秒数
+
+        上一个连接持续收到消息超过 MIN_HEALTHY_UPTIME 时只等待 MIN_RECONNECT_INTERVAL；
+        否则(连不上，或者只收到一条错误消息就被断开)从 reconnect_interval 开始翻倍，最长 MAX_RECONNECT_INTERVAL。
+        等待时间再乘以 0.5~1 的随机系数，避免多个连接同时重连。
+        """
+        if self._connected_at and self._last_message_time - self._connected_at >= self.MIN_HEALTHY_UPTIME:
+            self._reconnect_attempts = 0
+        self._connected_at = 0.0
+        attempts = self._reconnect_attempts
+        self._reconnect_attempts += 1
+        if attempts == 0:
+            delay = self.MIN_RECONNECT_INTERVAL
+        else:
+            delay = min(self.MAX_RECONNECT_INTERVAL, self.reconnect_interval * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def start(self):
+        """启动接收器 (阻塞，websocket-client)"""
+        # ssl / websocket 只在真正建立连接时导入，加快接收器模块的冷启动
+        import ssl
+        try:
+            import websocket
+        except ImportError:
+            logger.error("websocket-client not installed: pip install websocket-client")
+            raise
+
+        self._running = True
+        if websocket.getdefaulttimeout() is None:
+            # run_forever 没有握手超时参数，只能用全局默认超时；已经设置过时不覆盖
+            websocket.setdefaulttimeout(self.HANDSHAKE_TIMEOUT)
+
+        def on_open(ws):
+            self._on_connected(ws.send)
+
+        def on_message(ws, message):
+            self._dispatch_message(message, ws.send)
+
+        def on_error(ws, error):
+            logger.error(f"WebSocket error: {error}")
+            if self.on_error:
+                self.on_error(error)
+
+        def on_close(ws, close_status_code, close_msg):
+            logger.info(f"WebSocket closed: {close_status_code} - {close_msg}")
+
+        def on_ping(ws, message):
+            logger.debug("Received ping, sending pong")
+            self._last_message_time = time.time()
+            # websocket-client 会自动回复 pong
+
+        def on_pong(ws, message):
+            logger.debug("Received pong")
+            self._last_message_time = time.time()
+
+        # 创建 SSL context
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = True
+        ssl_context.verify_mode = ssl.CERT_REQUIRED
+
+        while self._running:
+            self._ws = websocket.WebSocketApp(
+                self.ws_url,
+                on_open=on_open,
+                on_message=on_message,
+                on_error=on_error,
+                on_close=on_close,
+                on_ping=on_ping,
+                on_pong=on_pong,
+            )
+            # 超时检测: 握手期间也计时，连不上同样会被关闭
+            self._last_message_time = time.time()
+            watch = get_supervisor().watch(self, lambda ws=self._ws: self._close_stalled(ws))
+            try:
+                # skip_utf8_validation 提高性能
+                self._ws.run_forever(
+                    ping_interval=self.ping_interval,
+                    ping_timeout=self.ping_timeout,
+                    sslopt={"context": ssl_context},
+                    skip_utf8_validation=True,
+                    **self._proxy_kwargs(),
+                    **self.RUN_FOREVER_KWARGS,
+                )
+            except websocket.WebSocketException as e:
+                logger.error(f"WebSocket exception: {e}")
+            except ssl.SSLError as e:
+                logger.error(f"SSL error: {e}")
+            except Exception as e:
+                logger.error(f"WebSocket connection failed: {e}", exc_info=True)
+            finally:
+                get_supervisor().unwatch(watch)
+                self._send = None
+                self._ws = None
+
+            if self._running:
+                delay = self._reconnect_delay()
+                logger.info(f"Reconnecting in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def stop(self):
+        """停止接收器"""
+        logger.info(f"Stopping {self.name}...")
+        self._running = False
+        if self._ws:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
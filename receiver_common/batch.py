@@ -0,0 +1,91 @@
+"""
+按帧批量的 L2 更新
+
+一帧 WebSocket 消息里的所有价格档位放在同一个批次中(并列的 sides/prices/amounts 列表)，
+不再为每个档位创建一个 TardisL2Update 对象，也不再逐档调用回调。
+
+CSV 行格式与 TardisL2Update.to_csv_row() 一致:
+    exchange,symbol,timestamp,local_timestamp,is_snapshot,side,price,amount
+"""
+
+from typing import List, NamedTuple
+
+SIDE_BID = "bid"
+SIDE_ASK = "ask"
+
+
+class L2UpdateBatch(NamedTuple):
+    """一帧的 L2 更新"""
+    exchange: str
+    symbol: str
+    timestamp: int  # 微秒
+    local_timestamp: int  # 微秒
+    is_snapshot: bool
+    sides: List[str]
+    prices: List[str]
+    amounts: List[str]
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_levels(
+        cls,
+        exchange: str,
+        symbol: str,
+        timestamp: int,
+        local_timestamp: int,
+        is_snapshot: bool,
+        bids: List[dict],
+        asks: List[dict],
+        size_key: str = "size",
+    ) -> "L2UpdateBatch":
+        """直接从解码后的 JSON 档位列表([{"price": .., "size": ..}]) 构建，先 bids 后 asks"""
+        return cls(
+            exchange,
+            symbol,
+            timestamp,
+            local_timestamp,
+            is_snapshot,
+            [SIDE_BID] * len(bids) + [SIDE_ASK] * len(asks),
+            [b.get("price", "0") for b in bids] + [a.get("price", "0") for a in asks],
+            [b.get(size_key, "0") for b in bids] + [a.get(size_key, "0") for a in asks],
+        )
+
+    @classmethod
+    def from_level_structs(
+        cls,
+        exchange: str,
+        symbol: str,
+        timestamp: int,
+        local_timestamp: int,
+        is_snapshot: bool,
+        bids: list,
+        asks: list,
+    ) -> "L2UpdateBatch":
+        """从 msgspec 解码的档位结构(有 price/size 属性)构建，先 bids 后 asks"""
+        return cls(
+            exchange,
+            symbol,
+            timestamp,
+            local_timestamp,
+            is_snapshot,
+            [SIDE_BID] * len(bids) + [SIDE_ASK] * len(asks),
+            [b.price for b in bids] + [a.price for a in asks],
+            [b.size for b in bids] + [a.size for a in asks],
+        )
+
+    def to_csv(self) -> str:
+        """整批转换为 CSV 文本(每行以换行结尾)"""
+        prefix = f"{self.exchange},{self.symbol},{self.timestamp},{self.local_timestamp},{str(self.is_snapshot).lower()},"
+        return "".join([f"{prefix}{side},{price},{amount}\n" for side, price, amount in zip(self.sides, self.prices, self.amounts)])
+
+    def to_numpy(self):
+        """转换为 NumPy 结构化数组 (side: U3, price: f8, amount: f8)，需要安装 numpy"""
+        import numpy as np
+
+        array = np.empty(len(self.prices), dtype=[("side", "U3"), ("price", "f8"), ("amount", "f8")])
+        array["side"] = self.sides
+        array["price"] = np.array(self.prices, dtype=np.float64)
+        array["amount"] = np.array(self.amounts, dtype=np.float64)
+        return array
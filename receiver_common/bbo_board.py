@@ -0,0 +1,350 @@
+"""
+本机共享内存最优价看板
+
+采集进程把每个交易对最新的买一/卖一(可选前 N 档)写入一块 multiprocessing.shared_memory，
+同一台机器上的策略进程直接读内存，不需要各自再连 WebSocket 或轮询 REST 的 get_orderbook_ticker。
+
+布局 (小端):
+    头部 64 字节   MAGIC(8) version(u32) slots(u32) depth(u32) used(u32)
+    每个槽位       seq(u64) key(48 字节) timestamp(i64) local_timestamp(i64) publish_ns(i64)
+                   n_bids(u32) n_asks(u32) bids[depth](price f64, size f64) asks[depth](price f64, size f64)
+                   按 64 字节对齐
+
+每个槽位用 seqlock 保护: 写入前 seq 加 1 变为奇数，写完再加 1 变为偶数；读取时 seq 为奇数或前后不一致就重读，
+读方不加锁、不做系统调用。采集进程在写入中途退出会留下奇数 seq，重启后接着使用看板时下一次写入从这个奇数开始，
+写完变为偶数，槽位恢复可读。只支持一个写入进程(进程内多个接收器线程共用一个 BBOBoard 由锁串行)。
+key 为 "{exchange}:{symbol}"，如 "lighter:ETHUSDT"、"paradex:PAXG-USD-PERP"，第一次发布时分配槽位。
+
+使用示例:
+    # 采集进程
+    board = BBOBoard.create("adapter_bbo_board", slots=256, depth=1)
+    receiver.on_book = board.on_book
+    ...
+    board.close(unlink=True)
+
+    # 策略进程
+    reader = BBOBoardReader("adapter_bbo_board", max_age=2.0)
+    ticker = reader.get("lighter:ETHUSDT")   # 不存在或超过 max_age 未更新时返回 None
+
+查看看板内容:
+    python receiver_common/bbo_board.py adapter_bbo_board
+"""
+
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOARD_NAME = os.getenv("ADAPTER_BBO_BOARD", "adapter_bbo_board")
+
+MAGIC = b"BBOBRD01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+USED_OFFSET = 20  # 头部中 used 字段的偏移
+SEQ = struct.Struct("<Q")
+KEY_SIZE = 48
+READ_RETRIES = 1000
+
+# 本进程创建的看板，同一进程内的读方不能从 resource_tracker 注销它们
+_created_names = set()
+
+
+class BoardTicker(NamedTuple):
+    """看板中一个交易对的前 N 档"""
+    key: str
+    timestamp: int  # 交易所时间(微秒)
+    local_timestamp: int  # 采集进程接收时间(微秒)
+    publish_ns: int  # 写入看板的时间(time.time_ns)
+    bids: List[Tuple[float, float]]
+    asks: List[Tuple[float, float]]
+
+    @property
+    def age(self) -> float:
+        """距离写入看板的秒数"""
+        return (time.time_ns() - self.publish_ns) / 1e9
+
+
+def _slot_size(depth: int) -> int:
+    size = SEQ.size + _payload_struct(depth).size
+    return (size + 63) // 64 * 64
+
+
+def _payload_struct(depth: int) -> struct.Struct:
+    """槽位中 seq 之后的全部内容"""
+    return struct.Struct(f"<{KEY_SIZE}sqqqII{depth * 4}d")
+
+
+def _open_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """打开已有的共享内存，不交给 resource_tracker 管理(否则读方进程退出时会把共享内存删掉)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 没有 track 参数
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created_names:
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return shm
+
+
+class _BoardLayout:
+    """共享内存上的槽位读写"""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.buf = shm.buf
+        magic, version, slots, depth, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Shared memory {shm.name} is not a BBO board")
+        self.slots = slots
+        self.depth = depth
+        self.slot_size = _slot_size(depth)
+        self.payload = _payload_struct(depth)
+
+    @property
+    def used(self) -> int:
+        return struct.unpack_from("<I", self.buf, USED_OFFSET)[0]
+
+    def slot_offset(self, index: int) -> int:
+        return HEADER_SIZE + index * self.slot_size
+
+    def read_key(self, index: int) -> str:
+        offset = self.slot_offset(index) + SEQ.size
+        return bytes(self.buf[offset:offset + KEY_SIZE]).rstrip(b"\0").decode("utf-8")
+
+    def read(self, index: int) -> Optional[BoardTicker]:
+        """按 seqlock 协议读取一个槽位，一直在写入时返回 None"""
+        buf = self.buf
+        offset = self.slot_offset(index)
+        payload_offset = offset + SEQ.size
+        unpack_seq = SEQ.unpack_from
+        unpack_payload = self.payload.unpack_from
+        for _ in range(READ_RETRIES):
+            seq = unpack_seq(buf, offset)[0]
+            if seq & 1:
+                continue
+            values = unpack_payload(buf, payload_offset)
+            if unpack_seq(buf, offset)[0] != seq:
+                continue
+            depth = self.depth
+            n_bids = min(values[4], depth)
+            n_asks = min(values[5], depth)
+            bids = [(values[6 + 2 * i], values[7 + 2 * i]) for i in range(n_bids)]
+            asks = [(values[6 + 2 * (depth + i)], values[7 + 2 * (depth + i)]) for i in range(n_asks)]
+            return BoardTicker(values[0].rstrip(b"\0").decode("utf-8"), values[1], values[2], values[3], bids, asks)
+        return None
+
+
+class BBOBoard:
+    """看板写入方 (采集进程)"""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self._layout = _BoardLayout(shm)
+        self.name = shm.name
+        self.depth = self._layout.depth
+        self.published = 0
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        for index in range(self._layout.used):
+            self._index[self._layout.read_key(index)] = index
+
+    @classmethod
+    def create(cls, name: str = DEFAULT_BOARD_NAME, slots: int = 256, depth: int = 1) -> "BBOBoard":
+        """创建看板；同名看板已存在且布局相同时接着使用(如采集进程重启)，读方不需要重新打开"""
+        size = HEADER_SIZE + slots * _slot_size(depth)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            shm = _open_shared_memory(name)
+            layout = _BoardLayout(shm)
+            if layout.slots != slots or layout.depth != depth:
+                shm.close()
+                raise ValueError(
+                    f"BBO board {name} exists with {layout.slots} slots / depth {layout.depth}, "
+                    f"requested {slots} / {depth}; use another name or remove /dev/shm/{name}"
+                )
+            logger.info(f"Reusing BBO board {name}: {layout.used}/{slots} slots in use")
+            return cls(shm)
+        _created_names.add(name)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, slots, depth, 0)
+        logger.info(f"Created BBO board {name}: {slots} slots, depth {depth}, {size} bytes")
+        return cls(shm)
+
+    def _allocate(self, key: str) -> int:
+        layout = self._layout
+        index = layout.used
+        if index >= layout.slots:
+            raise ValueError(f"BBO board {self.name} is full ({layout.slots} slots)")
+        encoded = key.encode("utf-8")
+        if len(encoded) > KEY_SIZE:
+            raise ValueError(f"BBO board key too long: {key}")
+        offset = layout.slot_offset(index)
+        SEQ.pack_into(layout.buf, offset, 0)
+        layout.payload.pack_into(layout.buf, offset + SEQ.size, encoded, 0, 0, 0, 0, 0, *([0.0] * 4 * layout.depth))
+        # 槽位内容写好后才增加 used，读方看到的槽位都有 key
+        struct.pack_into("<I", layout.buf, USED_OFFSET, index + 1)
+        self._index[key] = index
+        return index
+
+    def publish(
+        self,
+        key: str,
+        timestamp: int,
+        local_timestamp: int,
+        bids: Iterable[Tuple[object, object]],
+        asks: Iterable[Tuple[object, object]],
+    ):
+        """写入一个交易对的前 N 档，价格和数量可以是字符串或数字"""
+        layout = self._layout
+        depth = layout.depth
+        bid_values = [float(x) for level in list(bids)[:depth] for x in level]
+        ask_values = [float(x) for level in list(asks)[:depth] for x in level]
+        n_bids, n_asks = len(bid_values) // 2, len(ask_values) // 2
+        values = bid_values + [0.0] * (2 * depth - len(bid_values)) + ask_values + [0.0] * (2 * depth - len(ask_values))
+        with self._lock:
+            index = self._index.get(key)
+            if index is None:
+                index = self._allocate(key)
+            buf = layout.buf
+            offset = layout.slot_offset(index)
+            # 上一个采集进程写到一半退出时 seq 停在奇数，直接从它开始，写完后仍然是偶数
+            start = SEQ.unpack_from(buf, offset)[0] | 1
+            SEQ.pack_into(buf, offset, start)
+            layout.payload.pack_into(
+                buf, offset + SEQ.size, key.encode("utf-8"), timestamp, local_timestamp, time.time_ns(), n_bids, n_asks, *values
+            )
+            SEQ.pack_into(buf, offset, start + 1)
+            self.published += 1
+
+    def on_book(self, key, book):
+        """接收器的 on_book 回调 (key, receiver_common.orderbook.L2OrderBook)"""
+        bids, asks = book.top(self.depth)
+        self.publish(f"{book.exchange}:{book.symbol}", book.timestamp, book.local_timestamp, bids, asks)
+
+    def on_snapshot(self, snapshot):
+        """快照回调 (TardisL2Snapshot)"""
+        depth = self.depth
+        self.publish(
+            f"{snapshot.exchange}:{snapshot.symbol}",
+            snapshot.timestamp,
+            snapshot.local_timestamp,
+            [(level.price, level.amount) for level in snapshot.bids[:depth]],
+            [(level.price, level.amount) for level in snapshot.asks[:depth]],
+        )
+
+    def on_ticker(self, ticker):
+        """receiver_common.conflation.BookTicker 回调，用于限速写入"""
+        self.publish(f"{ticker.exchange}:{ticker.symbol}", ticker.timestamp, ticker.local_timestamp, ticker.bids, ticker.asks)
+
+    def close(self, unlink: bool = False):
+        """关闭看板，unlink=True 时删除共享内存(读方已打开的映射仍然有效)"""
+        self._layout.buf = None
+        self._layout.shm.close()
+        if unlink:
+            try:
+                self._layout.shm.unlink()
+            except FileNotFoundError:
+                pass
+            logger.info(f"Removed BBO board {self.name}")
+
+
+class BBOBoardReader:
+    """看板读取方 (策略进程)
+
+    采集进程尚未启动时 get() 返回 None，之后每隔 retry_interval 秒重新尝试打开；
+    数据过期时同样会重新打开，采集进程重启后重新创建的看板也能读到。
+    """
+
+    def __init__(self, name: str = DEFAULT_BOARD_NAME, max_age: float = 2.0, retry_interval: float = 5.0):
+        self.name = name
+        self.max_age = max_age
+        self.retry_interval = retry_interval
+        self._layout: Optional[_BoardLayout] = None
+        self._index: Dict[str, int] = {}
+        self._next_attach = 0.0
+
+    def _attach(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_attach:
+            return False
+        self._next_attach = now + self.retry_interval
+        self.close()
+        try:
+            self._layout = _BoardLayout(_open_shared_memory(self.name))
+        except FileNotFoundError:
+            return False
+        except ValueError as e:
+            logger.warning(str(e))
+            return False
+        logger.info(f"Attached BBO board {self.name}")
+        return True
+
+    def _find(self, key: str) -> Optional[int]:
+        index = self._index.get(key)
+        if index is not None:
+            return index
+        layout = self._layout
+        for index in range(layout.used):
+            slot_key = layout.read_key(index)
+            self._index[slot_key] = index
+            if slot_key == key:
+                return index
+        return None
+
+    def get(self, key: str) -> Optional[BoardTicker]:
+        """读取 "{exchange}:{symbol}" 的前 N 档，不存在或超过 max_age 秒未更新时返回 None"""
+        if self._layout is None and not self._attach():
+            return None
+        index = self._find(key)
+        ticker = self._layout.read(index) if index is not None else None
+        if ticker is None or ticker.key != key or (self.max_age > 0 and ticker.age > self.max_age):
+            # 交易对还没发布、采集进程停止或重启后换了一块共享内存
+            self._attach()
+            return None
+        return ticker
+
+    def all(self) -> List[BoardTicker]:
+        """看板中所有交易对(不检查 max_age)"""
+        if self._layout is None and not self._attach():
+            return []
+        tickers = []
+        for index in range(self._layout.used):
+            ticker = self._layout.read(index)
+            if ticker is not None:
+                tickers.append(ticker)
+        return tickers
+
+    def close(self):
+        if self._layout is not None:
+            self._layout.buf = None
+            self._layout.shm.close()
+            self._layout = None
+            self._index.clear()
+
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_BOARD_NAME
+    reader = BBOBoardReader(name, max_age=0)
+    tickers = reader.all()
+    if not tickers:
+        print(f"BBO board {name} not found or empty")
+        return
+    for ticker in tickers:
+        bid = ticker.bids[0] if ticker.bids else (0.0, 0.0)
+        ask = ticker.asks[0] if ticker.asks else (0.0, 0.0)
+        print(f"{ticker.key:32s} bid {bid[1]:>12g} @ {bid[0]:<14g} ask {ask[1]:>12g} @ {ask[0]:<14g} age {ticker.age:.3f}s")
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+原始 WebSocket 帧录制
+
+每条收到的消息连同本地接收时间(纳秒)追加到一个紧凑的二进制文件，用于离线复现接收器行为、
+做解析/写盘基准和转换结果的回归对比 (回放见 receiver_common.replay)。
+
+文件格式:
+    文件头  MAGIC (8 字节)
+    每条记录 <int64 本地接收时间 ns><uint32 帧长度> + 帧内容 (UTF-8)
+
+进程被杀时末尾可能留下不完整的记录，读取时会忽略；再次录制到同一个文件时先截掉不完整的记录再追加。
+
+使用示例:
+    capture = FrameCapture("./capture/lighter_depth.wscap")
+    receiver.set_capture(capture)
+    receiver.start()
+    ...
+    capture.close()
+"""
+
+import logging
+import os
+import struct
+import threading
+from typing import Iterator, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WSCAP01\n"
+RECORD_HEADER = struct.Struct("<qI")
+
+
+class FrameCapture:
+    """追加写入原始帧，可被多个接收器(如分片的各个连接)共用"""
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.path = path
+        self.frames = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            _truncate_incomplete(path)
+            self._file = open(path, "ab", buffering=buffer_size)
+            logger.info(f"Appending frames to {path}")
+        else:
+            self._file = open(path, "wb", buffering=buffer_size)
+            self._file.write(MAGIC)
+            logger.info(f"Capturing frames to {path}")
+
+    def write(self, recv_ts_ns: int, message: Union[str, bytes]):
+        """追加一帧"""
+        data = message.encode("utf-8") if isinstance(message, str) else message
+        with self._lock:
+            # 停止过程中 close 之后到达的帧直接丢弃
+            if self._file.closed:
+                return
+            self._file.write(RECORD_HEADER.pack(recv_ts_ns, len(data)))
+            self._file.write(data)
+            self.frames += 1
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f"Closed capture {self.path}: {self.frames} frames")
+
+
+def _scan(fh) -> Iterator[Tuple[int, int]]:
+    """逐条返回 (接收时间 ns, 帧长度)，此时文件位置在帧内容开头，由调用方读取或跳过帧内容"""
+    if fh.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"Not a frame capture file: {getattr(fh, 'name', fh)}")
+    header_size = RECORD_HEADER.size
+    while True:
+        header = fh.read(header_size)
+        if len(header) < header_size:
+            return
+        recv_ts_ns, length = RECORD_HEADER.unpack(header)
+        yield recv_ts_ns, length
+
+
+def read_frames(path: str) -> Iterator[Tuple[int, str]]:
+    """按录制顺序读取 (本地接收时间 ns, 消息)"""
+    with open(path, "rb", buffering=1 << 20) as fh:
+        for recv_ts_ns, length in _scan(fh):
+            data = fh.read(length)
+            if len(data) < length:
+                return
+            yield recv_ts_ns, data.decode("utf-8")
+
+
+def _truncate_incomplete(path: str):
+    """截掉末尾不完整的记录"""
+    with open(path, "rb+") as fh:
+        good = len(MAGIC)
+        size = fh.seek(0, os.SEEK_END)
+        fh.seek(0)
+        for _, length in _scan(fh):
+            end = fh.tell() + length
+            if end > size:
+                break
+            fh.seek(end)
+            good = end
+        if good < size:
+            fh.truncate(good)
+            logger.warning(f"Truncated incomplete tail of {path}: {size} -> {good} bytes")
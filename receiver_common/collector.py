@@ -0,0 +1,144 @@
+"""
+asyncio 多路行情采集器: 在一个事件循环里同时运行任意数量的接收器
+
+每个 BaseWSReceiver 子类(Lighter/Paradex 深度、交易)只负责协议部分，
+连接和重连由采集器统一管理，一个进程只需要一个线程就能采集多个交易所/频道；
+超时检测交给进程内共用的 receiver_common.supervisor，不再为每条消息设置超时。
+安装了 uvloop 时自动使用 uvloop 事件循环。
+
+使用示例:
+    depth = LighterDepthReceiver(market_ids=[0, 48])
+    trades = LighterTradesReceiver(market_ids=[0, 48])
+    depth.on_update = on_update
+    trades.on_trade = on_trade
+
+    collector = AsyncCollector([depth, trades])
+    collector.run()  # 阻塞，Ctrl+C 或 collector.stop() 退出
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from .base_receiver import BaseWSReceiver
+from .supervisor import get_supervisor
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCollector:
+    """在一个 asyncio 事件循环中运行多个接收器"""
+
+    def __init__(self, receivers: Optional[List[BaseWSReceiver]] = None, use_uvloop: bool = True):
+        self.receivers: List[BaseWSReceiver] = list(receivers or [])
+        self.use_uvloop = use_uvloop
+
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, receiver: BaseWSReceiver):
+        """添加接收器，运行中添加会立即启动"""
+        self.receivers.append(receiver)
+        if self._running and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._start_task, receiver)
+
+    def _start_task(self, receiver: BaseWSReceiver):
+        self._tasks.append(asyncio.ensure_future(self._run_receiver(receiver)))
+
+    async def _run_receiver(self, receiver: BaseWSReceiver):
+        """单个接收器的连接 + 重连循环"""
+        import websockets
+
+        loop = asyncio.get_running_loop()
+        supervisor = get_supervisor()
+        receiver._running = True
+        while self._running and receiver._running:
+            # 超时检测: 握手期间也计时；监控线程发现停滞时取消 connection 任务触发重连
+            receiver._last_message_time = time.time()
+            connection = asyncio.ensure_future(self._connect_and_receive(receiver, websockets))
+            watch = supervisor.watch(receiver, lambda: loop.call_soon_threadsafe(connection.cancel))
+            try:
+                await connection
+            except asyncio.CancelledError:
+                # 监控线程取消的只是这个连接，继续重连；其他情况是采集器本身在停止
+                if not watch.stalled:
+                    raise
+            except Exception as e:
+                logger.error(f"[{receiver.name}] WebSocket connection failed: {e}")
+                if receiver.on_error:
+                    receiver.on_error(e)
+            finally:
+                supervisor.unwatch(watch)
+                receiver._send = None
+
+            if self._running and receiver._running:
+                delay = receiver._reconnect_delay()
+                logger.info(f"[{receiver.name}] Reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+    async def _connect_and_receive(self, receiver: BaseWSReceiver, websockets):
+        """建立一个连接并处理消息，直到连接断开"""
+        async with websockets.connect(
+            receiver.ws_url,
+            ping_interval=receiver.ping_interval,
+            ping_timeout=receiver.ping_timeout,
+            max_size=None,
+        ) as ws:
+            pending_sends = set()
+            loop = asyncio.get_running_loop()
+            loop_thread = threading.get_ident()
+
+            def send(message: str):
+                # 协议插件的回调是同步的，这里把发送调度到事件循环上；
+                # 控制通道等其他线程的调用先转到事件循环线程
+                if threading.get_ident() != loop_thread:
+                    loop.call_soon_threadsafe(send, message)
+                    return
+                task = asyncio.ensure_future(ws.send(message))
+                pending_sends.add(task)
+                task.add_done_callback(pending_sends.discard)
+
+            receiver._on_connected(send)
+            dispatch = receiver._dispatch_message
+            while self._running and receiver._running:
+                dispatch(await ws.recv(), send)
+
+    async def run_async(self):
+        """在当前事件循环中运行所有接收器，直到 stop()"""
+        self._running = True
+        self._loop = asyncio.get_running_loop()
+        for receiver in self.receivers:
+            self._start_task(receiver)
+        try:
+            while self._running:
+                await asyncio.sleep(0.5)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+    def run(self):
+        """启动采集器 (阻塞)"""
+        if self.use_uvloop:
+            try:
+                import uvloop
+                uvloop.install()
+                logger.info("Using uvloop event loop")
+            except ImportError:
+                pass
+        logger.info(f"Starting collector with {len(self.receivers)} receivers")
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self):
+        """停止采集器(可在其他线程调用)"""
+        logger.info("Stopping collector...")
+        self._running = False
+        for receiver in self.receivers:
+            receiver._running = False
@@ -0,0 +1,212 @@
+"""
+单进程多路采集 - Lighter/Paradex 的深度和交易在同一个事件循环中按天记录到 CSV
+
+替代分别运行 lighter_receiver/main.py、main_trades.py、paradex_receiver/main.py、trades_main.py 四个进程，
+输出文件格式与各自的 main 完全一致。
+
+用法:
+    python receiver_common/collector_main.py --lighter-markets 0,48 -o ./data
+    python receiver_common/collector_main.py --lighter-markets 0 --paradex-symbols PAXG-USD-PERP --paradex-token xxx
+    python receiver_common/collector_main.py --lighter-markets 0,48 --bbo-board adapter_bbo_board
+    python receiver_common/collector_main.py --lighter-markets 0,48 --bbo-board adapter_bbo_board --conflate-ms 50
+    python receiver_common/collector_main.py --lighter-markets 0,48 --fanout-socket /tmp/adapter_fanout.sock
+    python receiver_common/collector_main.py --lighter-markets 0,48 --control-socket /tmp/adapter_control.sock
+
+--bbo-board 同时把各交易对的最优价写入共享内存看板 (receiver_common.bbo_board)，本机策略进程直接读取。
+--conflate-ms 看板按交易对限速写入 (receiver_common.conflation)，每个交易对最多每 N 毫秒写一次，中间状态被合并；
+    中间价变化超过 --conflate-bps 时不受限速。默认 0，每次变化都直接写入看板。
+--fanout-socket 同时把归一化的增量和成交发布到本机 Unix socket (receiver_common.fanout_hub)，供其他消费者订阅。
+--control-socket 打开控制通道 (receiver_common.control)，运行中增减市场，不需要重启或重连:
+    python receiver_common/control.py subscribe lighter 12 --symbol XYZUSDT --socket /tmp/adapter_control.sock
+    python receiver_common/control.py unsubscribe paradex BTC-USD-PERP --socket /tmp/adapter_control.sock
+退订时同时关闭该交易对当前的输出文件。
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from receiver_common.bbo_board import BBOBoard
+from receiver_common.capture import FrameCapture
+from receiver_common.collector import AsyncCollector
+from receiver_common.conflation import TopOfBookConflator
+from receiver_common.control import ControlServer, add_control_arguments, register_receivers
+from receiver_common.fanout_hub import FanoutHub
+from receiver_common.metrics import add_metrics_arguments, start_metrics
+from receiver_common.supervisor import add_stall_arguments, stall_kwargs
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _chain(*callbacks):
+    """把多个回调合成一个，忽略 None"""
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if len(callbacks) == 1:
+        return callbacks[0]
+
+    def call_all(item):
+        for callback in callbacks:
+            callback(item)
+    return call_all
+
+
+def _board_inputs(board, conflators: list, args):
+    """返回写入看板的 (on_book, on_snapshot) 回调，--conflate-ms 时经过一个按交易对限速的 TopOfBookConflator
+
+    每个交易所一个 conflator，不同交易所的同名交易对互不影响。
+    """
+    if board is None:
+        return None, None
+    if args.conflate_ms <= 0:
+        return board.on_book, board.on_snapshot
+    conflator = TopOfBookConflator(
+        board.on_ticker, depth=args.bbo_depth, min_interval=args.conflate_ms / 1000, threshold_bps=args.conflate_bps,
+    )
+    conflators.append(conflator)
+    return conflator.on_book, conflator.on_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单进程多路行情采集 (asyncio)")
+    parser.add_argument("--lighter-markets", type=str, default="", help="Lighter 市场ID，逗号分隔")
+    parser.add_argument("--paradex-symbols", type=str, default="", help="Paradex 交易对，逗号分隔")
+    parser.add_argument("--paradex-token", type=str, default="", help="Paradex Bearer Token")
+    parser.add_argument("--channels", type=str, default="depth,trades", help="采集的频道 (默认: depth,trades)")
+    parser.add_argument("-o", "--output-dir", type=str, default="./data", help="输出目录 (默认: ./data)")
+    parser.add_argument("--no-compress", action="store_true", help="不压缩CSV文件")
+    parser.add_argument("--no-uvloop", action="store_true", help="不使用 uvloop")
+    parser.add_argument("--capture-dir", type=str, default="", help="把各接收器收到的原始帧录制到该目录，可用 receiver_common/replay.py 回放")
+    parser.add_argument("--bbo-board", type=str, default="", help="把最优价写入该名称的共享内存看板，供本机策略进程读取")
+    parser.add_argument("--bbo-depth", type=int, default=1, help="看板中每个交易对保存的档数 (默认: 1)")
+    parser.add_argument("--bbo-slots", type=int, default=256, help="看板最多容纳的交易对数 (默认: 256)")
+    parser.add_argument("--conflate-ms", type=float, default=0, help="每个交易对最多每 N 毫秒写一次看板，0 为每次变化都写 (默认: 0)")
+    parser.add_argument("--conflate-bps", type=float, default=0, help="中间价相对上次写入变化超过该基点数时立即写入，不受 --conflate-ms 限速 (默认: 0)")
+    parser.add_argument("--fanout-socket", type=str, default="", help="把归一化的增量和成交发布到该 Unix socket，供本机其他消费者订阅")
+    parser.add_argument("--fanout-queue", type=int, default=10_000, help="每个消费者的发送队列长度，超过后断开该消费者 (默认: 10000)")
+    add_control_arguments(parser)
+    add_stall_arguments(parser, ("depth", "trades"))
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if args.conflate_ms and not args.bbo_board:
+        parser.error("--conflate-ms 需要同时指定 --bbo-board")
+
+    channels = {x.strip() for x in args.channels.split(",") if x.strip()}
+    compress = not args.no_compress
+    collector = AsyncCollector(use_uvloop=not args.no_uvloop)
+    writers = []
+    board = BBOBoard.create(args.bbo_board, slots=args.bbo_slots, depth=args.bbo_depth) if args.bbo_board else None
+    hub = FanoutHub(args.fanout_socket, queue_size=args.fanout_queue) if args.fanout_socket else None
+    control = ControlServer(args.control_socket) if args.control_socket else None
+    conflators = []
+
+    if args.lighter_markets:
+        from lighter_receiver import LighterDepthReceiver, LighterTradesReceiver
+        from lighter_receiver.main import MARKET_SYMBOL_MAP, DailyCSVWriter, lighter_control_parsers
+        from lighter_receiver.main_trades import DailyTradesCSVWriter
+
+        market_ids = [int(x.strip()) for x in args.lighter_markets.split(",")]
+        market_symbol_map = {mid: MARKET_SYMBOL_MAP.get(mid, f"MARKET_{mid}") for mid in market_ids}
+        exchange_receivers, exchange_writers = [], []
+        if "depth" in channels:
+            writer = DailyCSVWriter(output_dir=args.output_dir, exchange="lighter", compress=compress)
+            receiver = LighterDepthReceiver(
+                market_ids=market_ids, market_symbol_map=market_symbol_map, keep_book=board is not None,
+                **stall_kwargs(args.depth_stall_timeout),
+            )
+            receiver.on_updates_batch = _chain(writer.write_batch, hub and hub.on_updates_batch)
+            if board is not None:
+                receiver.on_book = _board_inputs(board, conflators, args)[0]
+            exchange_receivers.append(receiver)
+            exchange_writers.append(writer)
+        if "trades" in channels:
+            writer = DailyTradesCSVWriter(output_dir=args.output_dir, exchange="lighter", compress=compress)
+            receiver = LighterTradesReceiver(
+                market_ids=market_ids, market_symbol_map=market_symbol_map, **stall_kwargs(args.trades_stall_timeout)
+            )
+            receiver.on_trade = _chain(writer.write, hub and hub.on_trade)
+            exchange_receivers.append(receiver)
+            exchange_writers.append(writer)
+        for receiver in exchange_receivers:
+            collector.add(receiver)
+        writers.extend(exchange_writers)
+        if control is not None and exchange_receivers:
+            register_receivers(control, "lighter", exchange_receivers, exchange_writers, *lighter_control_parsers(market_symbol_map))
+
+    if args.paradex_symbols:
+        from paradex_receiver import ParadexDepthReceiver, ParadexTradesReceiver
+        from paradex_receiver.main import DailyCSVWriter as ParadexDailyCSVWriter
+        from paradex_receiver.trades_main import DailyTradesCSVWriter as ParadexDailyTradesCSVWriter
+
+        symbols = [x.strip() for x in args.paradex_symbols.split(",")]
+        exchange_receivers, exchange_writers = [], []
+        if "depth" in channels:
+            writer = ParadexDailyCSVWriter(output_dir=args.output_dir, exchange="paradex", compress=compress)
+            receiver = ParadexDepthReceiver(
+                symbols=symbols, bearer_token=args.paradex_token, **stall_kwargs(args.depth_stall_timeout)
+            )
+            receiver.on_snapshot = _chain(writer.write_snapshot, _board_inputs(board, conflators, args)[1], hub and hub.on_snapshot)
+            exchange_receivers.append(receiver)
+            exchange_writers.append(writer)
+        if "trades" in channels:
+            writer = ParadexDailyTradesCSVWriter(output_dir=args.output_dir, exchange="paradex", compress=compress)
+            receiver = ParadexTradesReceiver(
+                symbols=symbols, bearer_token=args.paradex_token, **stall_kwargs(args.trades_stall_timeout)
+            )
+            receiver.on_trade = _chain(writer.write_trade, hub and hub.on_trade)
+            exchange_receivers.append(receiver)
+            exchange_writers.append(writer)
+        for receiver in exchange_receivers:
+            collector.add(receiver)
+        writers.extend(exchange_writers)
+        if control is not None and exchange_receivers:
+            register_receivers(
+                control, "paradex", exchange_receivers, exchange_writers,
+                lambda market, symbol: (market,),
+                lambda symbol: symbol,
+            )
+
+    if not collector.receivers:
+        parser.error("至少需要指定 --lighter-markets 或 --paradex-symbols")
+
+    captures = []
+    if args.capture_dir:
+        for receiver in collector.receivers:
+            capture = FrameCapture(os.path.join(args.capture_dir, f"{receiver.name}.wscap"))
+            receiver.set_capture(capture)
+            captures.append(capture)
+
+    metrics = start_metrics(args, collector.receivers)
+    for conflator in conflators:
+        conflator.start()
+    if hub is not None:
+        hub.start()
+    if control is not None:
+        control.start()
+
+    try:
+        logger.info(f"开始接收数据，频道: {sorted(channels)}，输出目录: {args.output_dir}")
+        collector.run()
+    finally:
+        collector.stop()
+        for capture in captures:
+            capture.close()
+        for writer in writers:
+            writer.close_all()
+        for conflator in conflators:
+            conflator.stop()
+        if board is not None:
+            board.close(unlink=True)
+        if hub is not None:
+            hub.stop()
+        if control is not None:
+            control.stop()
+        if metrics is not None:
+            metrics.stop()
+        logger.info(f"总共写入 {sum(w.get_total_count() for w in writers)} 条记录")
+
+
+if __name__ == "__main__":
+    main()
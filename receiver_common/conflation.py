@@ -0,0 +1,215 @@
+"""
+按交易对合并的最优价(前 N 档)发布
+
+策略一般只需要最新的买一/卖一，不需要逐档增量。TopOfBookConflator 接在接收器的订单簿回调后面，
+每个交易对只保留最新的前 N 档，未来得及发出的中间状态直接被覆盖:
+    - 每个交易对最多每 min_interval 秒回调一次；中间价相对上次发出的变化超过 threshold_bps 时不受限速
+    - 前 N 档没有变化时不回调；在限速间隔内变化后又回到上次发出的值(A→B→A)时也不回调
+    - 回调在独立线程中执行，消费者再慢也只积压每个交易对一条最新数据，不会拖慢接收器
+    - every_change=True 时每次变化都在调用线程中直接回调，不限速也不丢弃中间状态
+
+使用示例:
+    conflator = TopOfBookConflator(on_ticker, min_interval=0.1, threshold_bps=5)
+    conflator.start()
+
+    receiver = LighterDepthReceiver(market_ids=[0], keep_book=True)
+    receiver.on_book = conflator.on_book            # Lighter / Paradex deltas 模式的本地订单簿
+    # paradex_receiver.on_snapshot = conflator.on_snapshot   # Paradex 快照模式
+    receiver.start()
+    ...
+    conflator.stop()
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Level = Tuple[str, str]  # (price, amount)
+
+
+class BookTicker(NamedTuple):
+    """一个交易对的前 N 档"""
+    exchange: str
+    symbol: str
+    timestamp: int  # 微秒
+    local_timestamp: int  # 微秒
+    bids: List[Level]
+    asks: List[Level]
+
+    @property
+    def best_bid(self) -> Optional[Level]:
+        return self.bids[0] if self.bids else None
+
+    @property
+    def best_ask(self) -> Optional[Level]:
+        return self.asks[0] if self.asks else None
+
+    @property
+    def mid(self) -> Optional[float]:
+        if not self.bids or not self.asks:
+            return None
+        return (float(self.bids[0][0]) + float(self.asks[0][0])) / 2
+
+
+class _SymbolState:
+    __slots__ = ("latest", "emitted", "last_emit", "pending")
+
+    def __init__(self):
+        self.latest: Optional[BookTicker] = None  # 最新收到的
+        self.emitted: Optional[BookTicker] = None  # 最后发出的
+        self.last_emit = 0.0
+        self.pending = False  # latest 尚未发出
+
+
+class TopOfBookConflator:
+    """按交易对合并前 N 档，限速回调 on_ticker(BookTicker)"""
+
+    def __init__(
+        self,
+        on_ticker: Callable[[BookTicker], None],
+        depth: int = 1,
+        min_interval: float = 0.1,
+        threshold_bps: float = 0.0,
+        every_change: bool = False,
+    ):
+        self.on_ticker = on_ticker
+        self.depth = depth
+        self.min_interval = min_interval
+        self.threshold_bps = threshold_bps
+        self.every_change = every_change
+
+        self.published = 0  # 前 N 档有变化的输入次数
+        self.emitted = 0
+        self.conflated = 0  # 被后来的数据覆盖、没有发出的中间状态
+
+        self._states: Dict[str, _SymbolState] = {}
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ===== 输入 =====
+    def on_book(self, key, book):
+        """接收器的 on_book 回调 (key, receiver_common.orderbook.L2OrderBook)"""
+        bids, asks = book.top(self.depth)
+        self.publish(BookTicker(book.exchange, book.symbol, book.timestamp, book.local_timestamp, bids, asks))
+
+    def on_snapshot(self, snapshot):
+        """快照回调 (TardisL2Snapshot，档位已排序)"""
+        depth = self.depth
+        self.publish(BookTicker(
+            snapshot.exchange,
+            snapshot.symbol,
+            snapshot.timestamp,
+            snapshot.local_timestamp,
+            [(level.price, level.amount) for level in snapshot.bids[:depth]],
+            [(level.price, level.amount) for level in snapshot.asks[:depth]],
+        ))
+
+    def publish(self, ticker: BookTicker):
+        """提交一个交易对最新的前 N 档"""
+        with self._cond:
+            state = self._states.get(ticker.symbol)
+            if state is None:
+                state = self._states[ticker.symbol] = _SymbolState()
+            latest = state.latest
+            if latest is not None and latest.bids == ticker.bids and latest.asks == ticker.asks:
+                return
+            self.published += 1
+            if state.pending:
+                self.conflated += 1
+            state.latest = ticker
+
+            emitted = state.emitted
+            if emitted is not None and emitted.bids == ticker.bids and emitted.asks == ticker.asks:
+                # 回到了上次发出的值，消费者手里已经是最新的，中间状态作废
+                state.pending = False
+                return
+
+            if self.every_change:
+                state.emitted = ticker
+                self.emitted += 1
+            else:
+                state.pending = True
+                if self._is_due(state, time.monotonic()):
+                    self._cond.notify()
+                return
+
+        self._deliver(ticker)
+
+    # ===== 发出 =====
+    def _is_due(self, state: _SymbolState, now: float) -> bool:
+        if now - state.last_emit >= self.min_interval:
+            return True
+        if self.threshold_bps > 0 and state.emitted is not None:
+            old_mid, new_mid = state.emitted.mid, state.latest.mid
+            if old_mid and new_mid is not None and abs(new_mid - old_mid) / old_mid * 10_000 >= self.threshold_bps:
+                return True
+        return False
+
+    def _deliver(self, ticker: BookTicker):
+        try:
+            self.on_ticker(ticker)
+        except Exception as e:
+            logger.error(f"Error in ticker callback: {e}", exc_info=True)
+
+    def _collect(self) -> List[BookTicker]:
+        """取出所有到期的最新数据，没有时等待到最近的到期时间 (持有锁时调用)"""
+        while self._running:
+            now = time.monotonic()
+            next_due = None
+            due = []
+            for state in self._states.values():
+                if not state.pending:
+                    continue
+                if self._is_due(state, now):
+                    due.append(state)
+                else:
+                    when = state.last_emit + self.min_interval
+                    next_due = when if next_due is None else min(next_due, when)
+            if due:
+                tickers = []
+                for state in due:
+                    state.pending = False
+                    state.last_emit = now
+                    state.emitted = state.latest
+                    tickers.append(state.latest)
+                self.emitted += len(tickers)
+                return tickers
+            self._cond.wait(None if next_due is None else max(0.0, next_due - now))
+        return []
+
+    def _run(self):
+        while self._running:
+            with self._cond:
+                tickers = self._collect()
+            for ticker in tickers:
+                self._deliver(ticker)
+
+    def start(self):
+        """启动回调线程 (every_change=True 时不需要)"""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="conflator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        logger.info(f"Conflator stopped: {self.stats()}")
+
+    def latest(self, symbol: str) -> Optional[BookTicker]:
+        """交易对最新的前 N 档(不论是否已经发出)"""
+        with self._cond:
+            state = self._states.get(symbol)
+            return state.latest if state is not None else None
+
+    def stats(self) -> dict:
+        return {"published": self.published, "emitted": self.emitted, "conflated": self.conflated}
@@ -0,0 +1,226 @@
+"""
+运行时控制通道: 本机 Unix socket 上一行一条的 JSON 命令
+
+采集进程 (collector_main 以及各交易所的 main，均为 --control-socket 参数) 启动 ControlServer，为每个交易所注册订阅/退订函数；
+之后可以用本文件的命令行(或任何能写 Unix socket 的工具)增减市场，接收器直接在当前连接上发送订阅消息，不需要重启或重连。
+
+请求 (一行 JSON):
+    {"op": "subscribe", "exchange": "lighter", "market": "12", "symbol": "XYZUSDT"}
+    {"op": "unsubscribe", "exchange": "paradex", "market": "BTC-USD-PERP"}
+    {"op": "list"}
+响应 (一行 JSON):
+    {"ok": true, "result": ...} 或 {"ok": false, "error": "..."}
+subscribe/unsubscribe 的 result 为 false 表示已经订阅/未订阅，没有变化。
+
+使用示例:
+    control = ControlServer("/tmp/adapter_control.sock")
+    control.register("lighter", subscribe=on_subscribe, unsubscribe=on_unsubscribe, markets=lambda: receiver.market_ids)
+    # 或者直接注册接收器，退订时同时关闭输出文件
+    register_receivers(control, "paradex", [receiver], [writer], lambda market, symbol: (market,), lambda symbol: symbol)
+    control.start()
+    ...
+    control.stop()
+
+命令行:
+    python receiver_common/control.py subscribe lighter 12 --symbol XYZUSDT
+    python receiver_common/control.py unsubscribe paradex BTC-USD-PERP
+    python receiver_common/control.py list
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+from typing import Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTROL_SOCKET = os.getenv("ADAPTER_CONTROL_SOCKET", "/tmp/adapter_control.sock")
+OPS = ("subscribe", "unsubscribe", "list")
+CLIENT_TIMEOUT = 5.0
+
+
+class _Exchange(NamedTuple):
+    subscribe: Callable[[str, Optional[str]], bool]
+    unsubscribe: Callable[[str], bool]
+    markets: Callable[[], list]
+
+
+class ControlServer:
+    """接收控制命令并调用注册的订阅/退订函数，命令在监听线程中逐条串行执行"""
+
+    def __init__(self, path: str = DEFAULT_CONTROL_SOCKET):
+        self.path = path
+        self.commands = 0
+
+        self._exchanges: Dict[str, _Exchange] = {}
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def register(
+        self,
+        exchange: str,
+        subscribe: Callable[[str, Optional[str]], bool],
+        unsubscribe: Callable[[str], bool],
+        markets: Callable[[], list],
+    ):
+        """
+        Args:
+            exchange: 交易所名，命令中的 exchange 字段
+            subscribe: subscribe(market, symbol) -> 是否新增了订阅，market 为命令中的字符串
+            unsubscribe: unsubscribe(market) -> 是否退订了
+            markets: 返回当前订阅的市场列表 (可 JSON 序列化)
+        """
+        self._exchanges[exchange] = _Exchange(subscribe, unsubscribe, markets)
+
+    def handle(self, request: dict) -> dict:
+        """执行一条命令，返回响应"""
+        op = request.get("op")
+        if op not in OPS:
+            return {"ok": False, "error": f"unknown op: {op}, expected one of {OPS}"}
+        if op == "list":
+            return {"ok": True, "result": {name: exchange.markets() for name, exchange in self._exchanges.items()}}
+
+        name = request.get("exchange")
+        exchange = self._exchanges.get(name)
+        if exchange is None:
+            return {"ok": False, "error": f"unknown exchange: {name}, expected one of {sorted(self._exchanges)}"}
+        market = request.get("market")
+        if market is None or market == "":
+            return {"ok": False, "error": "missing market"}
+        market = str(market)
+        try:
+            if op == "subscribe":
+                result = exchange.subscribe(market, request.get("symbol") or None)
+            else:
+                result = exchange.unsubscribe(market)
+        except Exception as e:
+            logger.error(f"Control command {request} failed: {e}", exc_info=True)
+            return {"ok": False, "error": str(e)}
+        logger.info(f"Control: {op} {name} {market} -> {result}")
+        return {"ok": True, "result": result}
+
+    # ===== 监听 =====
+    def start(self):
+        """开始监听 (旧的 socket 文件会被删除)"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        self._sock.listen(4)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, name="control-accept", daemon=True)
+        self._thread.start()
+        logger.info(f"Control socket listening on {self.path}")
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                break
+            with sock:
+                # 命令很少，逐个连接处理；客户端长时间不发数据时断开，不阻塞后面的命令
+                sock.settimeout(CLIENT_TIMEOUT)
+                try:
+                    self._serve(sock)
+                except OSError as e:
+                    logger.debug(f"Control client disconnected: {e}")
+
+    def _serve(self, sock: socket.socket):
+        reader = sock.makefile("rb")
+        for line in reader:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                response = {"ok": False, "error": f"invalid request: {e}"}
+            else:
+                self.commands += 1
+                response = self.handle(request)
+            sock.sendall(json.dumps(response).encode() + b"\n")
+
+    def stop(self):
+        self._running = False
+        if self._sock is not None:
+            # shutdown 唤醒阻塞在 accept 的监听线程
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+        if self._thread is not None:
+            self._thread.join(CLIENT_TIMEOUT)
+            self._thread = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def register_receivers(control: ControlServer, exchange: str, receivers: list, writers: list, parse_market, symbol_of):
+    """把一个交易所的所有接收器(深度、交易)注册到控制通道，退订时关闭 writers 中该交易对的输出文件
+
+    parse_market(market, symbol) 把命令中的市场字符串转换为接收器 subscribe 的参数 (第一个为 unsubscribe 的参数)，
+    symbol_of 给出输出文件使用的交易对名称。
+    """
+    def subscribe(market: str, symbol):
+        args = parse_market(market, symbol)
+        return any([receiver.subscribe(*args) for receiver in receivers])
+
+    def unsubscribe(market: str):
+        args = parse_market(market, None)
+        changed = any([receiver.unsubscribe(args[0]) for receiver in receivers])
+        if changed:
+            for writer in writers:
+                writer.close_symbol(symbol_of(args[0]))
+        return changed
+
+    control.register(exchange, subscribe, unsubscribe, receivers[0].subscriptions)
+
+
+def add_control_arguments(parser):
+    """各采集入口共用的 --control-socket 参数"""
+    parser.add_argument("--control-socket", type=str, default="",
+                        help="在该 Unix socket 上接收订阅/退订命令 (receiver_common/control.py)")
+
+
+def send_command(request: dict, path: str = DEFAULT_CONTROL_SOCKET, timeout: float = CLIENT_TIMEOUT) -> dict:
+    """发送一条命令并等待响应"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        return json.loads(sock.makefile("rb").readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向运行中的采集进程发送订阅/退订命令")
+    parser.add_argument("op", choices=OPS, help="命令")
+    parser.add_argument("exchange", nargs="?", default="", help="交易所，如 lighter / paradex")
+    parser.add_argument("market", nargs="?", default="", help="市场，Lighter 为市场ID，Paradex 为交易对")
+    parser.add_argument("--symbol", type=str, default="", help="Lighter 市场对应的交易对名称，写入文件名")
+    parser.add_argument("--socket", type=str, default=DEFAULT_CONTROL_SOCKET, help=f"socket 路径 (默认: {DEFAULT_CONTROL_SOCKET})")
+    args = parser.parse_args()
+
+    if args.op != "list" and not (args.exchange and args.market):
+        parser.error(f"{args.op} 需要指定 exchange 和 market")
+    request = {"op": args.op}
+    if args.op != "list":
+        request.update(exchange=args.exchange, market=args.market)
+        if args.symbol:
+            request["symbol"] = args.symbol
+    response = send_command(request, args.socket)
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    if not response.get("ok"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+按交易对的成交去重: 记住每个交易对最近 N 个成交 id
+
+重连后服务器可能把最近的成交再推送一遍，不去重会被重复写盘。
+每个交易对一个定长环形数组记录插入顺序，加一个集合做查询:
+    - 查询、插入、淘汰都是 O(1)，不随窗口大小变化
+    - 内存固定为窗口大小，不会随运行时间增长
+窗口只需要覆盖重连时可能重放的成交数，默认 10000。
+
+使用示例:
+    dedup = TradeDeduplicator(window=10_000)
+    if dedup.is_new(trade.symbol, trade.id):
+        writer.write_trade(trade)
+    dedup.duplicates  # 丢弃的重复成交数
+"""
+
+from typing import Dict, Hashable, Optional
+
+DEFAULT_TRADE_WINDOW = 10_000  # 每个交易对记住的最近成交数
+
+
+class TradeIdWindow:
+    """最近 capacity 个成交 id (环形数组 + 集合)"""
+
+    __slots__ = ("capacity", "_ring", "_position", "_seen")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._ring: list = [None] * capacity
+        self._position = 0
+        self._seen = set()
+
+    def add(self, trade_id: Hashable) -> bool:
+        """新 id 返回 True 并记住，窗口满时淘汰最早的 id；已存在返回 False"""
+        seen = self._seen
+        if trade_id in seen:
+            return False
+        position = self._position
+        oldest = self._ring[position]
+        if oldest is not None:
+            seen.discard(oldest)
+        self._ring[position] = trade_id
+        seen.add(trade_id)
+        position += 1
+        self._position = 0 if position == self.capacity else position
+        return True
+
+
+class TradeDeduplicator:
+    """按交易对去重，调用方需要保证串行调用 (接收器在单个线程中处理消息)"""
+
+    def __init__(self, window: int = DEFAULT_TRADE_WINDOW):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.duplicates = 0
+        self._windows: Dict[Hashable, TradeIdWindow] = {}
+
+    def is_new(self, key: Hashable, trade_id: Optional[Hashable]) -> bool:
+        """key (交易对或市场ID) 下的 trade_id 是否第一次出现，没有 id 的成交不去重"""
+        if trade_id is None or trade_id == "":
+            return True
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = TradeIdWindow(self.window)
+        if window.add(trade_id):
+            return True
+        self.duplicates += 1
+        return False
+
+    def stats(self) -> dict:
+        return {"window": self.window, "symbols": len(self._windows), "duplicates": self.duplicates}
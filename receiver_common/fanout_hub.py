@@ -0,0 +1,378 @@
+"""
+本机 Unix domain socket 行情分发
+
+采集进程只连一次交易所，把归一化后的 Tardis 增量和成交发布到 FanoutHub，
+录制、价差监控、异常检查等本机消费者连接同一个 socket 按交易对和频道订阅，不再各自占用交易所连接数。
+
+帧格式 (双向相同，小端):
+    <uint32 长度><uint8 类型> + JSON 内容 (UTF-8)，长度为类型和内容的字节数
+    类型 0 控制  消费者发送 {"op": "subscribe" | "unsubscribe", "channels": [...], "symbols": [...]}
+    类型 1 book  L2UpdateBatch 各字段组成的数组 (快照 is_snapshot=true)
+    类型 2 trades HubTrade 各字段组成的数组
+
+频道为 "book" / "trades"，交易对写成 "{exchange}:{symbol}"(与 bbo_board 相同)，"*" 表示全部。
+
+每个消费者有一个有界发送队列，由独立线程写 socket；队列满(消费者读得太慢)时直接断开该消费者，
+发布方只做一次编码和若干次 put_nowait，不会被任何消费者拖慢。
+
+使用示例:
+    # 采集进程
+    hub = FanoutHub("/tmp/adapter_fanout.sock")
+    hub.start()
+    receiver.on_updates_batch = hub.on_updates_batch
+    ...
+    hub.stop()
+
+    # 消费者进程
+    client = FanoutClient("/tmp/adapter_fanout.sock")
+    client.subscribe(["book"], ["lighter:ETHUSDT"])
+    for channel, item in client:
+        ...
+
+查看数据:
+    python receiver_common/fanout_hub.py --symbols lighter:ETHUSDT --channels trades
+"""
+
+import argparse
+import logging
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from receiver_common.batch import L2UpdateBatch, SIDE_ASK, SIDE_BID
+from receiver_common.json_codec import JsonCodec, get_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.getenv("ADAPTER_FANOUT_SOCKET", "/tmp/adapter_fanout.sock")
+
+FRAME_HEADER = struct.Struct("<IB")
+KIND_CONTROL = 0
+KIND_BOOK = 1
+KIND_TRADES = 2
+CHANNELS = {"book": KIND_BOOK, "trades": KIND_TRADES}
+WILDCARD = "*"
+MAX_FRAME_SIZE = 16 << 20
+SEND_BATCH = 256
+
+
+class HubTrade(NamedTuple):
+    """归一化的成交 (Tardis trades 字段顺序)"""
+    exchange: str
+    symbol: str
+    timestamp: int  # 微秒
+    local_timestamp: int  # 微秒
+    id: str
+    side: str
+    price: str
+    amount: str
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """读满 size 字节，对端关闭时返回 None"""
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock: socket.socket) -> Optional[Tuple[int, bytes]]:
+    """读一帧 (类型, 内容)，对端关闭时返回 None"""
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    length, kind = FRAME_HEADER.unpack(header)
+    if length < 1 or length > MAX_FRAME_SIZE:
+        raise ValueError(f"invalid frame length {length}")
+    body = _recv_exact(sock, length - 1)
+    if body is None:
+        return None
+    return kind, body
+
+
+def pack_frame(kind: int, body: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(body) + 1, kind) + body
+
+
+class _Consumer:
+    """一个已连接的消费者"""
+
+    def __init__(self, hub: "FanoutHub", sock: socket.socket, name: str, queue_size: int):
+        self.hub = hub
+        self.sock = sock
+        self.name = name
+        self.subscriptions: Set[Tuple[int, str]] = set()  # (类型, "{exchange}:{symbol}" 或 "*")
+        self.queue: "queue.Queue[bytes]" = queue.Queue(queue_size)
+        self.closed = False
+        self.sent = 0
+
+    def wants(self, kind: int, key: str) -> bool:
+        subscriptions = self.subscriptions
+        return (kind, key) in subscriptions or (kind, WILDCARD) in subscriptions
+
+    def start(self):
+        threading.Thread(target=self._read_loop, name=f"fanout-read-{self.name}", daemon=True).start()
+        threading.Thread(target=self._write_loop, name=f"fanout-write-{self.name}", daemon=True).start()
+
+    def _read_loop(self):
+        """读取订阅请求"""
+        codec = self.hub.codec
+        try:
+            while not self.closed:
+                frame = read_frame(self.sock)
+                if frame is None:
+                    break
+                kind, body = frame
+                if kind == KIND_CONTROL:
+                    self._handle_control(codec.loads(body))
+        except (OSError, ValueError) as e:
+            if not self.closed:
+                logger.warning(f"Fanout consumer {self.name} read error: {e}")
+        self.hub._remove(self, "disconnected")
+
+    def _handle_control(self, request: dict):
+        op = request.get("op")
+        keys = set()
+        for channel in request.get("channels") or CHANNELS:
+            kind = CHANNELS.get(channel)
+            if kind is None:
+                logger.warning(f"Fanout consumer {self.name} requested unknown channel {channel}")
+                continue
+            for symbol in request.get("symbols") or [WILDCARD]:
+                keys.add((kind, symbol))
+        # 替换整个集合，发布线程读到的总是完整的订阅
+        if op == "subscribe":
+            self.subscriptions = self.subscriptions | keys
+        elif op == "unsubscribe":
+            self.subscriptions = self.subscriptions - keys
+        else:
+            logger.warning(f"Fanout consumer {self.name} sent unknown op {op}")
+            return
+        logger.info(f"Fanout consumer {self.name} {op} {sorted(keys)}")
+
+    def _write_loop(self):
+        frames = self.queue
+        try:
+            while not self.closed:
+                try:
+                    batch = [frames.get(timeout=0.5)]
+                except queue.Empty:
+                    continue
+                while len(batch) < SEND_BATCH:
+                    try:
+                        batch.append(frames.get_nowait())
+                    except queue.Empty:
+                        break
+                self.sock.sendall(b"".join(batch))
+                self.sent += len(batch)
+        except OSError as e:
+            if not self.closed:
+                logger.warning(f"Fanout consumer {self.name} write error: {e}")
+        self.hub._remove(self, "disconnected")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class FanoutHub:
+    """把接收器的归一化数据分发给本机的多个消费者"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, queue_size: int = 10_000, codec: Optional[JsonCodec] = None):
+        self.path = path
+        self.queue_size = queue_size
+        self.codec = codec or get_codec()
+
+        self.published = 0
+        self.delivered = 0
+        self.evicted = 0
+
+        self._consumers: Tuple[_Consumer, ...] = ()  # 整体替换，发布线程不加锁读取
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._next_id = 0
+
+    # ===== 连接管理 =====
+    def start(self):
+        """开始监听 (旧的 socket 文件会被删除)"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        self._sock.listen(16)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, name="fanout-accept", daemon=True)
+        self._thread.start()
+        logger.info(f"Fanout hub listening on {self.path}")
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                break
+            with self._lock:
+                self._next_id += 1
+                consumer = _Consumer(self, sock, str(self._next_id), self.queue_size)
+                self._consumers = self._consumers + (consumer,)
+            logger.info(f"Fanout consumer {consumer.name} connected")
+            consumer.start()
+
+    def _remove(self, consumer: _Consumer, reason: str):
+        with self._lock:
+            if consumer not in self._consumers:
+                return
+            self._consumers = tuple(c for c in self._consumers if c is not consumer)
+        consumer.close()
+        logger.info(f"Fanout consumer {consumer.name} {reason}, sent {consumer.sent} frames")
+
+    def stop(self):
+        self._running = False
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        for consumer in self._consumers:
+            self._remove(consumer, "closed")
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        logger.info(f"Fanout hub stopped: {self.stats()}")
+
+    # ===== 发布 =====
+    def publish(self, kind: int, key: str, fields: Iterable):
+        """发布一条数据给订阅了 (kind, key) 的消费者，只在有人订阅时编码"""
+        self.published += 1
+        frame = None
+        for consumer in self._consumers:
+            if not consumer.wants(kind, key):
+                continue
+            if frame is None:
+                frame = pack_frame(kind, self.codec.dumps(list(fields)).encode())
+            try:
+                consumer.queue.put_nowait(frame)
+                self.delivered += 1
+            except queue.Full:
+                self.evicted += 1
+                logger.warning(f"Fanout consumer {consumer.name} is too slow ({self.queue_size} frames queued), evicting")
+                self._remove(consumer, "evicted")
+
+    def on_updates_batch(self, batch: L2UpdateBatch):
+        """接收器的 on_updates_batch 回调"""
+        self.publish(KIND_BOOK, f"{batch.exchange}:{batch.symbol}", batch)
+
+    def on_snapshot(self, snapshot):
+        """快照回调 (TardisL2Snapshot)，以 is_snapshot=True 的 book 数据发布"""
+        bids, asks = snapshot.bids, snapshot.asks
+        self.publish(KIND_BOOK, f"{snapshot.exchange}:{snapshot.symbol}", (
+            snapshot.exchange,
+            snapshot.symbol,
+            snapshot.timestamp,
+            snapshot.local_timestamp,
+            True,
+            [SIDE_BID] * len(bids) + [SIDE_ASK] * len(asks),
+            [level.price for level in bids] + [level.price for level in asks],
+            [level.amount for level in bids] + [level.amount for level in asks],
+        ))
+
+    def on_trade(self, trade):
+        """成交回调 (Lighter LighterTrade / Paradex TardisTrade)"""
+        trade_id = getattr(trade, "trade_id", None)
+        if trade_id is None:
+            trade_id = trade.id
+        self.publish(KIND_TRADES, f"{trade.exchange}:{trade.symbol}", (
+            trade.exchange, trade.symbol, trade.timestamp, trade.local_timestamp, str(trade_id), trade.side, trade.price, trade.amount,
+        ))
+
+    def stats(self) -> dict:
+        return {
+            "consumers": len(self._consumers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "evicted": self.evicted,
+        }
+
+
+class FanoutClient:
+    """消费者: 连接 FanoutHub 并订阅，迭代得到 ("book", L2UpdateBatch) / ("trades", HubTrade)"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, codec: Optional[JsonCodec] = None):
+        self.codec = codec or get_codec()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+
+    def _control(self, op: str, channels: Optional[List[str]], symbols: Optional[List[str]]):
+        request = {"op": op, "channels": channels or list(CHANNELS), "symbols": symbols or [WILDCARD]}
+        self.sock.sendall(pack_frame(KIND_CONTROL, self.codec.dumps(request).encode()))
+
+    def subscribe(self, channels: Optional[List[str]] = None, symbols: Optional[List[str]] = None):
+        """订阅频道和交易对("{exchange}:{symbol}")，为空表示全部"""
+        self._control("subscribe", channels, symbols)
+
+    def unsubscribe(self, channels: Optional[List[str]] = None, symbols: Optional[List[str]] = None):
+        self._control("unsubscribe", channels, symbols)
+
+    def recv(self) -> Optional[Tuple[str, object]]:
+        """读下一条数据，连接断开(包括因读得太慢被断开)时返回 None"""
+        while True:
+            frame = read_frame(self.sock)
+            if frame is None:
+                return None
+            kind, body = frame
+            if kind == KIND_BOOK:
+                return "book", L2UpdateBatch(*self.codec.loads(body))
+            if kind == KIND_TRADES:
+                return "trades", HubTrade(*self.codec.loads(body))
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        while True:
+            item = self.recv()
+            if item is None:
+                return
+            yield item
+
+    def close(self):
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订阅本机行情分发并打印")
+    parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET_PATH, help=f"socket 路径 (默认: {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--channels", type=str, default="book,trades", help="频道，逗号分隔 (默认: book,trades)")
+    parser.add_argument("--symbols", type=str, default=WILDCARD, help="交易对 {exchange}:{symbol}，逗号分隔 (默认: 全部)")
+    args = parser.parse_args()
+
+    client = FanoutClient(args.socket)
+    client.subscribe(args.channels.split(","), args.symbols.split(","))
+    try:
+        for channel, item in client:
+            if channel == "book":
+                print(f"book   {item.exchange}:{item.symbol} {item.timestamp} snapshot={item.is_snapshot} levels={len(item)}")
+            else:
+                print(f"trades {item.exchange}:{item.symbol} {item.timestamp} {item.side} {item.amount} @ {item.price}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
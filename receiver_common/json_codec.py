@@ -0,0 +1,99 @@
+"""
+接收器使用的 JSON 编解码
+
+按 orjson > msgspec > json 的顺序选择已安装的最快实现，
+也可以通过环境变量 RECEIVER_JSON_BACKEND=orjson|msgspec|json 或 get_codec(name) 指定。
+dumps 统一返回 str，可以直接用于 websocket send。
+
+typed_decoder() 在安装了 msgspec 时返回按 msgspec.Struct 结构解码的函数，
+用于把高频消息直接解码成接收器内部使用的结构，跳过中间 dict。
+结构的字段都有默认值，其他类型的消息也能解码成功，所以用 marker 先按原始帧筛出要解码的消息类型。
+"""
+
+import json
+import logging
+import os
+from typing import Any, Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND_ENV = "RECEIVER_JSON_BACKEND"
+BACKEND_ORDER = ("orjson", "msgspec", "json")
+
+
+class JsonCodec(NamedTuple):
+    name: str
+    loads: Callable[[Any], Any]
+    dumps: Callable[[Any], str]
+
+
+def _make_orjson() -> JsonCodec:
+    import orjson
+    return JsonCodec("orjson", orjson.loads, lambda obj: orjson.dumps(obj).decode())
+
+
+def _make_msgspec() -> JsonCodec:
+    import msgspec
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+    return JsonCodec("msgspec", decoder.decode, lambda obj: encoder.encode(obj).decode())
+
+
+def _make_json() -> JsonCodec:
+    return JsonCodec("json", json.loads, json.dumps)
+
+
+_FACTORIES = {
+    "orjson": _make_orjson,
+    "msgspec": _make_msgspec,
+    "json": _make_json,
+}
+
+_default_codec: Optional[JsonCodec] = None
+
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    """获取编解码器，name 为空时使用环境变量或自动选择"""
+    global _default_codec
+    if name:
+        if name not in _FACTORIES:
+            raise ValueError(f"unknown json backend: {name}")
+        return _FACTORIES[name]()
+
+    if _default_codec is None:
+        env_name = os.getenv(JSON_BACKEND_ENV)
+        if env_name:
+            _default_codec = get_codec(env_name)
+        else:
+            for backend in BACKEND_ORDER:
+                try:
+                    _default_codec = _FACTORIES[backend]()
+                    break
+                except ImportError:
+                    continue
+        logger.debug(f"Using {_default_codec.name} json backend")
+    return _default_codec
+
+
+def typed_decoder(struct_type, marker: Optional[str] = None) -> Optional[Callable[[Any], Any]]:
+    """按 msgspec 结构解码的函数，结构不匹配时返回 None；未安装 msgspec 返回 None
+
+    marker 不为空时原始帧 (str 或 bytes) 中不包含 marker 的消息不解码，直接返回 None。
+    """
+    try:
+        import msgspec
+    except ImportError:
+        return None
+    decoder = msgspec.json.Decoder(struct_type)
+    validation_error = msgspec.ValidationError
+    marker_bytes = marker.encode() if marker else None
+
+    def decode(message):
+        if marker_bytes is not None and (marker_bytes if isinstance(message, (bytes, bytearray)) else marker) not in message:
+            return None
+        try:
+            return decoder.decode(message)
+        except validation_error:
+            return None
+
+    return decode
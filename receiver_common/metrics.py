@@ -0,0 +1,379 @@
+"""
+接收器运行指标
+
+在接收器的数据回调、消息处理和 JSON 解码外面包一层计时/计数，汇总为:
+    - 每个交易对的消息数、档位数 (JSON 文件中换算为每秒速率)
+    - 每帧 JSON 解析耗时 (一帧内各次解码之和，如 typed 解码未命中后再走 dict 解码)、各回调耗时的直方图
+    - 交易所时间到本地接收时间的延迟 (local_timestamp - timestamp) 直方图和分位数
+    - 流水线缓冲区深度、重连次数、序号缺口次数 (导出时读取，不占用热路径)
+
+导出方式:
+    - 本机 HTTP /metrics，Prometheus 文本格式
+    - 定期写入 JSON 文件 (先写临时文件再改名，读方不会读到半个文件)
+
+热路径上每条回调只多两次 perf_counter、一次 bisect 和几个整数加法。
+直方图使用固定的 1-2.5-5 分桶，分位数按桶内线性插值估算。
+
+使用示例:
+    receiver.on_updates_batch = writer.write_batch
+    registry = MetricsRegistry()
+    registry.add(receiver)                  # 在设置好回调之后、FramePipeline.start() 之前调用
+    registry.serve(9100)                    # http://127.0.0.1:9100/metrics
+    registry.start_stats_file("./data/stats.json", interval=10)
+    receiver.start()
+    ...
+    registry.stop()
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from .base_receiver import DATA_CALLBACK_NAMES
+from .json_codec import JsonCodec
+
+logger = logging.getLogger(__name__)
+
+perf_counter = time.perf_counter
+
+
+def _log_buckets(start: float, stop: float) -> List[float]:
+    """start 到 stop 之间的 1-2.5-5 分桶上界"""
+    bounds = []
+    base = start
+    while base <= stop:
+        for factor in (1, 2.5, 5):
+            if base * factor <= stop:
+                bounds.append(round(base * factor, 12))
+        base *= 10
+    return bounds
+
+
+DURATION_BUCKETS = _log_buckets(1e-6, 1.0)  # 秒
+LAG_BUCKETS = _log_buckets(1e-4, 10.0)  # 秒
+
+
+class Histogram:
+    """固定分桶直方图，counts 比 bounds 多一个 +Inf 桶"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """估算分位数 (0 < q <= 1)，没有数据时返回 None"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        bounds = self.bounds
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= rank:
+                if i == len(bounds):
+                    return bounds[-1]
+                lower = bounds[i - 1] if i > 0 else 0.0
+                return lower + (bounds[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return bounds[-1]
+
+    def summary(self, scale: float) -> dict:
+        """p50/p90/p99/平均值，乘以 scale 换算单位"""
+        result = {"count": self.count}
+        for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            value = self.percentile(q)
+            result[name] = round(value * scale, 3) if value is not None else None
+        result["mean"] = round(self.sum / self.count * scale, 3) if self.count else None
+        return result
+
+    def prometheus_lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.9g}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def _item_counts(name: str, item) -> Tuple[int, int]:
+    """一次回调对应的 (消息数, 档位数)"""
+    if name == "on_updates_batch":
+        return 1, len(item.prices)
+    if name == "on_snapshot":
+        return 1, len(item.bids) + len(item.asks)
+    if name == "on_update":
+        # 逐档回调: 只计档位，消息数由 on_updates_batch / on_snapshot 统计
+        return 0, 1
+    return 1, 0
+
+
+class ReceiverMetrics:
+    """一个接收器的指标，add() 时包装好回调和解码函数"""
+
+    def __init__(self, receiver):
+        self.receiver = receiver
+        self.name = getattr(receiver, "name", type(receiver).__name__)
+        self.frames = 0
+        self.parse_seconds = Histogram(DURATION_BUCKETS)
+        self.callback_seconds: Dict[str, Histogram] = {}
+        self.lag_seconds = Histogram(LAG_BUCKETS)
+        self.symbols: Dict[Tuple[str, str], List[int]] = {}  # (exchange, symbol) -> [消息数, 档位数]
+
+    def instrument(self):
+        receiver = self.receiver
+        for name in DATA_CALLBACK_NAMES:
+            callback = getattr(receiver, name, None)
+            if callback is not None:
+                setattr(receiver, name, self._timed_callback(name, callback))
+
+        handle = getattr(receiver, "_handle_message", None)
+        if handle is None:
+            return
+        # 帧数和解析耗时按 _handle_message 统计，每帧一个样本；解码函数只把耗时累加到当前帧
+        parse_seconds = [None]
+        codec = getattr(receiver, "codec", None)
+        if codec is not None:
+            receiver.codec = JsonCodec(codec.name, self._timed_decode(codec.loads, parse_seconds), codec.dumps)
+        # 安装了 msgspec 时订单簿消息直接解码为结构体，不经过 codec.loads
+        typed_decode = getattr(receiver, "_typed_decode", None)
+        if typed_decode is not None:
+            receiver._typed_decode = self._timed_decode(typed_decode, parse_seconds)
+        receiver._handle_message = self._timed_handle(handle, parse_seconds)
+
+    def _timed_handle(self, handle, parse_seconds: list):
+        observe = self.parse_seconds.observe
+
+        def timed(message, send):
+            self.frames += 1
+            parse_seconds[0] = 0.0
+            try:
+                return handle(message, send)
+            finally:
+                observe(parse_seconds[0])
+                parse_seconds[0] = None
+        return timed
+
+    @staticmethod
+    def _timed_decode(decode, parse_seconds: list):
+        def timed(message):
+            start = perf_counter()
+            result = decode(message)
+            # 帧外的解码 (如 WebSocket 线程识别 ping) 不计入
+            if parse_seconds[0] is not None:
+                parse_seconds[0] += perf_counter() - start
+            return result
+        return timed
+
+    def _timed_callback(self, name: str, callback):
+        observe = self.callback_seconds.setdefault(name, Histogram(DURATION_BUCKETS)).observe
+        observe_lag = self.lag_seconds.observe
+        symbols = self.symbols
+
+        def timed(item):
+            start = perf_counter()
+            callback(item)
+            observe(perf_counter() - start)
+            messages, levels = _item_counts(name, item)
+            key = (item.exchange, item.symbol)
+            counts = symbols.get(key)
+            if counts is None:
+                counts = symbols[key] = [0, 0]
+            counts[0] += messages
+            counts[1] += levels
+            if messages:
+                observe_lag((item.local_timestamp - item.timestamp) / 1e6)
+        return timed
+
+    # ===== 导出时读取的状态 =====
+    def reconnects(self) -> int:
+        return max(0, getattr(self.receiver, "connects", 0) - 1)
+
+    def counters(self) -> Dict[str, int]:
+        """序号缺口、重复成交等接收器自己维护的计数"""
+        result = {}
+        for attr in ("gap_count", "stale_count", "duplicate_count"):
+            value = getattr(self.receiver, attr, None)
+            if value is not None:
+                result[attr[:-len("_count")]] = value
+        return result
+
+    def queue_depths(self) -> Dict[str, int]:
+        pipeline = getattr(self.receiver, "_pipeline", None)
+        if pipeline is None:
+            return {}
+        return {"raw": len(pipeline.raw_buffer), "write": len(pipeline.write_buffer)}
+
+
+class MetricsRegistry:
+    """汇总多个接收器的指标并导出"""
+
+    def __init__(self):
+        self.receivers: List[ReceiverMetrics] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stats_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_symbols: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+        self._last_time = time.monotonic()
+
+    def add(self, receiver) -> ReceiverMetrics:
+        """开始统计一个接收器，需要在设置好回调之后、FramePipeline.start() 之前调用"""
+        metrics = ReceiverMetrics(receiver)
+        metrics.instrument()
+        self.receivers.append(metrics)
+        return metrics
+
+    # ===== Prometheus =====
+    def render_prometheus(self) -> str:
+        lines = [
+            "# TYPE receiver_frames_total counter",
+            "# TYPE receiver_messages_total counter",
+            "# TYPE receiver_levels_total counter",
+            "# TYPE receiver_reconnects_total counter",
+            "# TYPE receiver_sequence_errors_total counter",
+            "# TYPE receiver_queue_depth gauge",
+            "# TYPE receiver_parse_seconds histogram",
+            "# TYPE receiver_callback_seconds histogram",
+            "# TYPE receiver_lag_seconds histogram",
+        ]
+        for metrics in self.receivers:
+            receiver = f'receiver="{metrics.name}"'
+            lines.append(f"receiver_frames_total{{{receiver}}} {metrics.frames}")
+            for (exchange, symbol), (messages, levels) in list(metrics.symbols.items()):
+                labels = f'{receiver},exchange="{exchange}",symbol="{symbol}"'
+                lines.append(f"receiver_messages_total{{{labels}}} {messages}")
+                lines.append(f"receiver_levels_total{{{labels}}} {levels}")
+            lines.append(f"receiver_reconnects_total{{{receiver}}} {metrics.reconnects()}")
+            for kind, value in metrics.counters().items():
+                lines.append(f'receiver_sequence_errors_total{{{receiver},kind="{kind}"}} {value}')
+            for queue, depth in metrics.queue_depths().items():
+                lines.append(f'receiver_queue_depth{{{receiver},queue="{queue}"}} {depth}')
+            lines.extend(metrics.parse_seconds.prometheus_lines("receiver_parse_seconds", receiver))
+            for name, histogram in list(metrics.callback_seconds.items()):
+                lines.extend(histogram.prometheus_lines("receiver_callback_seconds", f'{receiver},callback="{name}"'))
+            lines.extend(metrics.lag_seconds.prometheus_lines("receiver_lag_seconds", receiver))
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """在后台线程提供 http://host:port/metrics"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"Metrics available at http://{host}:{port}/metrics")
+
+    # ===== JSON =====
+    def to_dict(self) -> dict:
+        """当前指标，消息/档位速率按距离上一次调用的时间计算"""
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-9)
+        self._last_time = now
+        result = {"time": time.time(), "receivers": {}}
+        for metrics in self.receivers:
+            symbols = {}
+            for (exchange, symbol), (messages, levels) in list(metrics.symbols.items()):
+                last_messages, last_levels = self._last_symbols.get((metrics.name, exchange, symbol), (0, 0))
+                self._last_symbols[(metrics.name, exchange, symbol)] = (messages, levels)
+                symbols[f"{exchange}:{symbol}"] = {
+                    "messages": messages,
+                    "levels": levels,
+                    "messages_per_s": round((messages - last_messages) / elapsed, 2),
+                    "levels_per_s": round((levels - last_levels) / elapsed, 2),
+                }
+            result["receivers"][metrics.name] = {
+                "frames": metrics.frames,
+                "reconnects": metrics.reconnects(),
+                **metrics.counters(),
+                "queues": metrics.queue_depths(),
+                "parse_us": metrics.parse_seconds.summary(1e6),
+                "callback_us": {name: h.summary(1e6) for name, h in list(metrics.callback_seconds.items())},
+                "lag_ms": metrics.lag_seconds.summary(1e3),
+                "symbols": symbols,
+            }
+        return result
+
+    def write_stats_file(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    def start_stats_file(self, path: str, interval: float = 10.0):
+        """每隔 interval 秒把指标写入 JSON 文件"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.write_stats_file(path)
+                except Exception as e:
+                    logger.error(f"Failed to write stats file {path}: {e}")
+
+        self._stats_thread = threading.Thread(target=run, name="metrics-stats-file", daemon=True)
+        self._stats_thread.start()
+        logger.info(f"Writing stats to {path} every {interval}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._stats_thread is not None:
+            self._stats_thread.join(5)
+            self._stats_thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser):
+    """添加指标导出相关的命令行参数"""
+    parser.add_argument("--metrics-port", type=int, default=0, help="在 127.0.0.1 该端口提供 Prometheus /metrics，0 表示不启用 (默认: 0)")
+    parser.add_argument("--stats-file", type=str, default="", help="定期把指标写入该 JSON 文件")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="JSON 指标文件的写入间隔秒数 (默认: 10)")
+
+
+def start_metrics(args: argparse.Namespace, receivers) -> Optional[MetricsRegistry]:
+    """按命令行参数启用指标，没有指定 --metrics-port / --stats-file 时返回 None"""
+    if not args.metrics_port and not args.stats_file:
+        return None
+    registry = MetricsRegistry()
+    for receiver in receivers:
+        registry.add(receiver)
+    if args.metrics_port:
+        registry.serve(args.metrics_port)
+    if args.stats_file:
+        registry.start_stats_file(args.stats_file, args.stats_interval)
+    return registry
@@ -0,0 +1,102 @@
+"""
+内存中的 L2 订单簿
+
+每一边用 dict(价格 -> 档位) 加一个按价格升序排列的 key 列表保存:
+    - 更新/删除一个档位: bisect 定位 O(log n) (列表插入/删除是一次内存移动，档位数通常只有几百)
+    - 最优买/卖价: 列表两端 O(1)
+价格和数量保留交易所推送的原始字符串，排序用 float(price)。
+
+使用示例:
+    book = L2OrderBook("lighter", "ETHUSDT")
+    book.apply([("3000.1", "2.5")], [("3000.2", "1.0")], is_snapshot=True)
+    book.best_bid()  # ("3000.1", "2.5")
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Level = Tuple[str, str]  # (price, amount)
+
+
+class BookSide:
+    """订单簿的一边"""
+
+    __slots__ = ("is_bid", "_keys", "_levels")
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self._keys: List[float] = []  # 升序
+        self._levels: Dict[float, Level] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def set(self, price: str, amount: str):
+        """设置一个档位，数量为 0 表示删除"""
+        key = float(price)
+        if float(amount) == 0:
+            if self._levels.pop(key, None) is not None:
+                keys = self._keys
+                del keys[bisect_left(keys, key)]
+            return
+        if key not in self._levels:
+            insort(self._keys, key)
+        self._levels[key] = (price, amount)
+
+    def clear(self):
+        self._keys.clear()
+        self._levels.clear()
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        return self._levels[self._keys[-1] if self.is_bid else self._keys[0]]
+
+    def top(self, n: int) -> List[Level]:
+        """从最优价开始的前 n 档"""
+        keys = self._keys[-n:][::-1] if self.is_bid else self._keys[:n]
+        levels = self._levels
+        return [levels[key] for key in keys]
+
+
+class L2OrderBook:
+    """一个市场的 L2 订单簿"""
+
+    __slots__ = ("exchange", "symbol", "bids", "asks", "timestamp", "local_timestamp", "sequence")
+
+    def __init__(self, exchange: str = "", symbol: str = ""):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.timestamp = 0  # 交易所时间(微秒)
+        self.local_timestamp = 0  # 本地接收时间(微秒)
+        self.sequence = None  # 最后应用的消息序号(offset / nonce / seq_no)
+
+    def apply(self, bids: Iterable[Level], asks: Iterable[Level], is_snapshot: bool = False):
+        """应用一条快照或增量消息的档位"""
+        if is_snapshot:
+            self.clear()
+        bid_side, ask_side = self.bids, self.asks
+        for price, amount in bids:
+            bid_side.set(price, amount)
+        for price, amount in asks:
+            ask_side.set(price, amount)
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    def top(self, n: int) -> Tuple[List[Level], List[Level]]:
+        """前 n 档 (bids, asks)"""
+        return self.bids.top(n), self.asks.top(n)
+
+    def is_crossed(self) -> bool:
+        bid, ask = self.bids.best(), self.asks.best()
+        return bid is not None and ask is not None and float(bid[0]) >= float(ask[0])
@@ -0,0 +1,300 @@
+"""
+按天按 symbol 保存 Parquet 列式文件 (需要安装 pyarrow)
+
+与 DailyFileWriter 写出的 CSV 行内容相同，但按类型存储，研究时不需要再解析文本:
+
+    - timestamp / local_timestamp 为 int64 微秒
+    - exchange / symbol / side 为字典编码列
+    - price / amount 为定点 int64 (实际值 = 整数 / 10**scale)，scale 记录在字段 metadata 里；
+      空字符串(如 book_snapshot_15 中不足 15 档的位置)存为 null
+    - 每个 symbol 攒够 row_group_rows 行写一个 row group，保留列统计信息，读取时可按
+      timestamp / price 等做谓词下推
+    - 列转换、压缩和写盘在后台 IO 线程完成，写入方法只把行追加到内存列表
+
+Parquet 的 footer 在关闭文件时才写入，没有 footer 的文件整个不可读。因此每个文件最多写 roll_interval 秒
+(默认 1 小时)，到时写出剩余的行并关闭，之后的数据写到下一个文件；进程被杀时最多丢失当前这个文件。
+roll_interval=0 表示一天一个文件，崩溃会丢失当天全部数据，长时间采集请使用默认值或 CSV。
+
+文件名: {output_dir}/{exchange}_{FILE_KIND}_{symbol}_{date}.parquet
+Parquet 文件不能追加，同一天的文件已存在时(滚动、重启)写到 {date}.1.parquet、{date}.2.parquet ...
+
+子类提供 FILE_KIND、COLUMNS 和具体的 write 方法，例如:
+
+    class DailyParquetL2Writer(DailyParquetWriter):
+        FILE_KIND = "book_snapshot_l2"
+        COLUMNS = [("exchange", COL_DICT), ("symbol", COL_DICT), ("timestamp", COL_INT64), ...]
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .writer import DAY_US
+
+logger = logging.getLogger(__name__)
+
+# 列类型
+COL_DICT = "dict"  # 字典编码字符串
+COL_STR = "str"
+COL_INT64 = "int64"
+COL_BOOL = "bool"
+COL_SCALED = "scaled"  # 十进制字符串 -> 定点 int64
+
+PRICE_SCALE = 8
+
+DEFAULT_ROLL_INTERVAL = 3600.0  # 每个文件最长写入的秒数
+
+_OP_WRITE = 0
+_OP_CLOSE = 1
+_STOP = None
+
+
+def to_scaled_int(value: str, scale: int = PRICE_SCALE) -> Optional[int]:
+    """十进制字符串转为定点整数(value * 10**scale)，空字符串返回 None"""
+    if not value:
+        return None
+    int_part, _, frac_part = value.partition(".")
+    if len(frac_part) <= scale and "e" not in value and "E" not in value:
+        return int(int_part + frac_part + "0" * (scale - len(frac_part)))
+    # 科学计数法或小数位超过 scale 时按四舍五入处理
+    return int(Decimal(value).scaleb(scale).to_integral_value())
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+class _DayTable:
+    """一个 symbol 当前的 Parquet 文件及未写出的列缓冲，writer 只在 IO 线程中使用"""
+
+    __slots__ = ("symbol", "date", "path", "day_start_us", "day_end_us", "columns", "rows", "count", "opened_at", "writer")
+
+    def __init__(self, symbol: str, date: str, path: str, day_start_us: int, num_columns: int):
+        self.symbol = symbol
+        self.date = date
+        self.path = path
+        self.day_start_us = day_start_us
+        self.day_end_us = day_start_us + DAY_US
+        self.columns: List[list] = [[] for _ in range(num_columns)]
+        self.rows = 0
+        self.count = 0
+        self.opened_at = time.monotonic()
+        self.writer = None
+
+
+class DailyParquetWriter:
+    """按天按 symbol 保存 Parquet 文件，写入方法可在任意单个线程中调用"""
+
+    # 文件名中的数据类型，如 book_snapshot_l2 / trades
+    FILE_KIND = ""
+    # [(列名, 列类型)]
+    COLUMNS: List[Tuple[str, str]] = []
+
+    def __init__(
+        self,
+        output_dir: str,
+        exchange: str,
+        row_group_rows: int = 100_000,
+        compression: str = "zstd",
+        scale: int = PRICE_SCALE,
+        roll_interval: float = DEFAULT_ROLL_INTERVAL,
+    ):
+        self.output_dir = output_dir
+        self.exchange = exchange
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.scale = scale
+        self.roll_interval = roll_interval
+        self._tables: Dict[str, _DayTable] = {}  # key: symbol
+        self._used_paths: Set[str] = set()  # 本进程已使用的文件名，后台线程可能还没创建文件
+        self._total_count = 0
+        self._schema = None
+        self._lock = threading.Lock()
+
+        self._queue: Optional[queue.Queue] = None
+        self._io_thread: Optional[threading.Thread] = None
+        self._roll_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _get_schema(self):
+        if self._schema is None:
+            pa, _ = _import_pyarrow()
+            types = {
+                COL_DICT: pa.dictionary(pa.int32(), pa.string()),
+                COL_STR: pa.string(),
+                COL_INT64: pa.int64(),
+                COL_BOOL: pa.bool_(),
+                COL_SCALED: pa.int64(),
+            }
+            fields = []
+            for name, kind in self.COLUMNS:
+                metadata = {"scale": str(self.scale)} if kind == COL_SCALED else None
+                fields.append(pa.field(name, types[kind], metadata=metadata))
+            self._schema = pa.schema(fields, metadata={"exchange": self.exchange, "kind": self.FILE_KIND})
+        return self._schema
+
+    def _get_file_path(self, symbol: str, date: str) -> str:
+        base = os.path.join(self.output_dir, f"{self.exchange}_{self.FILE_KIND}_{symbol}_{date}")
+        path = f"{base}.parquet"
+        part = 0
+        while path in self._used_paths or os.path.exists(path):
+            part += 1
+            path = f"{base}.{part}.parquet"
+        self._used_paths.add(path)
+        return path
+
+    def _get_table(self, symbol: str, timestamp_us: int) -> _DayTable:
+        """symbol 当前的文件，需要持有 self._lock"""
+        table = self._tables.get(symbol)
+        if table is not None and table.day_start_us <= timestamp_us < table.day_end_us:
+            return table
+        if table is not None:
+            self._close_table(table)
+        self._ensure_started()
+
+        day_start_us = timestamp_us - timestamp_us % DAY_US
+        date = datetime.fromtimestamp(day_start_us // 1_000_000, tz=timezone.utc).strftime("%Y-%m-%d")
+        table = _DayTable(symbol, date, self._get_file_path(symbol, date), day_start_us, len(self.COLUMNS))
+        self._tables[symbol] = table
+        logger.info(f"创建新文件: {table.path}")
+        return table
+
+    def write_row(self, symbol: str, timestamp_us: int, row: Sequence):
+        """追加一行，row 的顺序与 COLUMNS 一致"""
+        with self._lock:
+            table = self._get_table(symbol, timestamp_us)
+            for column, value in zip(table.columns, row):
+                column.append(value)
+            self._added(table, 1)
+
+    def write_columns(self, symbol: str, timestamp_us: int, columns: Sequence[list]):
+        """追加多行，columns 为与 COLUMNS 对应的等长列表"""
+        with self._lock:
+            table = self._get_table(symbol, timestamp_us)
+            for column, values in zip(table.columns, columns):
+                column.extend(values)
+            self._added(table, len(columns[0]))
+
+    def _added(self, table: _DayTable, rows: int):
+        table.rows += rows
+        table.count += rows
+        self._total_count += rows
+        if table.rows >= self.row_group_rows:
+            self._flush_table(table)
+
+    def _to_array(self, pa, kind: str, values: list):
+        if kind == COL_DICT:
+            return pa.array(values, pa.string()).dictionary_encode()
+        if kind == COL_SCALED:
+            scale = self.scale
+            return pa.array([to_scaled_int(v, scale) for v in values], pa.int64())
+        if kind == COL_INT64:
+            return pa.array(values, pa.int64())
+        if kind == COL_BOOL:
+            return pa.array(values, pa.bool_())
+        return pa.array(values, pa.string())
+
+    def _flush_table(self, table: _DayTable):
+        """把缓冲的行交给 IO 线程写成一个 row group，需要持有 self._lock"""
+        if not table.rows:
+            return
+        columns = table.columns
+        table.columns = [[] for _ in self.COLUMNS]
+        table.rows = 0
+        self._queue.put((_OP_WRITE, table, columns))
+
+    def _close_table(self, table: _DayTable):
+        """写出剩余的行并关闭文件(写入 footer)，需要持有 self._lock"""
+        self._flush_table(table)
+        self._queue.put((_OP_CLOSE, table, None))
+
+    def _ensure_started(self):
+        if self._io_thread is not None:
+            return
+        # 在写入方线程里检查 pyarrow，缺少依赖时立即报错
+        _import_pyarrow()
+        # 限制排队的 row group 数，后台写盘跟不上时写入方等待，而不是无限占用内存
+        self._queue = queue.Queue(maxsize=16)
+        self._stop_event.clear()
+        self._io_thread = threading.Thread(target=self._io_loop, name=f"{self.exchange}-{self.FILE_KIND}-parquet-io", daemon=True)
+        self._io_thread.start()
+        if self.roll_interval > 0:
+            self._roll_thread = threading.Thread(target=self._roll_loop, name=f"{self.exchange}-{self.FILE_KIND}-parquet-roll", daemon=True)
+            self._roll_thread.start()
+
+    def _io_loop(self):
+        """后台 IO 线程: 按提交顺序把列转换为 Arrow 数组写成 row group，关闭文件"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            op, table, columns = item
+            try:
+                if op == _OP_WRITE:
+                    self._write_row_group(table, columns)
+                elif table.writer is not None:
+                    table.writer.close()
+                    table.writer = None
+                    logger.info(f"关闭文件: {table.path}，共 {table.count} 条记录")
+            except Exception as e:
+                logger.error(f"Error writing {table.path}: {e}", exc_info=True)
+
+    def _write_row_group(self, table: _DayTable, columns: List[list]):
+        pa, pq = _import_pyarrow()
+        schema = self._get_schema()
+        arrays = [self._to_array(pa, kind, values) for (_, kind), values in zip(self.COLUMNS, columns)]
+        if table.writer is None:
+            table.writer = pq.ParquetWriter(table.path, schema, compression=self.compression, write_statistics=True)
+        table.writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=len(columns[0]))
+        logger.info(f"[{table.symbol}][{table.date}] 已写入 {table.count} 条记录")
+
+    def _roll_loop(self):
+        """关闭写入超过 roll_interval 秒的文件，之后的数据写到新文件"""
+        interval = min(60.0, self.roll_interval)
+        while not self._stop_event.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                for symbol, table in list(self._tables.items()):
+                    if now - table.opened_at >= self.roll_interval:
+                        self._close_table(table)
+                        del self._tables[symbol]
+
+    def close_symbol(self, symbol: str) -> bool:
+        """写出一个 symbol 剩余的行并关闭文件 (如运行中退订)"""
+        with self._lock:
+            table = self._tables.pop(symbol, None)
+            if table is None:
+                return False
+            self._close_table(table)
+            return True
+
+    def close_all(self):
+        """写出剩余的行并关闭所有文件，停止后台线程"""
+        with self._lock:
+            for table in list(self._tables.values()):
+                self._close_table(table)
+            self._tables.clear()
+        if self._io_thread is None:
+            return
+        self._stop_event.set()
+        if self._roll_thread is not None:
+            self._roll_thread.join()
+            self._roll_thread = None
+        self._queue.put(_STOP)
+        self._io_thread.join()
+        self._io_thread = None
+
+    def get_total_count(self) -> int:
+        """获取总记录数"""
+        return self._total_count
@@ -0,0 +1,127 @@
+"""
+接收 / 解析 / 写盘 三段流水线
+
+WebSocket 线程只做两件事: 立即回复 ping，把原始帧和本地接收时间戳放进 raw 缓冲区。
+解析线程从 raw 缓冲区取帧，调用接收器的协议解析，产生的回调数据放进 write 缓冲区；
+重连时 WebSocket 线程在 raw 缓冲区中放一个重置标记，解析线程处理完旧连接的帧后才重置接收器的序号等状态；
+写盘线程从 write 缓冲区取数据，调用用户设置的回调(例如 DailyCSVWriter.write)。
+这样 gzip 压缩、flush 等磁盘操作的停顿不会影响读 socket 和回复 ping。
+
+使用示例:
+    receiver = LighterDepthReceiver(market_ids=[0])
+    receiver.on_update = writer.write
+    pipeline = FramePipeline(receiver, capacity=100_000, policy="spill")
+    pipeline.start()
+    receiver.start()
+    ...
+    receiver.stop()
+    pipeline.stop()
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from .base_receiver import BaseWSReceiver, DATA_CALLBACK_NAMES
+from .ring_buffer import RingBuffer, POLICY_BLOCK
+
+logger = logging.getLogger(__name__)
+
+# raw 缓冲区中的重置标记 (recv_ts_us, None)，可以和帧一起溢出到磁盘
+_RESET = (0, None)
+
+
+class FramePipeline:
+    """把接收器的解析和回调移到独立的工作线程"""
+
+    def __init__(
+        self,
+        receiver: BaseWSReceiver,
+        capacity: int = 100_000,
+        policy: str = POLICY_BLOCK,
+        spill_dir: Optional[str] = None,
+        batch_size: int = 1000,
+        stats_interval: float = 60.0,
+    ):
+        self.receiver = receiver
+        self.batch_size = batch_size
+        self.stats_interval = stats_interval
+        # 背压策略作用在原始帧上；write 缓冲区满时解析线程等待，积压最终回到 raw 缓冲区
+        self.raw_buffer = RingBuffer(capacity, policy, spill_dir, name=f"{receiver.name}_raw")
+        self.write_buffer = RingBuffer(capacity, POLICY_BLOCK, name=f"{receiver.name}_write")
+
+        self._running = False
+        self._send: Optional[Callable[[str], None]] = None
+        self._callbacks = {}
+        self._parse_thread: Optional[threading.Thread] = None
+        self._write_thread: Optional[threading.Thread] = None
+
+    def push(self, message: str, send: Callable[[str], None], recv_ts_us: int):
+        """WebSocket 线程调用: 放入原始帧"""
+        self._send = send
+        self.raw_buffer.put((recv_ts_us, message))
+
+    def push_reset(self):
+        """WebSocket 线程调用: 新连接建立，解析线程处理到这里时调用 receiver._reset_connection_state()"""
+        self.raw_buffer.put(_RESET)
+
+    def _parse_loop(self):
+        receiver = self.receiver
+        last_stats = time.monotonic()
+        while self._running or len(self.raw_buffer):
+            for recv_ts_us, message in self.raw_buffer.get_batch(self.batch_size):
+                if message is None:
+                    receiver._reset_connection_state()
+                    continue
+                receiver._process_message(message, self._send, recv_ts_us)
+            now = time.monotonic()
+            if now - last_stats >= self.stats_interval:
+                last_stats = now
+                logger.info(f"[{receiver.name}] pipeline stats: {self.stats()}")
+        self.write_buffer.close()
+
+    def _write_loop(self):
+        callbacks = self._callbacks
+        while self._parse_thread.is_alive() or len(self.write_buffer):
+            for name, item in self.write_buffer.get_batch(self.batch_size):
+                try:
+                    callbacks[name](item)
+                except Exception as e:
+                    logger.error(f"Error in {name} callback: {e}", exc_info=True)
+                    if self.receiver.on_error:
+                        self.receiver.on_error(e)
+
+    def start(self):
+        """接管接收器的回调并启动工作线程，需要在设置好回调之后、receiver.start() 之前调用"""
+        write_put = self.write_buffer.put
+        for name in DATA_CALLBACK_NAMES:
+            callback = getattr(self.receiver, name, None)
+            if callback is not None:
+                self._callbacks[name] = callback
+                setattr(self.receiver, name, lambda item, name=name: write_put((name, item)))
+
+        self._running = True
+        self._parse_thread = threading.Thread(target=self._parse_loop, name=f"{self.receiver.name}-parse", daemon=True)
+        self._write_thread = threading.Thread(target=self._write_loop, name=f"{self.receiver.name}-write", daemon=True)
+        self._parse_thread.start()
+        self._write_thread.start()
+        self.receiver.set_pipeline(self)
+
+    def stop(self, timeout: float = 30.0):
+        """停止流水线，等待缓冲区中的数据处理完(溢出文件中的数据也会读回)"""
+        self.receiver.set_pipeline(None)
+        self._running = False
+        self.raw_buffer.close()
+        for thread in (self._parse_thread, self._write_thread):
+            if thread is not None:
+                thread.join(timeout)
+        self.raw_buffer.discard_spill()
+        self.write_buffer.discard_spill()
+        # 恢复接收器的原始回调
+        for name, callback in self._callbacks.items():
+            setattr(self.receiver, name, callback)
+        logger.info(f"[{self.receiver.name}] pipeline stopped: {self.stats()}")
+
+    def stats(self) -> dict:
+        return {"raw": self.raw_buffer.stats(), "write": self.write_buffer.stats()}
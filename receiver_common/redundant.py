@@ -0,0 +1,222 @@
+"""
+热备冗余连接: 同一组订阅开多条独立连接，谁先到用谁
+
+每条连接(腿)是一个独立的接收器实例，可以走不同的代理或地址，各自重连。
+所有腿的回调先经过 SequenceArbiter:
+    - 深度消息按交易所序号 (receiver.message_sequence: Lighter nonce/offset、Paradex seq_no) 去重，
+      每个交易对只转发序号比上一条转发的更大的消息，同一条消息的后续回调(逐档 on_update 等)跟随第一次的决定
+    - 成交按 trade_id 去重
+    - 没有序号的消息只转发第一条腿的
+一条腿断线重连或者变慢时，另一条腿的数据继续无缝转发；重连后的快照和落后的消息序号不大于已转发的，直接丢弃。
+
+深度数据需要序号连续时，Lighter 打开 keep_book、Paradex 使用 deltas 模式:
+腿内部发现缺口会丢弃并重新同步，不会把跳号的消息交给仲裁。
+
+使用示例:
+    receiver = RedundantReceiver(
+        LighterDepthReceiver,
+        copies=2,
+        proxies=[None, "http://127.0.0.1:7890"],
+        market_ids=[0, 48],
+        keep_book=True,
+    )
+    receiver.on_updates_batch = writer.write_batch
+    receiver.start()
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from .base_receiver import BaseWSReceiver, DATA_CALLBACK_NAMES
+from .dedup import DEFAULT_TRADE_WINDOW, TradeDeduplicator
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceArbiter:
+    """多条腿的数据去重，调用方需要持有锁 (RedundantReceiver 串行调用)"""
+
+    def __init__(self, copies: int, trade_window: int = DEFAULT_TRADE_WINDOW):
+        self.forwarded = 0
+        self.duplicates = 0
+        self.wins = [0] * copies  # 每条腿先到的消息数
+        self._last: Dict[str, Tuple[int, int]] = {}  # symbol -> (最后转发的序号, 腿)
+        self._trades = TradeDeduplicator(trade_window)
+
+    def accept(self, leg: int, symbol: str, sequence: Optional[int]) -> bool:
+        """深度消息: 是否转发"""
+        if sequence is None:
+            accepted = leg == 0
+        else:
+            last = self._last.get(symbol)
+            if last is None or sequence > last[0]:
+                self._last[symbol] = (sequence, leg)
+                self.wins[leg] += 1
+                accepted = True
+            else:
+                # 同一条消息的其他回调跟随第一次的决定
+                accepted = sequence == last[0] and leg == last[1]
+        if accepted:
+            self.forwarded += 1
+        else:
+            self.duplicates += 1
+        return accepted
+
+    def accept_trade(self, leg: int, symbol: str, trade_id) -> bool:
+        if trade_id is None or trade_id == "":
+            # 没有 id 的成交和没有序号的深度消息一样，只转发第一条腿的
+            accepted = leg == 0
+        else:
+            accepted = self._trades.is_new(symbol, trade_id)
+        if accepted:
+            self.forwarded += 1
+            self.wins[leg] += 1
+            return True
+        self.duplicates += 1
+        return False
+
+    def stats(self) -> dict:
+        return {"forwarded": self.forwarded, "duplicates": self.duplicates, "wins": list(self.wins)}
+
+
+def _trade_id(trade):
+    """Lighter LighterTrade.trade_id / Paradex TardisTrade.id"""
+    trade_id = getattr(trade, "trade_id", None)
+    return trade_id if trade_id is not None else trade.id
+
+
+class RedundantReceiver:
+    """冗余连接接收器，对外接口与单连接接收器一致(start/stop/回调)"""
+
+    def __init__(
+        self,
+        receiver_cls: Type[BaseWSReceiver],
+        copies: int = 2,
+        ws_urls: Optional[List[str]] = None,
+        proxies: Optional[List[Optional[str]]] = None,
+        **receiver_kwargs,
+    ):
+        """
+        Args:
+            receiver_cls: 接收器类，如 LighterDepthReceiver、ParadexTradesReceiver
+            copies: 连接数
+            ws_urls: 每条连接的地址，为空时使用接收器默认地址 (receiver_kwargs 中的 ws_url)
+            proxies: 每条连接的代理，None 表示直连
+        """
+        if copies < 1:
+            raise ValueError("copies must be at least 1")
+        self.receiver_cls = receiver_cls
+        self.copies = copies
+        self.ws_urls = ws_urls or []
+        self.proxies = proxies or []
+        self.receiver_kwargs = receiver_kwargs
+        self.arbiter = SequenceArbiter(copies)
+
+        self._running = False
+        self._lock = threading.Lock()
+        self._legs: List[BaseWSReceiver] = []
+        self._threads: List[threading.Thread] = []
+        self._capture = None
+
+        # 回调函数 (合并所有连接)
+        self.on_snapshot: Optional[Callable] = None
+        self.on_update: Optional[Callable] = None
+        self.on_updates_batch: Optional[Callable] = None
+        self.on_trade: Optional[Callable] = None
+        self.on_book: Optional[Callable] = None
+        self.on_error: Optional[Callable[[Exception], None]] = None
+
+    @property
+    def name(self) -> str:
+        return f"Redundant{self.receiver_cls.__name__}"
+
+    @property
+    def legs(self) -> List[BaseWSReceiver]:
+        return list(self._legs)
+
+    def set_capture(self, capture):
+        """录制第一条连接收到的原始帧 (其余连接是重复数据)"""
+        self._capture = capture
+
+    def _forward(self, name: str, leg_index: int, leg: BaseWSReceiver) -> Callable:
+        """包装一条腿的数据回调: 去重后串行调用合并的回调"""
+        arbiter = self.arbiter
+        if name == "on_trade":
+            def callback(item):
+                with self._lock:
+                    if arbiter.accept_trade(leg_index, item.symbol, _trade_id(item)):
+                        self.on_trade(item)
+        else:
+            def callback(item):
+                with self._lock:
+                    if arbiter.accept(leg_index, item.symbol, leg.message_sequence):
+                        getattr(self, name)(item)
+        return callback
+
+    def _forward_book(self, leg_index: int, leg: BaseWSReceiver) -> Callable:
+        def callback(key, book):
+            with self._lock:
+                if self.arbiter.accept(leg_index, book.symbol, leg.message_sequence):
+                    self.on_book(key, book)
+        return callback
+
+    def _on_leg_error(self, leg_index: int) -> Callable:
+        def callback(error):
+            if self.on_error:
+                self.on_error(RuntimeError(f"leg {leg_index}: {error}"))
+        return callback
+
+    def _create_leg(self, index: int) -> BaseWSReceiver:
+        kwargs = dict(self.receiver_kwargs)
+        if index < len(self.ws_urls) and self.ws_urls[index]:
+            kwargs["ws_url"] = self.ws_urls[index]
+        leg = self.receiver_cls(**kwargs)
+        leg.proxy = self.proxies[index] if index < len(self.proxies) else None
+        for name in DATA_CALLBACK_NAMES:
+            if getattr(self, name) is not None:
+                setattr(leg, name, self._forward(name, index, leg))
+        if self.on_book is not None:
+            leg.on_book = self._forward_book(index, leg)
+        leg.on_error = self._on_leg_error(index)
+        if index == 0:
+            leg.set_capture(self._capture)
+        return leg
+
+    def subscribe(self, *args) -> bool:
+        """运行中在每条连接上订阅 (参数同单连接接收器的 subscribe)"""
+        return any([leg.subscribe(*args) for leg in self.legs])
+
+    def unsubscribe(self, *args) -> bool:
+        """运行中在每条连接上退订"""
+        return any([leg.unsubscribe(*args) for leg in self.legs])
+
+    def subscriptions(self):
+        legs = self.legs
+        return legs[0].subscriptions() if legs else []
+
+    def start(self):
+        """启动所有连接 (阻塞)"""
+        self._running = True
+        for index in range(self.copies):
+            leg = self._create_leg(index)
+            logger.info(f"Starting {self.name} leg {index}: {leg.ws_url} proxy={leg.proxy or 'none'}")
+            thread = threading.Thread(target=leg.start, name=f"redundant-leg-{index}", daemon=True)
+            self._legs.append(leg)
+            self._threads.append(thread)
+            thread.start()
+        while self._running and any(t.is_alive() for t in self._threads):
+            for thread in self._threads:
+                thread.join(timeout=0.5)
+
+    def stop(self):
+        """停止所有连接"""
+        self._running = False
+        for leg in self._legs:
+            leg.stop()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        logger.info(f"{self.name} stopped: {self.stats()}")
+
+    def stats(self) -> dict:
+        return self.arbiter.stats()
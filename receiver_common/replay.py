@@ -0,0 +1,170 @@
+"""
+回放录制的原始帧 (录制见 receiver_common.capture)
+
+把帧按录制顺序交给接收器的消息处理(与 WebSocket 收到消息时的路径相同，设置了流水线时经过流水线)，
+本地接收时间戳使用录制时的时间，同一个录制文件每次回放的输出完全一致，可用于:
+    - 解析/写盘吞吐基准 (--speed 0 尽快回放)
+    - 按录制速度或 N 倍速复现线上行为 (--speed 1 / --speed N)
+    - 修改解析或转换代码后对比输出文件做回归检查
+
+用法:
+    python receiver_common/replay.py capture/lighter_depth.wscap --receiver lighter-depth --markets 0,48
+    python receiver_common/replay.py capture/lighter_depth.wscap --receiver lighter-depth -o ./replay_out --no-compress
+    python receiver_common/replay.py capture/paradex_depth.wscap --receiver paradex-depth --speed 10
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from receiver_common.base_receiver import BaseWSReceiver
+from receiver_common.capture import read_frames
+from receiver_common.pipeline import FramePipeline
+from receiver_common.ring_buffer import POLICY_BLOCK
+from receiver_common.writer import FORMAT_PARQUET, add_writer_arguments, get_parquet_options, get_writer_options
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RECEIVERS = ("lighter-depth", "lighter-trades", "paradex-depth", "paradex-trades")
+
+
+def replay(receiver: BaseWSReceiver, path: str, speed: float = 0.0, limit: int = 0) -> dict:
+    """把录制的帧交给 receiver 处理
+
+    speed: 0 表示尽快回放，1 表示按录制时的间隔，N 表示 N 倍速
+    limit: 最多回放的帧数，0 表示全部
+    """
+    sent = [0]
+
+    def send(message: str):
+        # 回放时 pong 等回复不需要真正发送
+        sent[0] += 1
+
+    frames = total_bytes = 0
+    first_ts_ns = None
+    start = time.perf_counter()
+    for recv_ts_ns, message in read_frames(path):
+        if speed > 0:
+            if first_ts_ns is None:
+                first_ts_ns = recv_ts_ns
+            delay = (recv_ts_ns - first_ts_ns) / 1e9 / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        recv_ts_us = recv_ts_ns // 1000
+        pipeline = receiver._pipeline
+        if pipeline is not None:
+            if not receiver._handle_control_message(message, send):
+                pipeline.push(message, send, recv_ts_us)
+        else:
+            receiver._process_message(message, send, recv_ts_us)
+
+        frames += 1
+        total_bytes += len(message)
+        if limit and frames >= limit:
+            break
+
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "bytes": total_bytes,
+        "sent": sent[0],
+        "elapsed": elapsed,
+        "frames_per_sec": frames / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def _build_receiver(args):
+    """按 --receiver 创建接收器和对应的写入器(未指定输出目录时为 None)"""
+    compress = not args.no_compress
+    use_parquet = args.format == FORMAT_PARQUET
+    writer = None
+
+    if args.receiver.startswith("lighter"):
+        from lighter_receiver import LighterDepthReceiver, LighterTradesReceiver
+        from lighter_receiver.main import MARKET_SYMBOL_MAP, DailyCSVWriter, DailyParquetL2Writer
+        from lighter_receiver.main_trades import DailyTradesCSVWriter, DailyTradesParquetWriter
+
+        market_ids = [int(x.strip()) for x in args.markets.split(",")]
+        market_symbol_map = {mid: MARKET_SYMBOL_MAP.get(mid, f"MARKET_{mid}") for mid in market_ids}
+        if args.receiver == "lighter-depth":
+            receiver = LighterDepthReceiver(market_ids=market_ids, market_symbol_map=market_symbol_map)
+            writer_cls, parquet_cls, method = DailyCSVWriter, DailyParquetL2Writer, "write_batch"
+            callback = "on_updates_batch"
+        else:
+            receiver = LighterTradesReceiver(market_ids=market_ids, market_symbol_map=market_symbol_map)
+            writer_cls, parquet_cls, method = DailyTradesCSVWriter, DailyTradesParquetWriter, "write"
+            callback = "on_trade"
+        exchange = "lighter"
+    else:
+        from paradex_receiver import ParadexDepthReceiver, ParadexTradesReceiver
+        from paradex_receiver.main import DailyCSVWriter, DailyParquetSnapshotWriter
+        from paradex_receiver.trades_main import DailyTradesCSVWriter, DailyTradesParquetWriter
+
+        symbols = [x.strip() for x in args.symbols.split(",") if x.strip()]
+        if args.receiver == "paradex-depth":
+            receiver = ParadexDepthReceiver(symbols=symbols, bearer_token="")
+            writer_cls, parquet_cls, method = DailyCSVWriter, DailyParquetSnapshotWriter, "write_snapshot"
+            callback = "on_snapshot"
+        else:
+            receiver = ParadexTradesReceiver(symbols=symbols, bearer_token="")
+            writer_cls, parquet_cls, method = DailyTradesCSVWriter, DailyTradesParquetWriter, "write_trade"
+            callback = "on_trade"
+        exchange = "paradex"
+
+    if args.output_dir:
+        if use_parquet:
+            writer = parquet_cls(output_dir=args.output_dir, exchange=exchange, **get_parquet_options(args))
+        else:
+            writer = writer_cls(output_dir=args.output_dir, exchange=exchange, compress=compress, **get_writer_options(args))
+        setattr(receiver, callback, getattr(writer, method))
+    return receiver, callback, writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放录制的 WebSocket 原始帧")
+    parser.add_argument("capture", type=str, help="录制文件路径")
+    parser.add_argument("--receiver", type=str, required=True, choices=RECEIVERS, help="处理帧的接收器")
+    parser.add_argument("-m", "--markets", type=str, default="0", help="Lighter 市场ID，逗号分隔，用于 symbol 映射 (默认: 0)")
+    parser.add_argument("-s", "--symbols", type=str, default="PAXG-USD-PERP", help="Paradex 交易对，逗号分隔 (默认: PAXG-USD-PERP)")
+    parser.add_argument("--speed", type=float, default=0.0, help="回放速度，0 为尽快回放，1 为录制速度 (默认: 0)")
+    parser.add_argument("--limit", type=int, default=0, help="最多回放的帧数，0 表示全部 (默认: 0)")
+    parser.add_argument("-o", "--output-dir", type=str, default="", help="输出目录，不指定时只统计回调数据量")
+    parser.add_argument("--no-compress", action="store_true", help="不压缩CSV文件")
+    parser.add_argument("--buffer-size", type=int, default=0, help="经过接收/解析/写盘流水线回放，0 表示直接处理 (默认: 0)")
+    add_writer_arguments(parser)
+    args = parser.parse_args()
+
+    receiver, callback, writer = _build_receiver(args)
+    items = [0]
+    if writer is None:
+        def count(item):
+            items[0] += len(item) if callback == "on_updates_batch" else 1
+        setattr(receiver, callback, count)
+
+    pipeline = None
+    if args.buffer_size > 0:
+        pipeline = FramePipeline(receiver, capacity=args.buffer_size, policy=POLICY_BLOCK)
+        pipeline.start()
+
+    start = time.perf_counter()
+    stats = replay(receiver, args.capture, speed=args.speed, limit=args.limit)
+    if pipeline:
+        pipeline.stop()
+    if writer is not None:
+        writer.close_all()
+        items[0] = writer.get_total_count()
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        f"Replayed {stats['frames']} frames ({stats['bytes'] / 1e6:.1f} MB), {stats['sent']} replies, "
+        f"{items[0]} records in {elapsed:.2f}s: {stats['frames'] / elapsed:.0f} frames/s, {items[0] / elapsed:.0f} records/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
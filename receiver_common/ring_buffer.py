@@ -0,0 +1,186 @@
+"""
+有界环形缓冲区，带背压策略和计数器
+
+生产者(WebSocket 线程)和消费者(解析/写盘线程)之间的单向队列。
+deque 的 append/popleft 本身是原子的，只有在队列空(消费者等待)或满(block 策略)时才需要加锁等待。
+
+背压策略(队列满时):
+    block        生产者等待，直到消费者腾出空间
+    drop_oldest  丢弃最早的一条，计入 dropped
+    spill        溢出写到磁盘文件，消费者读完内存中的数据后再按顺序读回，不丢数据
+"""
+
+import collections
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+POLICY_BLOCK = "block"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_SPILL = "spill"
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_SPILL)
+
+
+class RingBuffer:
+    """有界 FIFO 缓冲区"""
+
+    def __init__(self, capacity: int, policy: str = POLICY_BLOCK, spill_dir: Optional[str] = None, name: str = "ring"):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.spill_dir = spill_dir or tempfile.gettempdir()
+        self.name = name
+
+        self._items = collections.deque()
+        self._not_empty = threading.Condition(threading.Lock())
+        self._not_full = threading.Condition(threading.Lock())
+        self._closed = False
+
+        # 溢出文件: 写入端追加，读取端按偏移顺序读回
+        self._spill_lock = threading.Lock()
+        self._spill_path: Optional[str] = None
+        self._spill_writer = None
+        self._spill_reader = None
+        self._spill_pending = 0
+
+        # 计数器
+        self.put_count = 0
+        self.get_count = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._items) + self._spill_pending
+
+    def put(self, item: Any):
+        """放入一条数据，队列满时按背压策略处理"""
+        self.put_count += 1
+        # 已经有溢出数据时新数据也必须进溢出文件，保证 FIFO
+        if self._spill_pending:
+            self._spill(item)
+            return
+
+        if len(self._items) >= self.capacity:
+            if self.policy == POLICY_DROP_OLDEST:
+                try:
+                    self._items.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass
+            elif self.policy == POLICY_SPILL:
+                self._spill(item)
+                return
+            else:
+                start = time.monotonic()
+                with self._not_full:
+                    while len(self._items) >= self.capacity and not self._closed:
+                        self._not_full.wait(0.1)
+                self.blocked_seconds += time.monotonic() - start
+
+        self._items.append(item)
+        depth = len(self._items)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if depth == 1:
+            with self._not_empty:
+                self._not_empty.notify()
+
+    def get_batch(self, max_items: int = 1000, timeout: float = 0.5) -> List[Any]:
+        """取出最多 max_items 条数据，空队列最多等待 timeout 秒"""
+        batch = []
+        if not self._items and not self._spill_pending:
+            with self._not_empty:
+                if not self._items and not self._spill_pending and not self._closed:
+                    self._not_empty.wait(timeout)
+
+        popleft = self._items.popleft
+        try:
+            while len(batch) < max_items:
+                batch.append(popleft())
+        except IndexError:
+            pass
+
+        # 内存中的数据读完后才读溢出文件，保证顺序
+        if not self._items and self._spill_pending and len(batch) < max_items:
+            batch.extend(self._unspill(max_items - len(batch)))
+
+        if batch:
+            self.get_count += len(batch)
+            if self.policy == POLICY_BLOCK:
+                with self._not_full:
+                    self._not_full.notify()
+        return batch
+
+    def _spill(self, item: Any):
+        with self._spill_lock:
+            if self._spill_writer is None:
+                fd, self._spill_path = tempfile.mkstemp(dir=self.spill_dir, prefix=f".{self.name}_spill_")
+                self._spill_writer = os.fdopen(fd, "wb")
+                self._spill_reader = open(self._spill_path, "rb")
+                logger.warning(f"[{self.name}] buffer full ({self.capacity}), spilling to {self._spill_path}")
+            pickle.dump(item, self._spill_writer, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spill_pending += 1
+            self.spilled += 1
+        if self._spill_pending == 1:
+            with self._not_empty:
+                self._not_empty.notify()
+
+    def _unspill(self, max_items: int) -> List[Any]:
+        items = []
+        with self._spill_lock:
+            self._spill_writer.flush()
+            while self._spill_pending and len(items) < max_items:
+                items.append(pickle.load(self._spill_reader))
+                self._spill_pending -= 1
+            if not self._spill_pending:
+                # 溢出数据已全部读回，删除文件，下次溢出重新创建
+                self._close_spill_file()
+                logger.info(f"[{self.name}] spill drained")
+        return items
+
+    def _close_spill_file(self):
+        for f in (self._spill_writer, self._spill_reader):
+            if f is not None:
+                f.close()
+        if self._spill_path and os.path.exists(self._spill_path):
+            os.remove(self._spill_path)
+        self._spill_writer = None
+        self._spill_reader = None
+        self._spill_path = None
+
+    def close(self):
+        """唤醒所有等待的生产者/消费者"""
+        self._closed = True
+        with self._not_empty:
+            self._not_empty.notify_all()
+        with self._not_full:
+            self._not_full.notify_all()
+
+    def discard_spill(self):
+        """丢弃尚未读回的溢出数据并删除溢出文件"""
+        with self._spill_lock:
+            if self._spill_pending:
+                logger.warning(f"[{self.name}] discarding {self._spill_pending} spilled items")
+            self._spill_pending = 0
+            self._close_spill_file()
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._items),
+            "spill_pending": self._spill_pending,
+            "max_depth": self.max_depth,
+            "put": self.put_count,
+            "get": self.get_count,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "blocked_seconds": round(self.blocked_seconds, 3),
+        }
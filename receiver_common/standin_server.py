@@ -0,0 +1,577 @@
+"""
+本地 WebSocket 替身服务器: 模拟 Lighter /stream 和 Paradex JSON-RPC 行情推送，用于压测接收器
+
+不连主网也能测接收器的最大可持续吞吐和断线重连行为。支持的协议子集:
+
+    lighter   subscribe(order_book/{id}, trade/{id}) -> subscribed/order_book 快照 + update/order_book 增量，
+              update/trade；unsubscribe 停止该频道的推送；应用层 {"type":"ping"}
+    paradex   auth、subscribe(order_book.{symbol}.snapshot@..., order_book.{symbol}.deltas, trades.{symbol})
+              -> method=subscription 推送(deltas 首条为 update_type=s 快照)；unsubscribe；应用层 {"method":"ping"}
+
+流量来源:
+    - 合成数据: 每个订阅按 --rate 条/秒推送(0 表示尽快推送)，消息内容预先生成后循环使用
+    - 回放录制: --replay 指定 receiver_common.capture 录制的文件，收到第一个订阅后按录制速度的
+      --replay-speed 倍推送(0 表示尽快)
+
+故障注入:
+    --disconnect-every N   每个连接 N 秒后由服务器关闭
+    --stall-every N --stall-duration M   每 N 秒停止推送 M 秒(包括应用层 ping)，触发接收器的无消息超时
+    --drop-ratio P         合成数据按概率 P 丢弃消息(序号照常递增)，模拟丢包触发接收器的缺口检测
+
+用法:
+    python receiver_common/standin_server.py --protocol lighter --port 8765 --rate 2000
+    python lighter_receiver/main.py -m 0,1 --ws-url ws://127.0.0.1:8765/stream
+
+    python receiver_common/standin_server.py --protocol paradex --port 8766 --rate 20 --disconnect-every 30
+    python paradex_receiver/trades_main.py --ws-url ws://127.0.0.1:8766/v1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from receiver_common.capture import read_frames
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_LIGHTER = "lighter"
+PROTOCOL_PARADEX = "paradex"
+PROTOCOLS = (PROTOCOL_LIGHTER, PROTOCOL_PARADEX)
+
+# 预先生成的消息体数量，循环使用
+POOL_SIZE = 256
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class _SyntheticStream:
+    """一个订阅的合成消息流"""
+
+    def __init__(self, rng: random.Random, levels: int):
+        self.rng = rng
+        self.levels = levels
+        self.seq = 0
+        self.mid = rng.uniform(100, 5000)
+
+    def _levels(self, count: int, side: int, allow_delete: bool) -> List[dict]:
+        rng = self.rng
+        levels = []
+        for k in range(count):
+            size = "0.0000" if allow_delete and rng.random() < 0.1 else f"{rng.uniform(0.01, 50):.4f}"
+            levels.append({"price": f"{self.mid + side * (k + 1) * 0.01:.2f}", "size": size})
+        return levels
+
+    def first_messages(self) -> List[str]:
+        """订阅成功后立即发送的消息(如快照)"""
+        return []
+
+    def next_message(self) -> str:
+        raise NotImplementedError
+
+
+class _LighterBookStream(_SyntheticStream):
+    def __init__(self, rng: random.Random, levels: int, snapshot_levels: int, market_id: int):
+        super().__init__(rng, levels)
+        self.market_id = market_id
+        self.snapshot_levels = snapshot_levels
+        self.pool = [
+            (json.dumps(self._levels(levels, 1, True)), json.dumps(self._levels(levels, -1, True)))
+            for _ in range(POOL_SIZE)
+        ]
+
+    def _message(self, msg_type: str, asks: str, bids: str) -> str:
+        self.seq += 1
+        offset = self.seq
+        return (
+            f'{{"type":"{msg_type}","channel":"order_book:{self.market_id}","offset":{offset},'
+            f'"order_book":{{"code":0,"asks":{asks},"bids":{bids},"offset":{offset}}},"timestamp":{_now_ms()}}}'
+        )
+
+    def first_messages(self) -> List[str]:
+        asks = json.dumps(self._levels(self.snapshot_levels, 1, False))
+        bids = json.dumps(self._levels(self.snapshot_levels, -1, False))
+        return [self._message("subscribed/order_book", asks, bids)]
+
+    def next_message(self) -> str:
+        asks, bids = self.pool[self.seq % POOL_SIZE]
+        return self._message("update/order_book", asks, bids)
+
+
+class _LighterTradeStream(_SyntheticStream):
+    def __init__(self, rng: random.Random, levels: int, market_id: int):
+        super().__init__(rng, levels)
+        self.market_id = market_id
+        self.pool = [
+            (f"{self.mid + rng.uniform(-1, 1):.2f}", f"{rng.uniform(0.01, 5):.4f}", "true" if rng.random() < 0.5 else "false")
+            for _ in range(POOL_SIZE)
+        ]
+
+    def first_messages(self) -> List[str]:
+        return [f'{{"type":"subscribed/trade","channel":"trade:{self.market_id}","trades":[]}}']
+
+    def next_message(self) -> str:
+        self.seq += 1
+        price, size, is_maker_ask = self.pool[self.seq % POOL_SIZE]
+        return (
+            f'{{"type":"update/trade","channel":"trade:{self.market_id}","trades":[{{"trade_id":{self.seq},'
+            f'"market_id":{self.market_id},"price":"{price}","size":"{size}","is_maker_ask":{is_maker_ask},'
+            f'"timestamp":{_now_ms()}}}]}}'
+        )
+
+
+class _ParadexBookStream(_SyntheticStream):
+    def __init__(self, rng: random.Random, levels: int, channel: str, symbol: str):
+        super().__init__(rng, levels)
+        self.channel = channel
+        self.symbol = symbol
+        pool = []
+        for _ in range(POOL_SIZE):
+            inserts = [dict(level, side="SELL") for level in self._levels(levels, 1, False)]
+            inserts += [dict(level, side="BUY") for level in self._levels(levels, -1, False)]
+            pool.append(json.dumps(inserts))
+        self.pool = pool
+
+    def next_message(self) -> str:
+        self.seq += 1
+        return (
+            f'{{"jsonrpc":"2.0","method":"subscription","params":{{"channel":"{self.channel}","data":{{'
+            f'"market":"{self.symbol}","seq_no":{self.seq},"last_updated_at":{_now_ms()},"update_type":"s",'
+            f'"inserts":{self.pool[self.seq % POOL_SIZE]},"updates":[],"deletes":[]}}}}}}'
+        )
+
+
+class _ParadexDeltaStream(_SyntheticStream):
+    """order_book.{symbol}.deltas: 首条快照，之后每条消息随机新增/修改/删除几个档位"""
+
+    def __init__(self, rng: random.Random, levels: int, snapshot_levels: int, channel: str, symbol: str):
+        super().__init__(rng, levels)
+        self.channel = channel
+        self.symbol = symbol
+        self.snapshot_levels = snapshot_levels
+        self.tick = 0.01
+        self.book = {"BUY": set(), "SELL": set()}  # 当前存在的档位(以 tick 为单位的价格偏移)
+
+    def _price(self, side: str, k: int) -> str:
+        return f"{self.mid + (k if side == 'SELL' else -k) * self.tick:.2f}"
+
+    def _message(self, update_type: str, inserts: list, updates: list, deletes: list) -> str:
+        self.seq += 1
+        return (
+            f'{{"jsonrpc":"2.0","method":"subscription","params":{{"channel":"{self.channel}","data":{{'
+            f'"market":"{self.symbol}","seq_no":{self.seq},"last_updated_at":{_now_ms()},"update_type":"{update_type}",'
+            f'"inserts":{json.dumps(inserts)},"updates":{json.dumps(updates)},"deletes":{json.dumps(deletes)}}}}}}}'
+        )
+
+    def first_messages(self) -> List[str]:
+        inserts = []
+        for side in ("BUY", "SELL"):
+            for k in range(1, self.snapshot_levels + 1):
+                self.book[side].add(k)
+                inserts.append({"side": side, "price": self._price(side, k), "size": f"{self.rng.uniform(0.01, 50):.4f}"})
+        return [self._message("s", inserts, [], [])]
+
+    def next_message(self) -> str:
+        rng = self.rng
+        inserts, updates, deletes = [], [], []
+        for _ in range(max(1, self.levels // 2)):
+            side = "BUY" if rng.random() < 0.5 else "SELL"
+            k = rng.randint(1, self.snapshot_levels + 5)
+            level = {"side": side, "price": self._price(side, k), "size": f"{rng.uniform(0.01, 50):.4f}"}
+            if k not in self.book[side]:
+                self.book[side].add(k)
+                inserts.append(level)
+            elif rng.random() < 0.2 and len(self.book[side]) > 1:
+                self.book[side].discard(k)
+                level["size"] = "0"
+                deletes.append(level)
+            else:
+                updates.append(level)
+        return self._message("d", inserts, updates, deletes)
+
+
+class _ParadexTradeStream(_SyntheticStream):
+    def __init__(self, rng: random.Random, levels: int, channel: str, symbol: str):
+        super().__init__(rng, levels)
+        self.channel = channel
+        self.symbol = symbol
+        self.pool = [
+            (f"{self.mid + rng.uniform(-1, 1):.2f}", f"{rng.uniform(0.01, 5):.4f}", "BUY" if rng.random() < 0.5 else "SELL")
+            for _ in range(POOL_SIZE)
+        ]
+
+    def next_message(self) -> str:
+        self.seq += 1
+        price, size, side = self.pool[self.seq % POOL_SIZE]
+        return (
+            f'{{"jsonrpc":"2.0","method":"subscription","params":{{"channel":"{self.channel}","data":{{'
+            f'"id":"{self.seq}","market":"{self.symbol}","side":"{side}","size":"{size}","price":"{price}",'
+            f'"created_at":{_now_ms()},"trade_type":"FILL"}}}}}}'
+        )
+
+
+class _Connection:
+    """一个客户端连接的状态"""
+
+    def __init__(self, ws, conn_id: int):
+        self.ws = ws
+        self.conn_id = conn_id
+        self.tasks: List[asyncio.Task] = []
+        self.streams: Dict[str, asyncio.Task] = {}  # 频道 -> 合成数据推送任务
+        self.stalled_until = 0.0
+        self.replaying = False
+
+    def spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self.tasks.append(task)
+        return task
+
+    def unsubscribe(self, channel: str) -> bool:
+        task = self.streams.pop(channel, None)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+
+class StandInServer:
+    """Lighter / Paradex 行情推送替身服务器"""
+
+    def __init__(
+        self,
+        protocol: str = PROTOCOL_LIGHTER,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        rate: float = 100.0,
+        levels: int = 10,
+        snapshot_levels: int = 100,
+        replay_path: Optional[str] = None,
+        replay_speed: float = 0.0,
+        disconnect_every: float = 0.0,
+        stall_every: float = 0.0,
+        stall_duration: float = 0.0,
+        drop_ratio: float = 0.0,
+        ping_interval: float = 0.0,
+        stats_interval: float = 10.0,
+        seed: int = 7,
+    ):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol: {protocol}, expected one of {PROTOCOLS}")
+        self.protocol = protocol
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.levels = levels
+        self.snapshot_levels = snapshot_levels
+        self.replay_path = replay_path
+        self.replay_speed = replay_speed
+        self.disconnect_every = disconnect_every
+        self.stall_every = stall_every
+        self.stall_duration = stall_duration
+        self.drop_ratio = drop_ratio
+        self.ping_interval = ping_interval
+        self.stats_interval = stats_interval
+        self.rng = random.Random(seed)
+
+        self.connections = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.disconnects = 0
+        self.stalls = 0
+        self.dropped = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        path = "/stream" if self.protocol == PROTOCOL_LIGHTER else "/v1"
+        return f"ws://{self.host}:{self.port}{path}"
+
+    # ===== 发送 =====
+    async def _send(self, conn: _Connection, message: str):
+        await conn.ws.send(message)
+        self.messages_sent += 1
+        self.bytes_sent += len(message)
+
+    async def _wait_not_stalled(self, conn: _Connection):
+        delay = conn.stalled_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _run_stream(self, conn: _Connection, stream: _SyntheticStream):
+        """按 rate 推送一个订阅的消息，rate<=0 时尽快推送"""
+        for message in stream.first_messages():
+            await self._send(conn, message)
+        rate = self.rate
+        start = time.monotonic()
+        sent = 0
+        while True:
+            if conn.stalled_until > time.monotonic():
+                await self._wait_not_stalled(conn)
+                # 停顿结束后不补发停顿期间的消息
+                start = time.monotonic()
+                sent = 0
+            if rate > 0:
+                due = int((time.monotonic() - start) * rate) - sent
+                if due <= 0:
+                    await asyncio.sleep(max(0.001, (sent + 1) / rate - (time.monotonic() - start)))
+                    continue
+            else:
+                due = 100
+            drop_ratio = self.drop_ratio
+            for _ in range(due):
+                message = stream.next_message()
+                if drop_ratio > 0 and self.rng.random() < drop_ratio:
+                    self.dropped += 1
+                    continue
+                await self._send(conn, message)
+            sent += due
+            if rate <= 0:
+                await asyncio.sleep(0)
+
+    async def _run_replay(self, conn: _Connection):
+        """推送录制的帧，replay_speed<=0 时尽快推送"""
+        speed = self.replay_speed
+        first_ts_ns = None
+        start = time.monotonic()
+        count = 0
+        for recv_ts_ns, message in read_frames(self.replay_path):
+            await self._wait_not_stalled(conn)
+            if speed > 0:
+                if first_ts_ns is None:
+                    first_ts_ns = recv_ts_ns
+                delay = (recv_ts_ns - first_ts_ns) / 1e9 / speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self._send(conn, message)
+            count += 1
+            if speed <= 0 and count % 100 == 0:
+                await asyncio.sleep(0)
+        logger.info(f"[conn {conn.conn_id}] Replay finished: {count} frames")
+
+    async def _run_faults(self, conn: _Connection):
+        """故障注入: 定时停顿推送、定时断开连接"""
+        started = time.monotonic()
+        next_stall = started + self.stall_every if self.stall_every > 0 and self.stall_duration > 0 else None
+        disconnect_at = started + self.disconnect_every if self.disconnect_every > 0 else None
+        while next_stall or disconnect_at:
+            wake = min(t for t in (next_stall, disconnect_at) if t)
+            await asyncio.sleep(max(0.0, wake - time.monotonic()))
+            now = time.monotonic()
+            if disconnect_at and now >= disconnect_at:
+                self.disconnects += 1
+                logger.info(f"[conn {conn.conn_id}] Injecting disconnect")
+                await conn.ws.close(code=1012, reason="stand-in disconnect")
+                return
+            if next_stall and now >= next_stall:
+                self.stalls += 1
+                conn.stalled_until = now + self.stall_duration
+                logger.info(f"[conn {conn.conn_id}] Injecting {self.stall_duration}s stall")
+                next_stall = now + self.stall_every
+
+    async def _run_pings(self, conn: _Connection, ping: str):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await self._wait_not_stalled(conn)
+            await self._send(conn, ping)
+
+    def _start_replay_once(self, conn: _Connection):
+        if not conn.replaying:
+            conn.replaying = True
+            conn.spawn(self._run_replay(conn))
+
+    # ===== 协议 =====
+    async def _on_lighter_message(self, conn: _Connection, data: dict):
+        msg_type = data.get("type")
+        if msg_type == "subscribe":
+            channel = data.get("channel", "")
+            kind, _, market = channel.partition("/")
+            if kind not in ("order_book", "trade") or not market.isdigit():
+                await self._send(conn, json.dumps({"type": "error", "error": {"code": 30005, "message": f"Invalid channel: {channel}"}}))
+                return
+            if self.replay_path:
+                self._start_replay_once(conn)
+                return
+            if kind == "order_book":
+                stream = _LighterBookStream(self.rng, self.levels, self.snapshot_levels, int(market))
+            else:
+                stream = _LighterTradeStream(self.rng, self.levels, int(market))
+            # 重复订阅同一频道时替换原来的推送，重新发送快照
+            conn.unsubscribe(channel)
+            conn.streams[channel] = conn.spawn(self._run_stream(conn, stream))
+        elif msg_type == "unsubscribe":
+            channel = data.get("channel", "")
+            if conn.unsubscribe(channel):
+                logger.info(f"[conn {conn.conn_id}] Unsubscribed {channel}")
+        elif msg_type == "ping":
+            await self._send(conn, '{"type":"pong"}')
+
+    async def _on_paradex_message(self, conn: _Connection, data: dict):
+        method = data.get("method")
+        request_id = data.get("id")
+        if method == "auth":
+            await self._send(conn, json.dumps({"jsonrpc": "2.0", "result": {}, "id": request_id}))
+        elif method == "subscribe":
+            channel = data.get("params", {}).get("channel", "")
+            kind, _, rest = channel.partition(".")
+            symbol = rest.split(".", 1)[0]
+            if kind not in ("order_book", "trades") or not symbol:
+                await self._send(conn, json.dumps({"jsonrpc": "2.0", "error": {"code": -32602, "message": f"Invalid channel: {channel}"}, "id": request_id}))
+                return
+            await self._send(conn, json.dumps({"jsonrpc": "2.0", "result": {"channel": channel}, "id": request_id}))
+            if self.replay_path:
+                self._start_replay_once(conn)
+                return
+            if kind == "trades":
+                stream = _ParadexTradeStream(self.rng, self.levels, channel, symbol)
+            elif channel.endswith(".deltas"):
+                stream = _ParadexDeltaStream(self.rng, self.levels, self.snapshot_levels, channel, symbol)
+            else:
+                stream = _ParadexBookStream(self.rng, min(self.levels, 15), channel, symbol)
+            # 重复订阅同一频道时替换原来的推送
+            conn.unsubscribe(channel)
+            conn.streams[channel] = conn.spawn(self._run_stream(conn, stream))
+        elif method == "unsubscribe":
+            channel = data.get("params", {}).get("channel", "")
+            if conn.unsubscribe(channel):
+                logger.info(f"[conn {conn.conn_id}] Unsubscribed {channel}")
+            await self._send(conn, json.dumps({"jsonrpc": "2.0", "result": {"channel": channel}, "id": request_id}))
+        elif method == "ping":
+            await self._send(conn, json.dumps({"jsonrpc": "2.0", "method": "pong", "id": request_id}))
+
+    async def _handle(self, ws, path: Optional[str] = None):
+        self.connections += 1
+        conn = _Connection(ws, self.connections)
+        logger.info(f"[conn {conn.conn_id}] Client connected")
+        if self.protocol == PROTOCOL_LIGHTER:
+            on_message: Callable = self._on_lighter_message
+            ping = '{"type":"ping"}'
+        else:
+            on_message = self._on_paradex_message
+            ping = '{"jsonrpc":"2.0","method":"ping","id":1}'
+        conn.spawn(self._run_faults(conn))
+        if self.ping_interval > 0:
+            conn.spawn(self._run_pings(conn, ping))
+        try:
+            async for message in ws:
+                try:
+                    data = json.loads(message)
+                except ValueError:
+                    continue
+                await on_message(conn, data)
+        except Exception as e:
+            logger.debug(f"[conn {conn.conn_id}] Connection error: {e}")
+        finally:
+            for task in conn.tasks:
+                task.cancel()
+            await asyncio.gather(*conn.tasks, return_exceptions=True)
+            logger.info(f"[conn {conn.conn_id}] Client disconnected")
+
+    # ===== 运行 =====
+    async def _report(self):
+        last_sent, last_time = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            now = time.monotonic()
+            rate = (self.messages_sent - last_sent) / (now - last_time)
+            last_sent, last_time = self.messages_sent, now
+            logger.info(f"Stand-in stats: {self.stats()}, {rate:.0f} msg/s")
+
+    async def serve(self):
+        """运行服务器直到 stop()"""
+        import websockets
+
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handle, self.host, self.port, max_size=None, ping_interval=None):
+            logger.info(f"Stand-in {self.protocol} server listening on {self.url}")
+            self._ready.set()
+            reporter = asyncio.ensure_future(self._report())
+            try:
+                await self._stop.wait()
+            finally:
+                reporter.cancel()
+
+    def run(self):
+        """启动服务器 (阻塞)"""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+
+    def start_in_thread(self, timeout: float = 10.0):
+        """在后台线程中启动服务器，返回时已经开始监听"""
+        self._thread = threading.Thread(target=self.run, name=f"standin-{self.protocol}", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Stand-in server failed to start")
+
+    def stop(self):
+        """停止服务器(可在其他线程调用)"""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(10)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "messages": self.messages_sent,
+            "bytes": self.bytes_sent,
+            "disconnects": self.disconnects,
+            "stalls": self.stalls,
+            "dropped": self.dropped,
+        }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Lighter / Paradex 行情推送替身服务器")
+    parser.add_argument("--protocol", type=str, default=PROTOCOL_LIGHTER, choices=PROTOCOLS, help="模拟的协议 (默认: lighter)")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="监听地址 (默认: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口 (默认: 8765)")
+    parser.add_argument("--rate", type=float, default=100.0, help="每个订阅每秒推送的消息数，0 表示尽快推送 (默认: 100)")
+    parser.add_argument("--levels", type=int, default=10, help="每条深度消息每边的档位数 (默认: 10)")
+    parser.add_argument("--snapshot-levels", type=int, default=100, help="Lighter 订阅快照 / Paradex deltas 快照每边的档位数 (默认: 100)")
+    parser.add_argument("--replay", type=str, default="", help="回放 receiver_common.capture 录制的文件，替代合成数据")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="回放速度倍数，0 表示尽快 (默认: 1)")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="每个连接多少秒后断开，0 表示不断开 (默认: 0)")
+    parser.add_argument("--stall-every", type=float, default=0.0, help="每隔多少秒停顿一次推送，0 表示不停顿 (默认: 0)")
+    parser.add_argument("--stall-duration", type=float, default=0.0, help="每次停顿的秒数 (默认: 0)")
+    parser.add_argument("--drop-ratio", type=float, default=0.0, help="合成数据丢弃消息的概率，模拟丢包 (默认: 0)")
+    parser.add_argument("--ping-interval", type=float, default=0.0, help="应用层 ping 间隔秒数，0 表示不发送 (默认: 0)")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        protocol=args.protocol,
+        host=args.host,
+        port=args.port,
+        rate=args.rate,
+        levels=args.levels,
+        snapshot_levels=args.snapshot_levels,
+        replay_path=args.replay or None,
+        replay_speed=args.replay_speed,
+        disconnect_every=args.disconnect_every,
+        stall_every=args.stall_every,
+        stall_duration=args.stall_duration,
+        drop_ratio=args.drop_ratio,
+        ping_interval=args.ping_interval,
+    )
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+连接存活监控: 一个线程检查进程内所有接收器连接的最后消息时间
+
+每个连接注册时给出超时(默认取接收器的 heartbeat_timeout，深度/成交等频道各自不同，可以小于 1 秒)和关闭函数。
+到期检查放在一个时间轮上(默认每 0.05 秒走一格)，每格只检查这一格里到期的连接:
+    - 超过超时没有收到消息: 调用关闭函数，接收器的重连循环随即重连；
+      关闭可能没有生效(例如还卡在 TCP/TLS 握手，没有可以关闭的 socket)，所以继续监控，每过一个超时周期仍然停滞就再关一次
+    - 否则按最后消息时间重新计算到期时间放回时间轮
+连接数再多也只有一个线程，超时后最迟一格时间内被发现；连接断开时 unwatch，不会遗留线程。
+
+命令行的 --stall-timeout (add_stall_arguments) 设置各频道的超时，如 --stall-timeout 0.5。
+
+使用示例:
+    handle = get_supervisor().watch(receiver, ws.close)
+    ...
+    get_supervisor().unwatch(handle)
+"""
+
+import argparse
+import logging
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Watch:
+    __slots__ = ("receiver", "close", "timeout", "rounds", "active", "stalled")
+
+    def __init__(self, receiver, close: Callable[[], None], timeout: float):
+        self.receiver = receiver
+        self.close = close
+        self.timeout = timeout
+        self.rounds = 0  # 还要转几圈才到期
+        self.active = True
+        self.stalled = False  # 因超时被关闭
+
+
+class ConnectionSupervisor:
+    """时间轮实现的连接存活检查"""
+
+    def __init__(self, tick: float = 0.05, wheel_size: int = 1024):
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.stalls = 0
+
+        self._slots: List[List[_Watch]] = [[] for _ in range(wheel_size)]
+        self._position = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, receiver, close: Callable[[], None], timeout: Optional[float] = None) -> _Watch:
+        """开始监控一个连接，receiver._last_message_time 超过 timeout 秒未更新时调用 close()"""
+        entry = _Watch(receiver, close, timeout if timeout is not None else receiver.heartbeat_timeout)
+        with self._lock:
+            self._schedule(entry, entry.timeout)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="connection-supervisor", daemon=True)
+                self._thread.start()
+        return entry
+
+    def unwatch(self, entry: _Watch):
+        """停止监控 (连接已断开)，条目在时间轮上到期时丢弃"""
+        entry.active = False
+
+    def _schedule(self, entry: _Watch, delay: float):
+        """delay 秒后检查 (持有锁时调用)"""
+        ticks = max(1, math.ceil(delay / self.tick))
+        entry.rounds = (ticks - 1) // self.wheel_size
+        self._slots[(self._position + ticks) % self.wheel_size].append(entry)
+
+    def _advance(self) -> List[_Watch]:
+        """走一格，返回这一格里到期的条目"""
+        with self._lock:
+            self._position = (self._position + 1) % self.wheel_size
+            slot = self._slots[self._position]
+            due = [entry for entry in slot if entry.active and entry.rounds == 0]
+            waiting = [entry for entry in slot if entry.active and entry.rounds > 0]
+            for entry in waiting:
+                entry.rounds -= 1
+            self._slots[self._position] = waiting
+        return due
+
+    def _check(self, entry: _Watch):
+        elapsed = time.time() - entry.receiver._last_message_time
+        if elapsed < entry.timeout:
+            with self._lock:
+                if entry.active:
+                    self._schedule(entry, entry.timeout - elapsed)
+            return
+        if entry.stalled:
+            logger.debug(f"[{entry.receiver.name}] Connection still stalled {elapsed:.1f}s after close, closing again...")
+        else:
+            entry.stalled = True
+            self.stalls += 1
+            logger.warning(
+                f"[{entry.receiver.name}] No message received for {elapsed:.1f}s (timeout: {entry.timeout}s), closing connection..."
+            )
+        try:
+            entry.close()
+        except Exception as e:
+            logger.error(f"[{entry.receiver.name}] Failed to close stalled connection: {e}")
+        # 连接真正断开时重连循环会 unwatch，在那之前继续检查
+        with self._lock:
+            if entry.active:
+                self._schedule(entry, entry.timeout)
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.tick
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            for entry in self._advance():
+                self._check(entry)
+
+
+def add_stall_arguments(parser: argparse.ArgumentParser, channels=("",)):
+    """添加无消息超时参数，channels 为频道名时参数为 --{channel}-stall-timeout"""
+    for channel in channels:
+        option = f"--{channel}-stall-timeout" if channel else "--stall-timeout"
+        parser.add_argument(option, type=float, default=0,
+                            help=f"{channel or '连接'}超过多少秒没有收到消息时断开重连，可以小于 1 秒，0 表示使用接收器默认值")
+
+
+def stall_kwargs(timeout: float) -> dict:
+    """--stall-timeout 转换为接收器的构造参数，0 时不覆盖接收器默认值"""
+    return {"heartbeat_timeout": timeout} if timeout and timeout > 0 else {}
+
+
+_supervisor: Optional[ConnectionSupervisor] = None
+_supervisor_lock = threading.Lock()
+
+
+def get_supervisor() -> ConnectionSupervisor:
+    """进程内共用的监控实例"""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = ConnectionSupervisor()
+        return _supervisor
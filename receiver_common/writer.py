@@ -0,0 +1,373 @@
+"""
+按天按 symbol 写文件的缓冲写入引擎
+
+原来的 DailyCSVWriter 每行做一次 datetime 格式化判断跨天，逐行写进文本模式的 gzip 句柄，
+每 100 行 flush 并打一条 INFO 日志，压缩和磁盘写都在回调线程里完成。这里改为:
+
+    - 每个 symbol 缓存当天 UTC 零点和下一个零点的微秒时间戳，跨天判断只是两次整数比较
+    - 行文本先追加到内存块列表，攒够 flush_bytes 或超过 flush_interval 秒才拼接成一个大块
+    - 压缩和写盘在后台 IO 线程完成；compress_mode="process" 时压缩放到进程池里
+    - 写入进度按 log_interval 秒汇总打印，不再按行数打印
+
+每次写盘的大块是一个段: 压缩成一个独立的 gzip member(多个 member 拼接仍然是合法的 gzip
+文件)，写完后 fsync。进程被杀时最多丢失正在写的那一段和内存中尚未写盘的数据，之前的段都完整可读。
+重启后遇到当天已存在的文件时，只检查文件末尾: 以完整的 gzip member 或换行结尾才接着追加。
+gzip 文件从末尾向前找最后一个 member 的起点，只解压这一段(不超过两个写盘段的大小)，
+不会在回调线程里把几个 GB 的整天文件解压一遍；
+末尾有写了一半的段(或无法从末尾确认完整)时原文件保持不动(可以用 zcat 等工具读出完整的部分)，
+改为写入新的 .N 文件(与 parquet_writer 相同)。
+
+文件名: {output_dir}/{exchange}_{FILE_KIND}_{symbol}_{date}[.N].csv[.gz]
+
+子类提供 FILE_KIND、HEADER 和具体的 write 方法，例如:
+
+    class DailyCSVWriter(DailyFileWriter):
+        FILE_KIND = "book_snapshot_l2"
+        HEADER = CSV_HEADER
+
+        def write(self, update):
+            self.write_text(update.symbol, update.timestamp, update.to_csv_row() + "\\n")
+"""
+
+import argparse
+import gzip
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_THREAD = "thread"
+COMPRESS_PROCESS = "process"
+COMPRESS_MODES = (COMPRESS_THREAD, COMPRESS_PROCESS)
+
+# 输出格式，parquet 见 parquet_writer.DailyParquetWriter
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMATS = (FORMAT_CSV, FORMAT_PARQUET)
+
+DAY_US = 86_400_000_000
+
+# gzip.compress 写出的 member 头: deflate，没有 FNAME 等可选字段
+GZIP_MEMBER_MAGIC = b"\x1f\x8b\x08\x00"
+
+_OP_WRITE = 0
+_OP_CLOSE = 1
+_STOP = None
+
+
+class _DayFile:
+    """一个 symbol 当天的文件及其内存缓冲"""
+
+    __slots__ = ("symbol", "date", "path", "day_start_us", "day_end_us", "chunks", "buffered", "count", "header_pending", "last_flush")
+
+    def __init__(self, symbol: str, date: str, path: str, day_start_us: int, header_pending: bool):
+        self.symbol = symbol
+        self.date = date
+        self.path = path
+        self.day_start_us = day_start_us
+        self.day_end_us = day_start_us + DAY_US
+        self.chunks: List[str] = []
+        self.buffered = 0
+        self.count = 0
+        self.header_pending = header_pending
+        self.last_flush = time.monotonic()
+
+
+class DailyFileWriter:
+    """按天按 symbol 保存文件的缓冲写入引擎，写入方法可在任意单个线程中调用"""
+
+    # 文件名中的数据类型，如 book_snapshot_l2 / trades
+    FILE_KIND = ""
+    # 新文件的表头
+    HEADER = ""
+
+    def __init__(
+        self,
+        output_dir: str,
+        exchange: str,
+        compress: bool = True,
+        compress_level: int = 6,
+        compress_mode: str = COMPRESS_THREAD,
+        flush_bytes: int = 4 << 20,
+        flush_interval: float = 5.0,
+        log_interval: float = 60.0,
+        fsync: bool = True,
+    ):
+        if compress_mode not in COMPRESS_MODES:
+            raise ValueError(f"Unknown compress mode: {compress_mode}, expected one of {COMPRESS_MODES}")
+        self.output_dir = output_dir
+        self.exchange = exchange
+        self.compress = compress
+        self.compress_level = compress_level
+        self.compress_mode = compress_mode
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.log_interval = log_interval
+        self.fsync = fsync
+
+        self._current: Dict[str, _DayFile] = {}  # key: symbol
+        self._opened: Set[str] = set()  # 本进程已打开过的文件
+        self._total_count = 0
+        self._lock = threading.Lock()
+
+        self._queue: Optional[queue.Queue] = None
+        self._io_thread: Optional[threading.Thread] = None
+        self._flush_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _get_file_path(self, symbol: str, date: str, part: int = 0) -> str:
+        suffix = f".{part}" if part else ""
+        filename = f"{self.exchange}_{self.FILE_KIND}_{symbol}_{date}{suffix}.csv"
+        if self.compress:
+            filename += ".gz"
+        return os.path.join(self.output_dir, filename)
+
+    def write_text(self, symbol: str, timestamp_us: int, text: str, count: int = 1):
+        """追加 count 条记录的文本(以换行结尾)，按 timestamp_us 所在的 UTC 日期分文件"""
+        with self._lock:
+            f = self._current.get(symbol)
+            if f is None or not (f.day_start_us <= timestamp_us < f.day_end_us):
+                f = self._switch_day(symbol, timestamp_us)
+            f.chunks.append(text)
+            f.buffered += len(text)
+            f.count += count
+            self._total_count += count
+            if f.buffered >= self.flush_bytes:
+                self._flush_file(f)
+
+    def _switch_day(self, symbol: str, timestamp_us: int) -> _DayFile:
+        """切换到 timestamp_us 所在日期的文件，关闭 symbol 之前的文件"""
+        old = self._current.pop(symbol, None)
+        if old is not None:
+            self._close_file(old)
+        self._ensure_started()
+
+        day_start_us = timestamp_us - timestamp_us % DAY_US
+        date = datetime.fromtimestamp(day_start_us // 1_000_000, tz=timezone.utc).strftime("%Y-%m-%d")
+        # 本进程打开过的文件(时间戳回跳)和末尾完整的已有文件(重启)追加写，只有空文件才写表头；
+        # 末尾不完整的已有文件不修改，换下一个 part
+        # 每个 gzip 段不超过 flush_bytes 加一次写入的文本，向前检查两个段的大小足以找到最后一个段的起点
+        tail_window = 2 * self.flush_bytes + (1 << 20)
+        part = 0
+        while True:
+            path = self._get_file_path(symbol, date, part)
+            if path in self._opened:
+                is_new = False
+                break
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size and not has_complete_tail(path, self.compress, tail_window):
+                logger.warning(f"{path} has an incomplete or unverifiable tail, leaving it untouched and writing to the next part")
+                part += 1
+                continue
+            self._opened.add(path)
+            is_new = size == 0
+            logger.info(f"{'创建新文件' if is_new else '追加到已有文件'}: {path}")
+            break
+        f = _DayFile(symbol, date, path, day_start_us, header_pending=is_new)
+        self._current[symbol] = f
+        return f
+
+    def _flush_file(self, f: _DayFile):
+        """把内存块交给后台线程压缩写盘，需要持有 self._lock"""
+        f.last_flush = time.monotonic()
+        if not f.chunks and not f.header_pending:
+            return
+        if f.header_pending:
+            f.chunks.insert(0, self.HEADER)
+        data = "".join(f.chunks).encode("utf-8")
+        f.chunks = []
+        f.buffered = 0
+        f.header_pending = False
+
+        if self.compress and self._executor is not None:
+            payload = self._executor.submit(gzip.compress, data, self.compress_level)
+        else:
+            payload = data
+        self._queue.put((_OP_WRITE, f.path, payload))
+
+    def _close_file(self, f: _DayFile):
+        self._flush_file(f)
+        self._queue.put((_OP_CLOSE, f.path, None))
+        logger.info(f"关闭文件: {f.path}，共 {f.count} 条记录")
+
+    def _ensure_started(self):
+        if self._io_thread is not None:
+            return
+        # 限制排队的块数，后台压缩跟不上时写入方等待，而不是无限占用内存
+        self._queue = queue.Queue(maxsize=64)
+        self._stop_event.clear()
+        if self.compress and self.compress_mode == COMPRESS_PROCESS:
+            # 此时接收线程已经在运行，用 spawn 避免 fork 出带锁状态的子进程
+            self._executor = ProcessPoolExecutor(
+                max_workers=max(1, min(4, (os.cpu_count() or 1) - 1)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        self._io_thread = threading.Thread(target=self._io_loop, name=f"{self.exchange}-{self.FILE_KIND}-io", daemon=True)
+        self._flush_thread = threading.Thread(target=self._flush_loop, name=f"{self.exchange}-{self.FILE_KIND}-flush", daemon=True)
+        self._io_thread.start()
+        self._flush_thread.start()
+
+    def _io_loop(self):
+        """后台 IO 线程: 按提交顺序压缩、写盘，每段写完后 fsync"""
+        files: Dict[str, object] = {}
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            op, path, payload = item
+            try:
+                if op == _OP_CLOSE:
+                    fh = files.pop(path, None)
+                    if fh is not None:
+                        fh.close()
+                    continue
+
+                fh = files.get(path)
+                if fh is None:
+                    fh = files[path] = open(path, "ab")
+                if not self.compress:
+                    fh.write(payload)
+                elif self._executor is not None:
+                    # 进程池已经压缩成完整的 gzip member
+                    fh.write(payload.result())
+                else:
+                    fh.write(gzip.compress(payload, self.compress_level))
+                fh.flush()
+                if self.fsync:
+                    os.fsync(fh.fileno())
+            except Exception as e:
+                logger.error(f"Error writing {path}: {e}", exc_info=True)
+
+        for fh in files.values():
+            fh.close()
+
+    def _flush_loop(self):
+        """定时 flush 超过 flush_interval 未写盘的缓冲，并按 log_interval 汇总写入进度"""
+        last_log = time.monotonic()
+        while not self._stop_event.wait(min(self.flush_interval, self.log_interval)):
+            now = time.monotonic()
+            with self._lock:
+                for f in list(self._current.values()):
+                    if now - f.last_flush >= self.flush_interval:
+                        self._flush_file(f)
+                if now - last_log >= self.log_interval:
+                    last_log = now
+                    for f in self._current.values():
+                        logger.info(f"[{f.symbol}][{f.date}] 已写入 {f.count} 条记录")
+
+    def close_symbol(self, symbol: str) -> bool:
+        """写完并关闭一个 symbol 当前的文件 (如运行中退订)，之后再写入时重新打开并追加"""
+        with self._lock:
+            f = self._current.pop(symbol, None)
+            if f is None:
+                return False
+            self._close_file(f)
+            return True
+
+    def close_all(self):
+        """写完所有缓冲并关闭文件，停止后台线程"""
+        with self._lock:
+            for f in list(self._current.values()):
+                self._close_file(f)
+            self._current.clear()
+        if self._io_thread is None:
+            return
+        self._stop_event.set()
+        self._flush_thread.join()
+        self._queue.put(_STOP)
+        self._io_thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._io_thread = None
+        self._flush_thread = None
+
+    def get_total_count(self) -> int:
+        """获取总记录数"""
+        return self._total_count
+
+
+def _ends_with_complete_member(fh, window: int) -> bool:
+    """gzip 文件是否以完整的 member 结尾，只读取末尾 window 字节
+
+    从末尾向前查找 member 头，从候选位置解压到文件末尾:
+        - 正好解压完一个 member: 末尾完整
+        - 解压完一个 member 后还有数据: 最后一个 member 写了一半
+        - 出错或没有解压完: 压缩数据中恰好出现的 member 头，或最后一个 member 被截断，继续向前
+    window 内找不到完整的 member 时返回 False。
+    """
+    end = fh.seek(0, os.SEEK_END)
+    start = max(0, end - window)
+    fh.seek(start)
+    tail = fh.read(end - start)
+    pos = len(tail)
+    while True:
+        pos = tail.rfind(GZIP_MEMBER_MAGIC, 0, pos)
+        if pos < 0:
+            return False
+        decompressor = zlib.decompressobj(31)
+        try:
+            decompressor.decompress(tail[pos:])
+        except zlib.error:
+            continue
+        if decompressor.eof:
+            return not decompressor.unused_data
+
+
+def _ends_with_newline(fh) -> bool:
+    """文本文件是否以换行结尾"""
+    end = fh.seek(0, os.SEEK_END)
+    if end == 0:
+        return True
+    fh.seek(end - 1)
+    return fh.read(1) == b"\n"
+
+
+def has_complete_tail(path: str, compressed: bool, window: int) -> bool:
+    """已有文件的末尾是否完整(以完整的 gzip member 或换行结尾)，可以接着追加"""
+    with open(path, "rb") as fh:
+        return _ends_with_complete_member(fh, window) if compressed else _ends_with_newline(fh)
+
+
+def add_writer_arguments(parser: argparse.ArgumentParser):
+    """添加写盘相关的命令行参数"""
+    parser.add_argument("--format", type=str, default=FORMAT_CSV, choices=FORMATS, help="输出格式，parquet 需要安装 pyarrow (默认: csv)")
+    parser.add_argument("--row-group-rows", type=int, default=100_000, help="parquet 每个 row group 的行数 (默认: 100000)")
+    parser.add_argument(
+        "--parquet-roll-interval", type=float, default=3600.0,
+        help="parquet 每个文件最长写入秒数，到时关闭并换新文件，进程被杀时最多丢失一个文件；0 表示一天一个文件，不防崩溃 (默认: 3600)",
+    )
+    parser.add_argument("--compress-level", type=int, default=6, help="gzip 压缩级别 1-9 (默认: 6)")
+    parser.add_argument("--compress-mode", type=str, default=COMPRESS_THREAD, choices=COMPRESS_MODES, help="后台压缩方式 (默认: thread)")
+    parser.add_argument("--flush-bytes", type=int, default=4 << 20, help="每个文件缓冲多少字节后写盘 (默认: 4MB)")
+    parser.add_argument("--flush-interval", type=float, default=5.0, help="缓冲最长保留秒数 (默认: 5)")
+    parser.add_argument("--no-fsync", action="store_true", help="每段写完后不调用 fsync")
+
+
+def get_writer_options(args: argparse.Namespace) -> dict:
+    """从命令行参数取出 DailyFileWriter (CSV) 的构造参数"""
+    return {
+        "compress_level": args.compress_level,
+        "compress_mode": args.compress_mode,
+        "flush_bytes": args.flush_bytes,
+        "flush_interval": args.flush_interval,
+        "fsync": not args.no_fsync,
+    }
+
+
+def get_parquet_options(args: argparse.Namespace) -> dict:
+    """从命令行参数取出 DailyParquetWriter 的构造参数"""
+    return {
+        "row_group_rows": args.row_group_rows,
+        "roll_interval": args.parquet_roll_interval,
+    }
@@ -0,0 +1,203 @@
+"""
+本机多进程共享缓存
+
+同一台机器上的多个策略进程共享交易所元数据(市场信息/系统配置)和仍然有效的鉴权token，
+避免每个进程启动时都去请求 orderBookDetails、/markets、/system/config，
+也避免每个进程都单独签发一次 Paradex JWT / Lighter auth token。
+
+实现: 每个 key 对应缓存目录下的一个 json 文件，读写通过 fcntl 文件锁保护，
+写入使用临时文件 + rename 保证原子性；get_or_create 在持有独占锁期间调用 factory，
+因此同一个 key 在同一时刻只会有一个进程真正去请求交易所。
+
+使用示例:
+    cache = get_shared_cache()
+    details = cache.get_or_create("lighter:orderBookDetails", fetch_details, ttl=3600)
+"""
+
+import json
+import os
+import re
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，退化为无锁模式
+    fcntl = None
+
+from src.log_kit import logger
+
+
+def _default_cache_dir() -> str:
+    """按用户区分的缓存目录: 优先 $XDG_RUNTIME_DIR，否则临时目录下带 uid 的子目录"""
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "adapter_exchanges_cache")
+    uid = os.getuid() if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"adapter_exchanges_cache_{uid}")
+
+
+DEFAULT_CACHE_DIR = os.getenv("ADAPTER_SHARED_CACHE_DIR") or _default_cache_dir()
+
+
+def _check_private_dir(path: str):
+    """缓存里有 JWT / auth token，目录必须属于当前用户且权限为 0700，否则拒绝使用"""
+    if not hasattr(os, "getuid"):  # Windows 上没有 uid，不检查
+        return
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"shared cache dir {path} is not a directory")
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"shared cache dir {path} is owned by uid {st.st_uid}, not the current user {os.getuid()}")
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        raise PermissionError(f"shared cache dir {path} has mode {oct(stat.S_IMODE(st.st_mode))}, expected 0o700")
+
+
+class SharedCache:
+    """基于文件锁的本机共享缓存"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        # 目录已存在时 makedirs 不会修改权限，需要检查是不是别的用户预先创建的
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        _check_private_dir(cache_dir)
+
+    def _get_file_path(self, key: str) -> str:
+        safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+        return os.path.join(self.cache_dir, f"{safe_key}.json")
+
+    @contextmanager
+    def _lock(self, key: str, exclusive: bool):
+        """对 key 加文件锁，exclusive=False 为共享读锁"""
+        lock_path = self._get_file_path(key) + ".lock"
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _read(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._get_file_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, entry: dict):
+        file_path = self._get_file_path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _is_valid(entry: Optional[dict], now: float) -> bool:
+        if entry is None:
+            return False
+        expire_at = entry.get("expire_at")
+        return expire_at is None or now < expire_at
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取未过期的缓存值，不存在或已过期返回 None"""
+        with self._lock(key, exclusive=False):
+            entry = self._read(key)
+        if self._is_valid(entry, time.time()):
+            return entry["value"]
+        return None
+
+    def set(self, key: str, value: Any, expire_at: Optional[float] = None):
+        """写入缓存值，expire_at 为过期的 unix 时间戳(秒)，None 表示不过期"""
+        with self._lock(key, exclusive=True):
+            self._write(key, {"value": value, "expire_at": expire_at, "updated_at": time.time()})
+
+    def delete(self, key: str):
+        """删除缓存值(例如 token 被服务端判定失效时)"""
+        with self._lock(key, exclusive=True):
+            try:
+                os.remove(self._get_file_path(key))
+            except FileNotFoundError:
+                pass
+
+    def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """读取缓存，不存在时在独占锁内调用 factory 生成并写入
+
+        Args:
+            key: 缓存键
+            factory: 生成缓存值的函数，只会在缓存缺失或过期时被调用
+            ttl: 有效期(秒)，None 表示不过期
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock(key, exclusive=True):
+            # 拿到锁之后再检查一次，其他进程可能已经生成好了
+            entry = self._read(key)
+            if self._is_valid(entry, time.time()):
+                return entry["value"]
+            value = factory()
+            expire_at = time.time() + ttl if ttl is not None else None
+            self._write(key, {"value": value, "expire_at": expire_at, "updated_at": time.time()})
+            return value
+
+    def get_or_create_with_expiry(
+        self,
+        key: str,
+        factory: Callable[[], Tuple[Any, float]],
+        min_remaining: float = 0,
+    ) -> Tuple[Any, float]:
+        """适用于鉴权 token: factory 返回 (value, expire_at)
+
+        缓存中的值剩余有效期不足 min_remaining 秒时视为过期并重新生成。
+
+        Returns:
+            (value, expire_at)
+        """
+        def _usable(entry: Optional[dict]) -> bool:
+            return (
+                entry is not None
+                and entry.get("expire_at") is not None
+                and time.time() < entry["expire_at"] - min_remaining
+            )
+
+        with self._lock(key, exclusive=False):
+            entry = self._read(key)
+        if _usable(entry):
+            return entry["value"], entry["expire_at"]
+
+        with self._lock(key, exclusive=True):
+            entry = self._read(key)
+            if _usable(entry):
+                return entry["value"], entry["expire_at"]
+            value, expire_at = factory()
+            self._write(key, {"value": value, "expire_at": expire_at, "updated_at": time.time()})
+            logger.info(f"shared cache 写入 {key}，过期时间: {expire_at}")
+            return value, expire_at
+
+
+_shared_cache: Optional[SharedCache] = None
+
+
+def get_shared_cache() -> SharedCache:
+    """获取进程内单例的共享缓存"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SharedCache()
+    return _shared_cache
@@ -396,6 +396,35 @@ def get_unique_id():
     return f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
 
 
+class LazyModule:
+    """
+    延迟导入的模块代理，第一次访问属性时才真正 import
+
+    用于签名/加密这类导入很重的依赖(lighter、starknet_py 等)，
+    只读行情场景下不会付出导入开销。
+
+    使用示例:
+        lighter = LazyModule("lighter")
+        lighter.SignerClient(...)  # 此时才 import lighter
+    """
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            import importlib
+            self._module = importlib.import_module(self._module_name)
+        return self._module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+
 def redirect(exchange, exchange_name:str, mappings:dict):
     import ccxt
     if exchange_name == 'binance':